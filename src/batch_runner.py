@@ -0,0 +1,115 @@
+from collections import namedtuple
+import numpy as np
+from src.gate_table import NO_INDEX, get_gate_key
+from src.precision import get_dtype
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.run_result import RunResult
+from src.statevector import BatchedStateVector, gate_wires
+
+# Wider circuits gain little from batching, and go through QuantumCircuitRunner one at a time.
+MAX_BATCHED_QUBITS = 12
+# Amplitudes held by one batch, 64 MiB per state array in complex128 and 32 MiB in complex64.
+MAX_BATCH_AMPLITUDES = 2 ** 22
+
+# The distinct circuits of one width whose gates act on the same wires in the same order, and the
+# position in the run_many call of every submission of each of them.
+CircuitGroup = namedtuple('CircuitGroup', ['input_size', 'wires', 'circuits', 'positions'])
+
+
+def is_batchable(circuit):
+    records = circuit.gate_table.records
+    return circuit.input_size <= MAX_BATCHED_QUBITS and (records['bit'] == NO_INDEX).all() and (records['condition_bit'] == NO_INDEX).all()
+
+
+def group_circuits(circuits):
+    # Circuits are grouped by their gate wires alone, so no circuit is compiled. Circuits with
+    # measurements or conditioned gates, or wider than MAX_BATCHED_QUBITS, are left out and their
+    # positions returned separately.
+    groups = {}
+    unique = {}
+    unbatched = []
+    for position, circuit in enumerate(circuits):
+        if not is_batchable(circuit):
+            unbatched.append(position)
+            continue
+        key = circuit.structural_hash
+        if key not in unique:
+            records = circuit.gate_table.records
+            group_key = (circuit.input_size, records['target'].tobytes(), records['control'].tobytes())
+            if group_key not in groups:
+                wires = [gate_wires(target, None if control == NO_INDEX else control)
+                         for target, control in zip(records['target'].tolist(), records['control'].tolist())]
+                groups[group_key] = CircuitGroup(circuit.input_size, wires, [], [])
+            group = groups[group_key]
+            unique[key] = (group, len(group.circuits))
+            group.circuits.append(circuit)
+            group.positions.append([])
+        group, index = unique[key]
+        group.positions[index].append(position)
+    return list(groups.values()), unbatched
+
+
+def get_gate_kinds(circuits, dtype):
+    # Renumbers the gates of all circuits into one table of matrices per matrix size, in dtype.
+    # Returns the tables and a (len(circuits), gates) array of every gate's index into its table.
+    indices = {}
+    matrices = {2: [], 4: []}
+    kinds = np.empty((len(circuits), len(circuits[0])), dtype=np.int64)
+    for row, circuit in enumerate(circuits):
+        table = circuit.gate_table
+        local_kinds = np.empty(len(table.gates), dtype=np.int64)
+        for local_kind, gate in enumerate(table.gates):
+            key = get_gate_key(gate)
+            if key not in indices:
+                matrix = gate.get_matrix(dtype)
+                indices[key] = len(matrices[len(matrix)])
+                matrices[len(matrix)].append(matrix)
+            local_kinds[local_kind] = indices[key]
+        kinds[row] = local_kinds[table.records['gate']]
+    return {size: np.array(table, dtype=dtype).reshape(-1, size, size) for size, table in matrices.items()}, kinds
+
+
+def simulate_group(group, precision=None):
+    # The final states of a group, as the columns of a (2^n, len(group.circuits)) array. Every
+    # column is advanced through each gate together, sharing one kernel call when the gate is the
+    # same for the whole batch.
+    dtype = get_dtype(precision)
+    final_states = np.empty((2 ** group.input_size, len(group.circuits)), dtype=dtype)
+    batch_size = max(1, MAX_BATCH_AMPLITUDES >> group.input_size)
+    for start in range(0, len(group.circuits), batch_size):
+        matrices, kinds = get_gate_kinds(group.circuits[start:start + batch_size], dtype)
+        batch = BatchedStateVector(group.input_size, len(kinds), dtype)
+        for wires, column in zip(group.wires, kinds.T):
+            table = matrices[2 ** len(wires)]
+            if (column == column[0]).all():
+                batch.apply_matrix(table[column[0]], wires)
+            else:
+                batch.apply_matrices(table[column], wires)
+        final_states[:, start:start + len(kinds)] = batch.amplitudes
+    return final_states
+
+
+def run_many(circuits, shots, seed=None, precision=None):
+    # Runs every circuit for shots shots (an int, or one count per circuit) and returns one
+    # RunResult per circuit in submission order. Identical circuits are simulated once; each
+    # submission still draws its own shots, from its own child of one SeedSequence.
+    circuits = list(circuits)
+    shots = np.broadcast_to(np.asarray(shots, dtype=np.int64), (len(circuits),))
+    if (shots < 1).any():
+        raise ValueError("shots must be greater than or equal to 1")
+
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(circuits))
+    results = [None] * len(circuits)
+    groups, unbatched = group_circuits(circuits)
+    for group in groups:
+        # Shots are drawn in float64, where the multinomial needs its probabilities to sum to 1.
+        probabilities = np.abs(simulate_group(group, precision)).astype(np.float64) ** 2
+        for index, positions in enumerate(group.positions):
+            circuit_probabilities = probabilities[:, index] / probabilities[:, index].sum()
+            for position in positions:
+                results[position] = RunResult(group.input_size, np.random.default_rng(seed_sequences[position]).multinomial(shots[position], circuit_probabilities))
+
+    for position in unbatched:
+        runner_seed = seed_sequences[position].generate_state(4)
+        results[position] = QuantumCircuitRunner(circuits[position], precision=precision).run(int(shots[position]), seed=runner_seed)
+    return results
@@ -0,0 +1,219 @@
+import argparse
+import itertools
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+from src.circuit_cache import get_default_cache
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.quantum_gate import get_gate, get_quantum_gate_list
+from src.qubit import Qubit
+
+BENCHMARK_FORMAT_VERSION = 1
+DEFAULT_REPEAT = 5
+# A hot path regresses when its best time is this much slower than the baseline's best time.
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_RESULTS_PATH = 'benchmark_results.json'
+BENCHMARK_SEED = 2024
+
+BENCHMARK_GRID = MappingProxyType({'width': (2, 8, 16), 'depth': (10, 100), 'shots': (1000, 100000)})
+QUICK_BENCHMARK_GRID = MappingProxyType({'width': (2, 4), 'depth': (5,), 'shots': (100,)})
+
+# prepare(**params) returns (setup, run): setup() builds fresh inputs for one repetition outside the
+# timed region and run(inputs) is the timed hot path. Cases wider than max_width are skipped.
+BenchmarkCase = namedtuple('BenchmarkCase', ['name', 'parameters', 'prepare', 'max_width'], defaults=[None])
+BenchmarkResult = namedtuple('BenchmarkResult', ['name', 'params', 'min_seconds', 'median_seconds'])
+Regression = namedtuple('Regression', ['key', 'baseline_seconds', 'seconds', 'ratio'])
+
+
+def get_random_gates(width, depth, seed=BENCHMARK_SEED):
+    # depth layers of width gates each, a mix of every registry gate on random wires.
+    rng = np.random.default_rng(seed)
+    gates = [gate for gate in get_quantum_gate_list() if width > 1 or not gate.is_two_qubit_gate()]
+    random_gates = []
+    for _ in range(width * depth):
+        gate = gates[rng.integers(len(gates))]
+        random_gates.append((gate.name, rng.choice(width, size=2 if gate.is_two_qubit_gate() else 1, replace=False).tolist()))
+    return random_gates
+
+
+def get_random_circuit(width, depth):
+    circuit = QuantumCircuit(width)
+    for name, wires in get_random_gates(width, depth):
+        circuit.add_gate(name, *wires)
+    return circuit
+
+
+def get_uncached_circuit(width, depth):
+    # A fresh circuit with the compiled-circuit cache emptied, so the timed run compiles and simulates
+    # it instead of reusing the compiled form or final state of the previous repetition.
+    get_default_cache().clear()
+    return get_random_circuit(width, depth)
+
+
+def get_entangled_qubits(width):
+    qubits = [Qubit() for _ in range(width)]
+    qubits[0].apply_gate(get_gate('hadamard'))
+    for qubit in qubits[1:]:
+        qubits[0].apply_gate(get_gate('cnot'), qubit)
+    return qubits
+
+
+def prepare_add_gate(width, depth):
+    gates = get_random_gates(width, depth)
+
+    def run(_):
+        circuit = QuantumCircuit(width)
+        for name, wires in gates:
+            circuit.add_gate(name, *wires)
+
+    return lambda: None, run
+
+
+def prepare_apply_circuit(width, depth):
+    def run(inputs):
+        circuit, qubits = inputs
+        circuit.apply_circuit(*qubits)
+
+    return lambda: (get_uncached_circuit(width, depth), [Qubit() for _ in range(width)]), run
+
+
+def prepare_qubit_apply_gate(width, depth):
+    gates = [(get_gate(name), wires) for name, wires in get_random_gates(width, depth)]
+
+    def run(qubits):
+        for gate, wires in gates:
+            qubits[wires[0]].apply_gate(gate, *[qubits[wire] for wire in wires[1:]])
+
+    return lambda: [Qubit() for _ in range(width)], run
+
+
+def prepare_qubit_measure(width):
+    rng = np.random.default_rng(BENCHMARK_SEED)
+
+    def run(qubits):
+        for qubit in qubits:
+            qubit.measure(rng)
+
+    return lambda: get_entangled_qubits(width), run
+
+
+def prepare_run_circuit_multiple_times(width, depth, shots):
+    return lambda: QuantumCircuitRunner(get_uncached_circuit(width, depth)), lambda runner: runner.run_circuit_multiple_times(shots, seed=BENCHMARK_SEED)
+
+
+def prepare_qubit_str(width):
+    return lambda: get_entangled_qubits(width), lambda qubits: [str(qubit) for qubit in qubits]
+
+
+def prepare_state_str(width):
+    return lambda: get_entangled_qubits(width)[0].register, str
+
+
+BENCHMARK_CASES = (BenchmarkCase('add_gate', ('width', 'depth'), prepare_add_gate),
+                   BenchmarkCase('apply_circuit', ('width', 'depth'), prepare_apply_circuit),
+                   BenchmarkCase('qubit_apply_gate', ('width', 'depth'), prepare_qubit_apply_gate),
+                   BenchmarkCase('qubit_measure', ('width',), prepare_qubit_measure),
+                   BenchmarkCase('run_circuit_multiple_times', ('width', 'depth', 'shots'), prepare_run_circuit_multiple_times),
+                   BenchmarkCase('qubit_str', ('width',), prepare_qubit_str, max_width=8),
+                   BenchmarkCase('state_str', ('width',), prepare_state_str, max_width=8))
+
+
+def get_result_key(name, params):
+    return f"{name}[{','.join(f'{parameter}={value}' for parameter, value in sorted(params.items()))}]"
+
+
+def time_case(case, params, repeat=DEFAULT_REPEAT):
+    setup, run = case.prepare(**params)
+    run(setup())
+    timings = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        run(inputs)
+        timings.append(time.perf_counter() - start)
+    return BenchmarkResult(case.name, params, min(timings), statistics.median(timings))
+
+
+def run_benchmarks(grid=BENCHMARK_GRID, cases=BENCHMARK_CASES, repeat=DEFAULT_REPEAT, name_filter=None):
+    results = []
+    for case in cases:
+        if name_filter is not None and name_filter not in case.name:
+            continue
+        for values in itertools.product(*[grid[parameter] for parameter in case.parameters]):
+            params = dict(zip(case.parameters, values))
+            if case.max_width is not None and params.get('width', 0) > case.max_width:
+                continue
+            results.append(time_case(case, params, repeat))
+    return results
+
+
+def results_to_json(results):
+    return {'version': BENCHMARK_FORMAT_VERSION,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'results': [dict(result._asdict(), key=get_result_key(result.name, result.params)) for result in results]}
+
+
+def save_results(results, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(results_to_json(results), file, indent=2)
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        data = json.load(file)
+    if data.get('version') != BENCHMARK_FORMAT_VERSION:
+        raise ValueError(f"Unsupported benchmark baseline version: {data.get('version')}")
+    return {result['key']: result['min_seconds'] for result in data['results']}
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # Best-of-repeat times are compared, which are the least sensitive to a busy machine. Cases missing
+    # from the baseline are new and cannot regress.
+    regressions = []
+    for result in results:
+        key = get_result_key(result.name, result.params)
+        if key in baseline and result.min_seconds > baseline[key] * (1 + tolerance):
+            regressions.append(Regression(key, baseline[key], result.min_seconds, result.min_seconds / baseline[key]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the simulation hot paths.')
+    parser.add_argument('--output', default=DEFAULT_RESULTS_PATH, help='where to write the JSON results')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write the results to the --baseline path instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='allowed slowdown, as a fraction of the baseline time')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--quick', action='store_true', help='run a small grid, e.g. as a smoke test')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    args = parser.parse_args(argv)
+    if args.save_baseline and args.baseline is None:
+        parser.error('--save-baseline needs --baseline')
+
+    results = run_benchmarks(QUICK_BENCHMARK_GRID if args.quick else BENCHMARK_GRID, repeat=args.repeat, name_filter=args.filter)
+    for result in results:
+        print(f"{get_result_key(result.name, result.params):<60} {result.min_seconds * 1e3:10.3f} ms")
+    save_results(results, args.output)
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        return 0
+    if args.baseline is None:
+        return 0
+
+    regressions = compare_results(results, load_baseline(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression.key}: {regression.baseline_seconds * 1e3:.3f} ms -> {regression.seconds * 1e3:.3f} ms "
+              f"({regression.ratio:.2f}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,214 @@
+import numpy as np
+from src.circuit_compiler import CompiledMeasurement, is_condition_met
+from src.packed_shots import outcomes_to_bits
+from src.statevector import StateVector, apply_matrices, apply_matrix
+
+BRANCH_PROBABILITY_TOLERANCE = 1e-15
+# Every branch holds a full statevector, so the enumerated tree is capped at this many amplitudes
+# across its branches, 16 MiB in complex128 plus as much again in scratch buffers; a 2-qubit register
+# may have 2^18 branches. Beyond the cap shots are resampled through the rest of the circuit in batches
+# within the same budget.
+MAX_BRANCH_AMPLITUDES = 2 ** 20
+
+
+class BranchTree:
+    # The leaves of a circuit's measurement tree: one post-measurement state per reachable
+    # assignment of the classical bits, with the probability of reaching it. Operations before the
+    # first measurement run once, and every later operation runs once per live branch, no matter
+    # how many shots are drawn from the tree afterwards. When a measurement would take the tree past
+    # its cap, enumeration stops there and pending holds the operations every branch has left.
+    def __init__(self, probabilities, classical_bits, final_probabilities, registers=None, pending=()):
+        self.probabilities = probabilities
+        self.classical_bits = classical_bits
+        self.final_probabilities = final_probabilities
+        self.registers = registers
+        self.pending = pending
+
+    @classmethod
+    def from_compiled_circuit(cls, compiled_circuit, precision=None, max_branches=None):
+        # max_branches can lower the cap further, e.g. to the number of shots that will be drawn.
+        register = StateVector(compiled_circuit.input_size, precision)
+        limit = get_max_branches(compiled_circuit.input_size)
+        max_branches = limit if max_branches is None else min(max_branches, limit)
+        steps = list(zip(compiled_circuit.operations, compiled_circuit.get_matrices(register.dtype)))
+        branches = [(1.0, [0] * compiled_circuit.num_bits, register)]
+        for position, (operation, matrix) in enumerate(steps):
+            if isinstance(operation, CompiledMeasurement):
+                # Children are counted before any register is copied.
+                probabilities_of_one = [register.get_outcome_probability(operation.target, 1) for _, _, register in branches]
+                num_children = sum(int(probability_of_one > BRANCH_PROBABILITY_TOLERANCE) + int(1 - probability_of_one > BRANCH_PROBABILITY_TOLERANCE)
+                                   for probability_of_one in probabilities_of_one)
+                if num_children > max_branches:
+                    return cls.__from_branches(branches, compiled_circuit.num_bits, steps[position:])
+                branches = [child for branch, probability_of_one in zip(branches, probabilities_of_one)
+                            for child in cls.__split(branch, operation, probability_of_one)]
+                continue
+            for _, classical_bits, register in branches:
+                if is_condition_met(operation.condition, classical_bits):
+                    register.apply_matrix(matrix, operation.wires)
+
+        return cls.__from_branches(branches, compiled_circuit.num_bits)
+
+    @classmethod
+    def from_register(cls, register):
+        return cls(np.ones(1), np.zeros((1, 0), dtype=np.uint8), [register.probabilities()], [register])
+
+    @classmethod
+    def from_probabilities(cls, probabilities):
+        return cls(np.ones(1), np.zeros((1, 0), dtype=np.uint8), [probabilities])
+
+    def get_probabilities(self):
+        if self.pending:
+            return sum(probability * register.probabilities() for probability, _, register in self.iter_leaves())
+        return sum(probability * final for probability, final in zip(self.probabilities, self.final_probabilities))
+
+    def iter_leaves(self):
+        # Every leaf of the full tree as (probability, classical bits, register). The pending part of a
+        # capped tree is enumerated depth first, holding two registers per pending measurement at most.
+        for probability, classical_bits, register in zip(self.probabilities, self.classical_bits.tolist(), self.registers):
+            if self.pending:
+                yield from self.__iter_subtree(probability, classical_bits, register.copy(), 0)
+            else:
+                yield probability, classical_bits, register
+
+    def sample_bits(self, rng, num_shots):
+        outcomes, _ = self.sample(rng, num_shots)
+        num_qubits = self.registers[0].num_qubits if self.pending else len(self.final_probabilities[0]).bit_length() - 1
+        return outcomes_to_bits(outcomes, num_qubits)
+
+    def sample(self, rng, num_shots):
+        # Draw the branch of every shot first, then all outcomes of a branch in one call.
+        if len(self.probabilities) == 1:
+            leaves = np.zeros(num_shots, dtype=np.int64)
+        else:
+            leaves = rng.choice(len(self.probabilities), size=num_shots, p=self.probabilities / self.probabilities.sum())
+        if self.pending:
+            return self.__sample_pending(rng, leaves)
+
+        if len(self.probabilities) == 1:
+            outcomes = self.__sample_outcomes(rng, self.final_probabilities[0], num_shots)
+        else:
+            outcomes = np.empty(num_shots, dtype=np.int64)
+            for leaf in range(len(self.probabilities)):
+                leaf_shots = leaves == leaf
+                outcomes[leaf_shots] = self.__sample_outcomes(rng, self.final_probabilities[leaf], np.count_nonzero(leaf_shots))
+        return outcomes, self.classical_bits[leaves]
+
+    def __sample_pending(self, rng, leaves):
+        # Shots run through the pending operations a batch at a time. The distinct branches of a batch
+        # are the columns of one (2^n, B) array, and every measurement splits the shots of each column
+        # binomially between its outcomes, keeping only children that some shot reached, so a batch
+        # never has more columns than shots. Shots come out grouped by branch and are shuffled after.
+        # An operation holds its input and output columns at once, so a batch takes half the cap.
+        batch_size = max(1, get_max_branches(self.registers[0].num_qubits) // 2)
+        outcomes = np.empty(len(leaves), dtype=np.int64)
+        classical_bits = np.empty((len(leaves), self.classical_bits.shape[1]), dtype=np.uint8)
+        for start in range(0, len(leaves), batch_size):
+            stop = min(start + batch_size, len(leaves))
+            columns, counts = np.unique(leaves[start:stop], return_counts=True)
+            amplitudes = np.stack([self.registers[column].amplitudes for column in columns.tolist()], axis=1)
+            bits = self.classical_bits[columns]
+            for operation, matrix in self.pending:
+                if isinstance(operation, CompiledMeasurement):
+                    amplitudes, bits, counts = split_columns(rng, amplitudes, bits, counts, operation)
+                else:
+                    amplitudes = apply_to_columns(amplitudes, bits, operation, matrix)
+            order = rng.permutation(stop - start)
+            outcomes[start:stop] = sample_columns(rng, amplitudes, counts)[order]
+            classical_bits[start:stop] = np.repeat(bits, counts, axis=0)[order]
+        return outcomes, classical_bits
+
+    def __iter_subtree(self, probability, classical_bits, register, position):
+        for index in range(position, len(self.pending)):
+            operation, matrix = self.pending[index]
+            if isinstance(operation, CompiledMeasurement):
+                probability_of_one = register.get_outcome_probability(operation.target, 1)
+                for child_probability, child_bits, child_register in self.__split((probability, classical_bits, register), operation, probability_of_one):
+                    yield from self.__iter_subtree(child_probability, child_bits, child_register, index + 1)
+                return
+            if is_condition_met(operation.condition, classical_bits):
+                register.apply_matrix(matrix, operation.wires)
+        yield probability, classical_bits, register
+
+    @classmethod
+    def __from_branches(cls, branches, num_bits, pending=()):
+        return cls(np.array([probability for probability, _, _ in branches]),
+                   np.array([classical_bits for _, classical_bits, _ in branches], dtype=np.uint8).reshape(len(branches), num_bits),
+                   None if pending else [register.probabilities() for _, _, register in branches],
+                   [register for _, _, register in branches],
+                   pending)
+
+    @staticmethod
+    def __sample_outcomes(rng, probabilities, num_shots):
+        # Normalized in float64 whatever the state's precision, as rng.choice checks the sum to 1e-8.
+        probabilities = np.asarray(probabilities, dtype=np.float64)
+        return rng.choice(len(probabilities), size=num_shots, p=probabilities / probabilities.sum())
+
+    @staticmethod
+    def __split(branch, measurement, probability_of_one):
+        probability, classical_bits, register = branch
+        children = []
+        for outcome, outcome_probability in [(0, 1 - probability_of_one), (1, probability_of_one)]:
+            if outcome_probability <= BRANCH_PROBABILITY_TOLERANCE:
+                continue
+            # The last surviving child can take over the parent's register instead of copying it.
+            child_register = register if outcome == 1 or probability_of_one <= BRANCH_PROBABILITY_TOLERANCE else register.copy()
+            child_register.collapse(measurement.target, outcome, outcome_probability)
+            child_bits = list(classical_bits)
+            child_bits[measurement.bit] = outcome
+            children.append((probability * outcome_probability, child_bits, child_register))
+        return children
+
+
+def get_max_branches(num_qubits):
+    return max(1, MAX_BRANCH_AMPLITUDES >> num_qubits)
+
+
+def apply_to_columns(amplitudes, bits, operation, matrix):
+    # Columns whose classical bits fail the operation's condition get the identity instead.
+    met = np.ones(len(bits), dtype=bool) if operation.condition is None else bits[:, operation.condition[0]] == operation.condition[1]
+    if not met.any():
+        return amplitudes
+    out = np.empty_like(amplitudes)
+    if met.all():
+        return apply_matrix(amplitudes, matrix, operation.wires, out)
+    matrices = np.broadcast_to(np.eye(len(matrix), dtype=amplitudes.dtype), (len(bits),) + matrix.shape).copy()
+    matrices[met] = matrix
+    return apply_matrices(amplitudes, matrices, operation.wires, out)
+
+
+def split_columns(rng, amplitudes, bits, counts, measurement):
+    # Each column's shots are split binomially between the outcomes, and every outcome some shot
+    # reached becomes a collapsed child column.
+    probabilities = np.abs(amplitudes.reshape(2 ** measurement.target, 2, -1, len(counts)))
+    probabilities = np.square(probabilities, out=probabilities).sum(axis=(0, 2), dtype=np.float64)
+    probabilities /= probabilities.sum(axis=0)
+    ones = rng.binomial(counts, probabilities[1])
+    zeros = counts - ones
+    zero_columns, one_columns = np.flatnonzero(zeros), np.flatnonzero(ones)
+    children = np.concatenate([zero_columns, one_columns])
+    outcomes = np.repeat(np.array([0, 1], dtype=np.uint8), [len(zero_columns), len(one_columns)])
+
+    amplitudes = np.take(amplitudes, children, axis=1)
+    blocks = amplitudes.reshape(2 ** measurement.target, 2, -1, len(children))
+    blocks[:, 1, :, :len(zero_columns)] = 0
+    blocks[:, 0, :, len(zero_columns):] = 0
+    amplitudes /= np.sqrt(probabilities[outcomes, children]).astype(amplitudes.real.dtype)
+    bits = bits[children]
+    bits[:, measurement.bit] = outcomes
+    return amplitudes, bits, np.concatenate([zeros[zero_columns], ones[one_columns]])
+
+
+def sample_columns(rng, amplitudes, counts):
+    # counts[b] outcomes drawn from column b, grouped by column. The cumulative distribution of column
+    # b is shifted up by b, so one searchsorted over all columns finds every shot's outcome.
+    size, num_columns = amplitudes.shape
+    cumulative = np.empty((num_columns, size), dtype=np.float64)
+    np.abs(amplitudes.T, out=cumulative)
+    np.square(cumulative, out=cumulative)
+    np.cumsum(cumulative, axis=1, out=cumulative)
+    cumulative /= cumulative[:, -1:]
+    cumulative += np.arange(num_columns)[:, np.newaxis]
+    shot_columns = np.repeat(np.arange(num_columns), counts)
+    indices = np.searchsorted(cumulative.ravel(), rng.random(len(shot_columns)) + shot_columns, side='right')
+    return np.minimum(indices - shot_columns * size, size - 1)
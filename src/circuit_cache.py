@@ -0,0 +1,237 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from functools import partial
+import numpy as np
+from src.circuit_compiler import compile_gates
+from src.exceptions.quantum_circuit_exceptions import UnsupportedOperationError
+from src.precision import get_dtype
+from src.statevector import BatchedStateVector, StateVector
+from src.tracing import get_tracer
+
+DEFAULT_CACHE_BYTES = 2 ** 28
+# Final statevectors and unitaries are kept only up to these widths (1 MiB each at the limit).
+MAX_CACHED_STATE_QUBITS = 16
+MAX_CACHED_UNITARY_QUBITS = 8
+# Part of every hash, so entries written by an incompatible version are never read back.
+CACHE_FORMAT_VERSION = 3
+CACHE_FILE_SUFFIX = '.compiled'
+
+CacheStats = namedtuple('CacheStats', ['hits', 'disk_hits', 'misses', 'evictions', 'entries', 'bytes'])
+
+
+def get_structural_hash(input_size, gate_table):
+    # Gate kinds are renumbered by first use, so equal gate lists hash equally whatever order their
+    # kinds were registered in; each kind contributes its name and parameters.
+    records = gate_table.records
+    kinds, first_rows, kind_rows = np.unique(records['gate'], return_index=True, return_inverse=True)
+    order = np.argsort(first_rows)
+    ranks = np.empty(len(order), dtype=records['gate'].dtype)
+    ranks[order] = np.arange(len(order))
+    canonical = records.copy()
+    canonical['gate'] = ranks[kind_rows.ravel()]
+
+    digest = hashlib.blake2b(digest_size=32)
+    digest.update(np.array([CACHE_FORMAT_VERSION, input_size], dtype='<i8').tobytes())
+    for kind in kinds[order].tolist():
+        gate = gate_table.gates[kind]
+        digest.update(repr((gate.name, tuple(float(param) for param in gate.params))).encode('utf-8'))
+    digest.update(canonical.tobytes())
+    return digest.hexdigest()
+
+
+class CachedCircuit:
+    def __init__(self, compiled):
+        self.compiled = compiled
+        # Final states by amplitude dtype, so each precision keeps its own rounding.
+        self.final_states = {}
+        self.unitary = None
+
+    @property
+    def nbytes(self):
+        # Approximated by the arrays the entry holds, which dominate its size: the compiled matrices in
+        # every dtype they were converted to, the final states and the unitary.
+        arrays = list(self.final_states.values()) + [array for array in [self.unitary] if array is not None]
+        return self.compiled.nbytes + sum(array.nbytes for array in arrays)
+
+
+class CompiledCircuitCache:
+    # Compiled circuits keyed by the structural hash of their gate list. Entries stay in memory in
+    # least-recently-used order within a byte budget. With a directory every entry is also written
+    # there and read back on a memory miss, so the cache survives restarts; only point it at a
+    # directory you trust, since entries are pickled. Every read and change of the entries and their
+    # sizes happens under one lock, so threads may share a cache; simulations run outside it, and two
+    # threads missing on the same circuit at once may both compile it.
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.__entries = OrderedDict()
+        self.__entry_bytes = {}
+        self.__bytes = 0
+        self.__hits = 0
+        self.__disk_hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__lock = threading.RLock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__entries)
+
+    def __contains__(self, circuit):
+        key = circuit.structural_hash
+        with self.__lock:
+            if key in self.__entries:
+                return True
+        return self.directory is not None and os.path.exists(self.__get_path(key))
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return CacheStats(self.__hits, self.__disk_hits, self.__misses, self.__evictions, len(self.__entries), self.__bytes)
+
+    def get_compiled(self, circuit):
+        _, entry = self.__get_entry(circuit)
+        return entry.compiled
+
+    def get_final_state(self, circuit, precision=None):
+        # The state the circuit leaves |0...0⟩ in, as a fresh StateVector the caller may modify. A
+        # cached state is not used while a tracer is installed, so that the simulation is traced.
+        key, entry = self.__get_entry(circuit)
+        if not entry.compiled.is_unitary:
+            raise UnsupportedOperationError('compiled circuit cache', 'mid-circuit measurement or classically conditioned gates')
+        dtype = get_dtype(precision)
+        with self.__lock:
+            final_state = None if get_tracer() is not None else entry.final_states.get(dtype)
+        if final_state is None:
+            register = entry.compiled.apply_to_state(StateVector(circuit.input_size, dtype))
+            if circuit.input_size > MAX_CACHED_STATE_QUBITS:
+                return register
+            with self.__lock:
+                final_state = entry.final_states.setdefault(dtype, register.amplitudes.copy())
+                self.__store(key, entry)
+
+        # Stored arrays are never written to, so the copy can be taken outside the lock.
+        register = StateVector(circuit.input_size, dtype)
+        register.amplitudes[:] = final_state
+        return register
+
+    def get_unitary(self, circuit):
+        # Always complex128, whatever the default precision.
+        key, entry = self.__get_entry(circuit)
+        if not entry.compiled.is_unitary:
+            raise UnsupportedOperationError('compiled circuit cache', 'mid-circuit measurement or classically conditioned gates')
+        with self.__lock:
+            unitary = entry.unitary
+        if unitary is None:
+            # Column k of the unitary is the circuit applied to the basis state |k⟩.
+            unitary = entry.compiled.apply_to_state(BatchedStateVector.from_states(np.eye(2 ** circuit.input_size), 'complex128')).amplitudes
+            if circuit.input_size > MAX_CACHED_UNITARY_QUBITS:
+                return unitary
+            with self.__lock:
+                if entry.unitary is None:
+                    entry.unitary = unitary.copy()
+                unitary = entry.unitary
+                self.__store(key, entry)
+        return unitary.copy()
+
+    def clear(self):
+        # Empties the memory tier only; files in the directory are left for the next process.
+        with self.__lock:
+            self.__entries.clear()
+            self.__entry_bytes.clear()
+            self.__bytes = 0
+
+    def __get_entry(self, circuit):
+        key = circuit.structural_hash
+        with self.__lock:
+            if key in self.__entries:
+                self.__hits += 1
+                self.__entries.move_to_end(key)
+                return key, self.__entries[key]
+
+        entry = self.__load(key)
+        if entry is not None:
+            with self.__lock:
+                self.__disk_hits += 1
+            entry.compiled.on_resize = partial(self.__resize, key, entry)
+            self.__store(key, entry, write=False)
+            return key, entry
+
+        with self.__lock:
+            self.__misses += 1
+        entry = CachedCircuit(compile_gates(circuit.gate_table, circuit.input_size))
+        entry.compiled.on_resize = partial(self.__resize, key, entry)
+        self.__store(key, entry)
+        return key, entry
+
+    def __resize(self, key, entry, _):
+        # Called when the compiled circuit gains matrices in another dtype, which may happen outside
+        # the cache, e.g. while a branch tree runs it. An entry that was evicted meanwhile is ignored.
+        with self.__lock:
+            if self.__entries.get(key) is entry:
+                self.__bytes += entry.nbytes - self.__entry_bytes[key]
+                self.__entry_bytes[key] = entry.nbytes
+                self.__evict()
+
+    def __store(self, key, entry, write=True):
+        # Sizes are recorded at store time, since an entry grows when a state or unitary is added to it.
+        # The entry is pickled under the lock, so no other thread changes it halfway through.
+        with self.__lock:
+            if key in self.__entries:
+                del self.__entries[key]
+                self.__bytes -= self.__entry_bytes.pop(key)
+            self.__entries[key] = entry
+            self.__entry_bytes[key] = entry.nbytes
+            self.__bytes += self.__entry_bytes[key]
+            self.__evict()
+            data = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL) if write and self.directory is not None else None
+        if data is not None:
+            self.__write(key, data)
+
+    def __evict(self):
+        with self.__lock:
+            while self.__bytes > self.max_bytes and self.__entries:
+                evicted_key, _ = self.__entries.popitem(last=False)
+                self.__bytes -= self.__entry_bytes.pop(evicted_key)
+                self.__evictions += 1
+
+    def __get_path(self, key):
+        return os.path.join(self.directory, key + CACHE_FILE_SUFFIX)
+
+    def __load(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.__get_path(key), 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def __write(self, key, data):
+        # Written to a temporary file and renamed, so a reader never sees half an entry.
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            os.replace(temporary_path, self.__get_path(key))
+        except BaseException:
+            os.remove(temporary_path)
+            raise
+
+
+_default_cache = CompiledCircuitCache()
+
+
+def get_default_cache():
+    return _default_cache
+
+
+def set_default_cache(cache):
+    global _default_cache
+    _default_cache = cache
@@ -0,0 +1,181 @@
+import time
+from collections import namedtuple
+import numpy as np
+from src.statevector import gate_wires
+from src.tracing import get_tracer
+
+CompiledOperation = namedtuple('CompiledOperation', ['matrix', 'wires', 'gates', 'condition'], defaults=[None])
+CompiledMeasurement = namedtuple('CompiledMeasurement', ['target', 'bit'])
+FusionReport = namedtuple('FusionReport', ['original_operations', 'compiled_operations', 'fused_operations'])
+
+IDENTITY = np.eye(2, dtype=np.complex128)
+SWAP_PERMUTATION = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=np.complex128)
+
+
+class CompiledCircuit:
+    def __init__(self, input_size, operations, report, num_bits=0):
+        self.input_size = input_size
+        self.operations = operations
+        self.report = report
+        self.num_bits = num_bits
+        self.is_unitary = all(is_unconditional_operation(operation) for operation in operations)
+        self.__matrices = {}
+        # Called with the circuit whenever get_matrices converts it to another dtype, so that an owner
+        # such as the compiled-circuit cache can account for the memory. It is not pickled.
+        self.on_resize = None
+
+    def __getstate__(self):
+        return dict(self.__dict__, on_resize=None)
+
+    def __len__(self):
+        return len(self.operations)
+
+    def apply_to_state(self, register, classical_bits=None, rng=None):
+        # Measurements collapse the register at random, so a circuit with mid-circuit measurement
+        # runs one trajectory here, drawn from rng; QuantumCircuitRunner enumerates every branch instead.
+        if classical_bits is None:
+            classical_bits = [0] * self.num_bits
+        matrices = self.get_matrices(register.dtype)
+        tracer = get_tracer()
+        if tracer is not None:
+            return self.__apply_traced(register, classical_bits, matrices, tracer, rng)
+        for operation, matrix in zip(self.operations, matrices):
+            if isinstance(operation, CompiledMeasurement):
+                classical_bits[operation.bit] = register.measure(operation.target, rng)
+            elif is_condition_met(operation.condition, classical_bits):
+                register.apply_matrix(matrix, operation.wires)
+        return register
+
+    @property
+    def nbytes(self):
+        # The fused matrices and every conversion of them; complex128 conversions are the fused arrays themselves.
+        arrays = {id(operation.matrix): operation.matrix for operation in self.operations if hasattr(operation, 'matrix')}
+        arrays.update((id(matrix), matrix) for matrices in self.__matrices.values() for matrix in matrices if matrix is not None)
+        return sum(array.nbytes for array in arrays.values())
+
+    def get_matrices(self, dtype):
+        # The operation matrices in a register's amplitude dtype, converted once per dtype from the
+        # complex128 matrices the circuit was fused in; None stands in for each measurement. The dict
+        # is replaced rather than updated, so a thread pickling or sizing the circuit never sees it change.
+        dtype = np.dtype(dtype)
+        if dtype not in self.__matrices:
+            matrices = [None if isinstance(operation, CompiledMeasurement) else np.asarray(operation.matrix, dtype=dtype)
+                        for operation in self.operations]
+            self.__matrices = {**self.__matrices, dtype: matrices}
+            if self.on_resize is not None:
+                self.on_resize(self)
+        return self.__matrices[dtype]
+
+    def __apply_traced(self, register, classical_bits, matrices, tracer, rng):
+        # The same loop as apply_to_state, timing each operation that runs into the tracer.
+        for operation, matrix in zip(self.operations, matrices):
+            start = time.perf_counter()
+            if isinstance(operation, CompiledMeasurement):
+                classical_bits[operation.bit] = register.measure(operation.target, rng)
+                tracer.record(('measure',), (operation.target,), start, time.perf_counter(), register)
+            elif is_condition_met(operation.condition, classical_bits):
+                register.apply_matrix(matrix, operation.wires)
+                tracer.record(operation.gates, operation.wires, start, time.perf_counter(), register)
+        return register
+
+
+def is_unconditional_operation(operation):
+    return isinstance(operation, CompiledOperation) and operation.condition is None
+
+
+def is_condition_met(condition, classical_bits):
+    return condition is None or classical_bits[condition[0]] == condition[1]
+
+
+class _Block:
+    def __init__(self, matrix, wires, gates):
+        self.matrix = matrix
+        self.wires = wires
+        self.gates = gates
+
+
+def compile_gates(gates, input_size):
+    # Measurements and classically conditioned gates are barriers: the unconditional runs between
+    # them are fused on their own and the barriers are kept in place.
+    operations = []
+    segment = []
+    num_bits = 0
+    for gate_tuple in gates:
+        if not gate_tuple.gate.is_measurement() and gate_tuple.condition is None:
+            segment.append(gate_tuple)
+            continue
+
+        operations += fuse_gates(segment, input_size)
+        segment = []
+        if gate_tuple.gate.is_measurement():
+            operations.append(CompiledMeasurement(gate_tuple.target, gate_tuple.bit))
+            num_bits = max(num_bits, gate_tuple.bit + 1)
+        else:
+            operations.append(CompiledOperation(gate_tuple.gate.matrix, gate_wires(gate_tuple.target, gate_tuple.control), (gate_tuple.gate.name,), gate_tuple.condition))
+            num_bits = max(num_bits, gate_tuple.condition[0] + 1)
+    operations += fuse_gates(segment, input_size)
+
+    report = FusionReport(original_operations=len(gates),
+                          compiled_operations=len(operations),
+                          fused_operations=len(gates) - len(operations))
+    return CompiledCircuit(input_size, operations, report, num_bits)
+
+
+def fuse_gates(gates, input_size):
+    # Single-qubit gates wait on their wire until a two-qubit gate touches it, and are then folded
+    # into that block. Single-qubit gates arriving after a block are folded into it as well: nothing
+    # between the block and the gate touches the wire, so the gate commutes back to the block.
+    blocks = []
+    last_block = [None] * input_size
+    pending = [None] * input_size
+
+    for gate_tuple in gates:
+        matrix = np.asarray(gate_tuple.gate.matrix, dtype=np.complex128)
+        name = gate_tuple.gate.name
+        wires = gate_wires(gate_tuple.target, gate_tuple.control)
+
+        if len(wires) == 1:
+            wire = wires[0]
+            block = last_block[wire]
+            if block is not None:
+                block.matrix = _embed(matrix, block.wires.index(wire)) @ block.matrix
+                block.gates.append(name)
+            elif pending[wire] is not None:
+                pending[wire].matrix = matrix @ pending[wire].matrix
+                pending[wire].gates.append(name)
+            else:
+                pending[wire] = _Block(matrix, wires, [name])
+            continue
+
+        first, second = wires
+        absorbed = []
+        before = []
+        for wire in wires:
+            if pending[wire] is not None:
+                absorbed += pending[wire].gates
+                before.append(pending[wire].matrix)
+                pending[wire] = None
+            else:
+                before.append(IDENTITY)
+        matrix = matrix @ np.kron(before[0], before[1])
+
+        block = last_block[first]
+        if block is not None and block is last_block[second]:
+            if block.wires != wires:
+                matrix = SWAP_PERMUTATION @ matrix @ SWAP_PERMUTATION
+            block.matrix = matrix @ block.matrix
+            block.gates += absorbed + [name]
+        else:
+            block = _Block(matrix, wires, absorbed + [name])
+            blocks.append(block)
+            last_block[first] = last_block[second] = block
+
+    blocks += [block for block in pending if block is not None]
+    return [CompiledOperation(np.ascontiguousarray(block.matrix), block.wires, tuple(block.gates))
+            for block in blocks if not np.allclose(block.matrix, np.eye(len(block.matrix)))]
+
+
+def _embed(matrix, position):
+    if position == 0:
+        return np.kron(matrix, IDENTITY)
+    return np.kron(IDENTITY, matrix)
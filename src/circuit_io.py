@@ -0,0 +1,362 @@
+import ast
+import io
+import math
+import operator
+import os
+import re
+from contextlib import contextmanager
+from types import MappingProxyType
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import GateNotFoundError, UnsupportedOperationError
+from src.gate_table import GATE_RECORD_DTYPE, NO_INDEX
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import MEASURE_GATE, get_gate
+
+QASM_CHUNK_SIZE = 2 ** 20
+BINARY_CHUNK_RECORDS = 2 ** 16
+
+# OpenQASM 2 names (qelib1.inc, plus the common p alias of u1) for the gates in get_quantum_gate_list
+# and the parametric gates. `cx a, b` flips b when a is set, which is add_gate('cnot', a, b).
+QASM_GATE_NAMES = MappingProxyType({'id': 'identity',
+                                    'x': 'pauli_x',
+                                    'y': 'pauli_y',
+                                    'z': 'pauli_z',
+                                    'h': 'hadamard',
+                                    's': 'phase',
+                                    't': 't_gate',
+                                    'swap': 'swap',
+                                    'cx': 'cnot',
+                                    'CX': 'cnot',
+                                    'rx': 'rx',
+                                    'ry': 'ry',
+                                    'rz': 'rz',
+                                    'u1': 'phase',
+                                    'p': 'phase'})
+QASM_EXPORT_NAMES = MappingProxyType({'identity': 'id',
+                                      'pauli_x': 'x',
+                                      'not': 'x',
+                                      'pauli_y': 'y',
+                                      'pauli_z': 'z',
+                                      'hadamard': 'h',
+                                      'phase': 's',
+                                      't_gate': 't',
+                                      'swap': 'swap',
+                                      'cnot': 'cx'})
+QASM_EXPORT_PARAMETRIC_NAMES = MappingProxyType({'rx': 'rx', 'ry': 'ry', 'rz': 'rz', 'phase': 'u1'})
+
+QASM_COMMENT = re.compile(r'//[^\n]*')
+QASM_STATEMENT = re.compile(r'(?:if\s*\(\s*(\w+)\s*==\s*(\d+)\s*\)\s*)?(\w+)\s*(?:\(([^)]*)\))?\s*(.*)', re.S)
+# One statement per match: the statement text, then the gate text (name and parameters) and one or
+# two reg[index] arguments when it has the shape of a plain gate.
+QASM_CHUNK_STATEMENT = re.compile(r'\s*(([a-z]\w*\s*(?:\([^)]*\)\s*|\s))\s*(\w+)\s*\[\s*(\d+)\s*\](?:\s*,\s*(\w+)\s*\[\s*(\d+)\s*\])?|[^;]*?)\s*;')
+QASM_ARGUMENT = re.compile(r'\s*(\w+)\s*\[\s*(\d+)\s*\]\s*')
+QASM_IGNORED_STATEMENTS = frozenset(['OPENQASM', 'include', 'barrier'])
+QASM_UNSUPPORTED_STATEMENTS = frozenset(['gate', 'opaque', 'reset', 'U'])
+
+BINARY_CIRCUIT_MAGIC = b'QCCIRC01'
+# Magic bytes, then the number of qubits and of gate kinds as little-endian uint32 and the number of
+# records as a uint64. Each gate kind follows as a length-prefixed name and its float64 parameters,
+# then the GATE_RECORD_DTYPE records, whose gate column indexes the gate kinds.
+BINARY_CIRCUIT_HEADER = np.dtype([('magic', 'S8'), ('num_qubits', '<u4'), ('num_gates', '<u4'), ('num_records', '<u8')])
+
+PARAMETER_OPERATORS = MappingProxyType({ast.Add: operator.add,
+                                        ast.Sub: operator.sub,
+                                        ast.Mult: operator.mul,
+                                        ast.Div: operator.truediv,
+                                        ast.Pow: operator.pow,
+                                        ast.USub: operator.neg,
+                                        ast.UAdd: operator.pos})
+
+
+@contextmanager
+def open_stream(destination, mode):
+    if hasattr(destination, 'read') or hasattr(destination, 'write'):
+        yield destination
+    else:
+        with open(os.fspath(destination), mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as file:
+            yield file
+
+
+def evaluate_parameter(expression):
+    # Gate parameters are arithmetic on numbers and pi; anything else is rejected rather than evaluated.
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name) and node.id == 'pi':
+            return math.pi
+        if isinstance(node, ast.BinOp) and type(node.op) in PARAMETER_OPERATORS:
+            return PARAMETER_OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and type(node.op) in PARAMETER_OPERATORS:
+            return PARAMETER_OPERATORS[type(node.op)](evaluate(node.operand))
+        raise ValueError(f"Unsupported gate parameter: {expression}")
+
+    return float(evaluate(ast.parse(expression.strip(), mode='eval')))
+
+
+class QasmLoader:
+    # Statements are parsed a chunk at a time into record columns, and each chunk is appended to the
+    # circuit as one record array. Gates are resolved once per distinct name and parameter text.
+    def __init__(self):
+        self.circuit = None
+        self.__quantum_registers = {}
+        self.__classical_registers = {}
+        self.__num_qubits = 0
+        self.__num_bits = 0
+        self.__gates = []
+        self.__gate_indices = {}
+
+    def load(self, file, chunk_size=QASM_CHUNK_SIZE):
+        pending = ''
+        while True:
+            chunk = file.read(chunk_size)
+            text = pending + chunk
+            # Chunks are cut after their last ';', so only the statement left open is carried into the
+            # next chunk however the file is split into lines. Comments on complete lines are removed
+            # first; one still open at the end of the chunk is carried as its '//' alone, since the rest
+            # of it is dropped anyway, and a trailing '/' is held back in case it starts one.
+            held = ''
+            if chunk:
+                line_end = text.rfind('\n') + 1
+                code, tail = QASM_COMMENT.sub('', text[:line_end]), text[line_end:]
+                comment_start = tail.find('//')
+                if comment_start >= 0:
+                    tail, held = tail[:comment_start], '//'
+                elif tail.endswith('/'):
+                    tail, held = tail[:-1], '/'
+                code += tail
+            else:
+                code = QASM_COMMENT.sub('', text)
+            statements_end = code.rfind(';') + 1
+            pending = code[statements_end:] + held
+            self.__parse_statements(QASM_CHUNK_STATEMENT.findall(code[:statements_end]))
+            if not chunk:
+                break
+        if pending.strip():
+            raise ValueError(f"Unterminated OpenQASM statement: {pending.strip()}")
+        return self.__get_circuit()
+
+    def __parse_statements(self, rows):
+        if not rows:
+            return
+        statements, gate_texts, registers, indices, control_registers, control_indices = zip(*rows)
+        gate_indices = {text: self.__get_plain_gate_index(text) for text in dict.fromkeys(gate_texts)}
+        gate_column = np.fromiter(map(gate_indices.__getitem__, gate_texts), dtype=np.int32, count=len(rows))
+        fast = gate_column != NO_INDEX
+        records = np.zeros(len(rows), dtype=GATE_RECORD_DTYPE)
+        has_record = fast.copy()
+
+        # Declarations, measurements, conditions and anything unusual go through the full parser in
+        # statement order. The circuit exists from the first gate on, so a later qreg is rejected.
+        first_gate_row = int(np.argmax(fast)) if fast.any() else len(rows)
+        for row in np.flatnonzero(~fast).tolist():
+            if row > first_gate_row:
+                self.__get_circuit()
+            record = self.__parse_statement(statements[row]) if statements[row] else None
+            if record is not None:
+                records[row] = record
+                has_record[row] = True
+                first_gate_row = min(first_gate_row, row)
+
+        # Plain gates are resolved column-wise, once per distinct gate text and register name.
+        if fast.all():
+            targets = self.__get_indices(self.__quantum_registers, registers, indices)
+        else:
+            fast_rows = np.flatnonzero(fast).tolist()
+            targets = np.full(len(rows), NO_INDEX, dtype=np.int64)
+            targets[fast_rows] = self.__get_indices(self.__quantum_registers, [registers[row] for row in fast_rows],
+                                                    [indices[row] for row in fast_rows])
+        controls = np.full(len(rows), NO_INDEX, dtype=np.int64)
+        control_rows = [row for row, register in enumerate(control_registers) if register and fast[row]]
+        controls[control_rows] = self.__get_indices(self.__quantum_registers, [control_registers[row] for row in control_rows],
+                                                    [control_indices[row] for row in control_rows])
+        records['gate'][fast] = gate_column[fast]
+        records['target'][fast] = targets[fast]
+        records['control'][fast] = controls[fast]
+        records['condition_bit'][fast] = NO_INDEX
+        records['bit'][fast] = NO_INDEX
+        if has_record.any():
+            self.__get_circuit().add_gate_records(self.__gates, records[has_record])
+
+    def __parse_statement(self, statement):
+        match = QASM_STATEMENT.fullmatch(statement)
+        if match is None:
+            raise ValueError(f"Invalid OpenQASM statement: {statement}")
+        condition_register, condition_value, name, params, arguments = match.groups()
+        if name in QASM_IGNORED_STATEMENTS and condition_register is None:
+            return None
+        if name in QASM_UNSUPPORTED_STATEMENTS:
+            raise UnsupportedOperationError('OpenQASM loader', f"'{name}' statements")
+        if name in ['qreg', 'creg']:
+            self.__declare_register(name, arguments)
+            return None
+
+        condition_bit, value = NO_INDEX, 0
+        if condition_register is not None:
+            offset, size = self.__get_register(self.__classical_registers, condition_register)
+            if size != 1:
+                raise UnsupportedOperationError('OpenQASM loader', f"conditions on the {size}-bit register '{condition_register}'")
+            condition_bit, value = offset, int(condition_value)
+
+        if name == 'measure':
+            qubit, bit = arguments.split('->')
+            return (self.__get_gate_index(MEASURE_GATE, name, ''), self.__get_index(self.__quantum_registers, qubit), NO_INDEX,
+                    condition_bit, value, self.__get_index(self.__classical_registers, bit))
+        if name not in QASM_GATE_NAMES:
+            raise GateNotFoundError(name)
+
+        wires = [self.__get_index(self.__quantum_registers, argument) for argument in arguments.split(',')]
+        gate_index = self.__get_gate_index(None, name, params or '')
+        return gate_index, wires[0], wires[1] if len(wires) > 1 else NO_INDEX, condition_bit, value, NO_INDEX
+
+    def __get_plain_gate_index(self, text):
+        name, _, params = text.partition('(')
+        name = name.strip()
+        if name not in QASM_GATE_NAMES:
+            return NO_INDEX
+        return self.__get_gate_index(None, name, params.strip()[:-1].strip())
+
+    def __get_gate_index(self, gate, name, params):
+        key = (name, params)
+        if key not in self.__gate_indices:
+            if gate is None:
+                gate = get_gate(QASM_GATE_NAMES[name], tuple(evaluate_parameter(param) for param in params.split(',') if param.strip()))
+            self.__gate_indices[key] = len(self.__gates)
+            self.__gates.append(gate)
+        return self.__gate_indices[key]
+
+    def __declare_register(self, kind, arguments):
+        match = QASM_ARGUMENT.fullmatch(arguments)
+        if match is None:
+            raise ValueError(f"Invalid register declaration: {kind} {arguments}")
+        register_name, size = match.group(1), int(match.group(2))
+        if kind == 'qreg':
+            if self.circuit is not None:
+                raise ValueError(f"Quantum register '{register_name}' is declared after the first gate.")
+            self.__quantum_registers[register_name] = (self.__num_qubits, size)
+            self.__num_qubits += size
+        else:
+            self.__classical_registers[register_name] = (self.__num_bits, size)
+            self.__num_bits += size
+
+    def __get_register(self, registers, name):
+        if name not in registers:
+            raise ValueError(f"Undeclared register: {name}")
+        return registers[name]
+
+    def __get_index(self, registers, argument):
+        match = QASM_ARGUMENT.fullmatch(argument)
+        if match is None:
+            raise ValueError(f"Unsupported OpenQASM argument: {argument.strip()}")
+        offset, size = self.__get_register(registers, match.group(1))
+        index = int(match.group(2))
+        if index >= size:
+            raise ValueError(f"Index {index} is out of range for register '{match.group(1)}' of size {size}.")
+        return offset + index
+
+    def __get_indices(self, registers, names, indices):
+        register_ids = {name: register_id for register_id, name in enumerate(dict.fromkeys(names))}
+        offsets, sizes = np.array([self.__get_register(registers, name) for name in register_ids], dtype=np.int64).reshape(-1, 2).T
+        name_rows = np.fromiter(map(register_ids.__getitem__, names), dtype=np.intp, count=len(names))
+        indices = np.fromiter(map(int, indices), dtype=np.int64, count=len(indices))
+        out_of_range = indices >= sizes[name_rows]
+        if out_of_range.any():
+            row = int(np.argmax(out_of_range))
+            return self.__get_index(registers, f'{names[row]}[{indices[row]}]')
+        return offsets[name_rows] + indices
+
+    def __get_circuit(self):
+        if self.circuit is None:
+            self.circuit = QuantumCircuit(self.__num_qubits)
+        return self.circuit
+
+
+def load_qasm(source, chunk_size=QASM_CHUNK_SIZE):
+    with open_stream(source, 'r') as file:
+        return QasmLoader().load(file, chunk_size)
+
+
+def load_qasm_string(text):
+    return load_qasm(io.StringIO(text))
+
+
+def save_qasm(circuit, destination, chunk_size=BINARY_CHUNK_RECORDS):
+    # Every classical bit gets its own one-bit register, so single-bit conditions survive the round trip.
+    gate_table = circuit.gate_table
+    records = gate_table.records
+    num_bits = int(max(records['bit'].max(initial=NO_INDEX), records['condition_bit'].max(initial=NO_INDEX))) + 1
+    templates = [get_qasm_template(gate) for gate in gate_table.gates]
+
+    with open_stream(destination, 'w') as file:
+        file.write('OPENQASM 2.0;\ninclude "qelib1.inc";\n')
+        file.write(f'qreg q[{circuit.input_size}];\n')
+        file.write(''.join(f'creg c{bit}[1];\n' for bit in range(num_bits)))
+        for start in range(0, len(records), chunk_size):
+            lines = []
+            for gate_index, target, control, condition_bit, condition_value, bit in records[start:start + chunk_size].tolist():
+                prefix = '' if condition_bit == NO_INDEX else f'if(c{condition_bit}=={condition_value}) '
+                lines.append(prefix + templates[gate_index].format(target=target, control=control, bit=bit))
+            file.write('\n'.join(lines) + '\n')
+
+
+def to_qasm_string(circuit):
+    buffer = io.StringIO()
+    save_qasm(circuit, buffer)
+    return buffer.getvalue()
+
+
+def get_qasm_template(gate):
+    if gate.is_measurement():
+        return 'measure q[{target}] -> c{bit}[0];'
+    if gate.params:
+        params = ','.join(repr(param) for param in gate.params)
+        return f'{QASM_EXPORT_PARAMETRIC_NAMES[gate.name]}({params}) q[{{target}}];'
+    if gate.name not in QASM_EXPORT_NAMES:
+        raise UnsupportedOperationError('OpenQASM exporter', f"the gate '{gate.name}'")
+    if gate.is_two_qubit_gate():
+        return f'{QASM_EXPORT_NAMES[gate.name]} q[{{target}}],q[{{control}}];'
+    return f'{QASM_EXPORT_NAMES[gate.name]} q[{{target}}];'
+
+
+def save_binary_circuit(circuit, destination, chunk_size=BINARY_CHUNK_RECORDS):
+    gate_table = circuit.gate_table
+    records = gate_table.records
+    header = np.array([(BINARY_CIRCUIT_MAGIC, circuit.input_size, len(gate_table.gates), len(records))], dtype=BINARY_CIRCUIT_HEADER)
+    with open_stream(destination, 'wb') as file:
+        file.write(header.tobytes())
+        for gate in gate_table.gates:
+            name = gate.name.encode('utf-8')
+            file.write(bytes([len(name)]) + name + bytes([len(gate.params)]) + np.array(gate.params, dtype='<f8').tobytes())
+        for start in range(0, len(records), chunk_size):
+            file.write(records[start:start + chunk_size].tobytes())
+
+
+def load_binary_circuit(source, chunk_size=BINARY_CHUNK_RECORDS):
+    with open_stream(source, 'rb') as file:
+        header = np.frombuffer(read_exactly(file, BINARY_CIRCUIT_HEADER.itemsize), dtype=BINARY_CIRCUIT_HEADER)[0]
+        if header['magic'] != BINARY_CIRCUIT_MAGIC:
+            raise ValueError("Not a binary circuit file.")
+
+        gates = []
+        for _ in range(int(header['num_gates'])):
+            name = read_exactly(file, read_exactly(file, 1)[0]).decode('utf-8')
+            params = tuple(np.frombuffer(read_exactly(file, 8 * read_exactly(file, 1)[0]), dtype='<f8').tolist())
+            gates.append(MEASURE_GATE if name == MEASURE_GATE.name else get_gate(name, params))
+
+        circuit = QuantumCircuit(int(header['num_qubits']))
+        num_records = int(header['num_records'])
+        for start in range(0, num_records, chunk_size):
+            count = min(chunk_size, num_records - start)
+            records = np.frombuffer(read_exactly(file, count * GATE_RECORD_DTYPE.itemsize), dtype=GATE_RECORD_DTYPE)
+            if np.any((records['gate'] < 0) | (records['gate'] >= len(gates))):
+                raise ValueError("Binary circuit record refers to an unknown gate.")
+            circuit.add_gate_records(gates, records)
+        return circuit
+
+
+def read_exactly(file, size):
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Binary circuit file is truncated.")
+    return data
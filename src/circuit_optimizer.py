@@ -0,0 +1,199 @@
+from collections import namedtuple
+from types import MappingProxyType
+import numpy as np
+from src.gate_table import get_gate_key
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_gate
+from src.statevector import gate_wires
+
+# Number of earlier gates on a gate's wires that a pass looks through for a partner.
+COMMUTATION_WINDOW = 16
+DEFAULT_MAX_ROUNDS = 4
+ANGLE_TOLERANCE = 1e-12
+
+# diag(1, e^{iθ}) gates by angle; merged phases are written back as the named gate where one exists.
+PHASE_GATE_ANGLES = MappingProxyType({'t_gate': np.pi / 4, 'phase': np.pi / 2, 'pauli_z': np.pi})
+
+OptimizationStats = namedtuple('OptimizationStats', ['gates_before', 'gates_after', 'depth_before', 'depth_after'])
+OptimizationResult = namedtuple('OptimizationResult', ['circuit', 'stats'])
+
+
+def is_unitary_gate(gate_tuple):
+    return not gate_tuple.gate.is_measurement() and gate_tuple.condition is None
+
+
+def get_phase_angle(gate):
+    # The angle of a diag(1, e^{iθ}) gate, or None for any other gate.
+    if gate.name == 'phase' and gate.params:
+        return gate.params[0]
+    if not gate.params:
+        return PHASE_GATE_ANGLES.get(gate.name)
+    return None
+
+
+def get_phase_gate(angle):
+    angle = float(np.mod(angle, 2 * np.pi))
+    if min(angle, 2 * np.pi - angle) < ANGLE_TOLERANCE:
+        return None
+    for name, named_angle in PHASE_GATE_ANGLES.items():
+        if abs(angle - named_angle) < ANGLE_TOLERANCE:
+            return get_gate(name)
+    return get_gate('phase', (angle,))
+
+
+class CommutationRules:
+    # Matrix facts about gate kinds, worked out once per kind and shared by the passes of one run.
+    # A gate commutes with Z (X) on one of its wires when it is block diagonal in that wire's Z (X)
+    # basis. Two gates commute when, on every wire they share, both commute with the same one of
+    # Z and X: in that basis both are block diagonal and the blocks act on disjoint wires.
+    PAULIS = MappingProxyType({'z': np.diag([1, -1]).astype(np.complex128), 'x': np.array([[0, 1], [1, 0]], dtype=np.complex128)})
+
+    def __init__(self):
+        self.__wire_bases = {}
+        self.__inverses = {}
+        self.__identities = {}
+
+    def is_identity(self, gate):
+        key = get_gate_key(gate)
+        if key not in self.__identities:
+            self.__identities[key] = not gate.is_measurement() and bool(np.allclose(gate.matrix, np.eye(len(gate.matrix))))
+        return self.__identities[key]
+
+    def commute(self, first, second):
+        shared_wires = set(gate_wires(first.target, first.control)) & set(gate_wires(second.target, second.control))
+        for wire in shared_wires:
+            if not self.__get_wire_bases(first, wire) & self.__get_wire_bases(second, wire):
+                return False
+        return True
+
+    def are_inverses(self, first, second):
+        if (first.target, first.control) != (second.target, second.control):
+            return False
+        key = (get_gate_key(first.gate), get_gate_key(second.gate))
+        if key not in self.__inverses:
+            product = np.asarray(second.gate.matrix) @ np.asarray(first.gate.matrix)
+            self.__inverses[key] = bool(np.allclose(product, np.eye(len(product))))
+        return self.__inverses[key]
+
+    def __get_wire_bases(self, gate_tuple, wire):
+        position = gate_wires(gate_tuple.target, gate_tuple.control).index(wire)
+        key = (get_gate_key(gate_tuple.gate), position)
+        if key not in self.__wire_bases:
+            matrix = np.asarray(gate_tuple.gate.matrix, dtype=np.complex128)
+            bases = set()
+            for basis, pauli in self.PAULIS.items():
+                if len(matrix) == 4:
+                    pauli = np.kron(pauli, np.eye(2)) if position == 0 else np.kron(np.eye(2), pauli)
+                if np.allclose(matrix @ pauli, pauli @ matrix):
+                    bases.add(basis)
+            self.__wire_bases[key] = frozenset(bases)
+        return self.__wire_bases[key]
+
+
+class _GateWindow:
+    # The output gate list of a pass with, for every wire, the positions of the gates on it. find()
+    # walks back from a new gate through earlier gates on its wires that it commutes with, so the
+    # new gate can be merged with a partner that is not directly next to it.
+    def __init__(self, input_size, rules):
+        self.gates = []
+        self.__wire_positions = [[] for _ in range(input_size)]
+        self.__rules = rules
+
+    def find(self, gate_tuple, is_partner):
+        wires = gate_wires(gate_tuple.target, gate_tuple.control)
+        positions = sorted({position for wire in wires for position in self.__wire_positions[wire][-COMMUTATION_WINDOW:]}, reverse=True)
+        for position in positions[:COMMUTATION_WINDOW]:
+            earlier = self.gates[position]
+            if is_unitary_gate(earlier) and is_partner(earlier):
+                return position
+            if not is_unitary_gate(earlier) or not self.__rules.commute(earlier, gate_tuple):
+                return None
+        return None
+
+    def append(self, gate_tuple):
+        for wire in gate_wires(gate_tuple.target, gate_tuple.control):
+            self.__wire_positions[wire].append(len(self.gates))
+        self.gates.append(gate_tuple)
+
+    def replace(self, position, gate):
+        earlier = self.gates[position]
+        if gate is not None:
+            self.gates[position] = earlier._replace(gate=gate)
+            return
+        self.gates[position] = None
+        for wire in gate_wires(earlier.target, earlier.control):
+            positions = self.__wire_positions[wire]
+            del positions[len(positions) - 1 - positions[::-1].index(position)]
+
+    def get_gates(self):
+        return [gate_tuple for gate_tuple in self.gates if gate_tuple is not None]
+
+
+def drop_identities(gates, input_size, rules):
+    return [gate_tuple for gate_tuple in gates if not rules.is_identity(gate_tuple.gate)]
+
+
+def cancel_inverse_pairs(gates, input_size, rules):
+    # H·H, X·X, CNOT·CNOT, S·S† and every other pair of mutually inverse gates on the same wires.
+    window = _GateWindow(input_size, rules)
+    for gate_tuple in gates:
+        if is_unitary_gate(gate_tuple):
+            position = window.find(gate_tuple, lambda earlier: rules.are_inverses(earlier, gate_tuple))
+            if position is not None:
+                window.replace(position, None)
+                continue
+        window.append(gate_tuple)
+    return window.get_gates()
+
+
+def merge_phase_gates(gates, input_size, rules):
+    # T·T = S, S·S = Z, Z·Z = I and any other run of phase gates on one wire become a single gate.
+    window = _GateWindow(input_size, rules)
+    for gate_tuple in gates:
+        angle = get_phase_angle(gate_tuple.gate) if is_unitary_gate(gate_tuple) else None
+        if angle is not None:
+            position = window.find(gate_tuple, lambda earlier: earlier.target == gate_tuple.target and get_phase_angle(earlier.gate) is not None)
+            if position is not None:
+                window.replace(position, get_phase_gate(get_phase_angle(window.gates[position].gate) + angle))
+                continue
+        window.append(gate_tuple)
+    return window.get_gates()
+
+
+DEFAULT_PASSES = (drop_identities, merge_phase_gates, cancel_inverse_pairs)
+
+
+class CircuitOptimizer:
+    # Runs its passes in order, and the whole pipeline again while it keeps removing gates. A pass
+    # is any function (gates, input_size, rules) -> gates over GateTargetControl lists that keeps
+    # the circuit's unitary and its measurements unchanged.
+    def __init__(self, passes=DEFAULT_PASSES, max_rounds=DEFAULT_MAX_ROUNDS):
+        self.passes = tuple(passes)
+        self.max_rounds = max_rounds
+
+    def optimize(self, circuit):
+        rules = CommutationRules()
+        gates = list(circuit.gates)
+        for _ in range(self.max_rounds):
+            gate_count = len(gates)
+            for optimization_pass in self.passes:
+                gates = optimization_pass(gates, circuit.input_size, rules)
+            if len(gates) == gate_count:
+                break
+
+        optimized = build_circuit(gates, circuit.input_size)
+        return OptimizationResult(optimized, OptimizationStats(len(circuit), len(optimized), circuit.depth, optimized.depth))
+
+
+def build_circuit(gates, input_size):
+    circuit = QuantumCircuit(input_size)
+    for gate_tuple in gates:
+        if gate_tuple.gate.is_measurement():
+            circuit.add_measure(gate_tuple.target, gate_tuple.bit)
+        else:
+            circuit.add_gate(gate_tuple.gate.name, gate_tuple.target, gate_tuple.control, gate_tuple.gate.params, gate_tuple.condition)
+    return circuit
+
+
+def optimize_circuit(circuit, passes=DEFAULT_PASSES):
+    return CircuitOptimizer(passes).optimize(circuit)
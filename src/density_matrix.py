@@ -0,0 +1,61 @@
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError
+from src.statevector import apply_matrix, apply_single_qubit_matrix, apply_two_qubit_matrix, gate_wires
+
+MAX_DENSITY_MATRIX_QUBITS = 13
+
+
+class DensityMatrix:
+    # ρ is stored as one contiguous 4^n array. Read as a 2n-qubit tensor, axes 0..n-1 are the row
+    # qubits and axes n..2n-1 the column qubits, so the statevector kernels apply U to the rows
+    # and U* to the columns without ever forming a 2^n x 2^n operator.
+    def __init__(self, num_qubits):
+        if num_qubits > MAX_DENSITY_MATRIX_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_DENSITY_MATRIX_QUBITS)
+
+        self.num_qubits = num_qubits
+        self.__rho = np.zeros(4 ** num_qubits, dtype=np.complex128)
+        self.__scratch = np.empty_like(self.__rho)
+        self.__rho[0] = 1
+
+    @classmethod
+    def from_state(cls, state):
+        amplitudes = np.ravel(state)
+        density_matrix = cls(int(np.log2(len(amplitudes))))
+        np.outer(amplitudes, np.conj(amplitudes), out=density_matrix.matrix)
+        return density_matrix
+
+    @property
+    def matrix(self):
+        return self.__rho.reshape(2 ** self.num_qubits, 2 ** self.num_qubits)
+
+    def trace(self):
+        return np.trace(self.matrix).real
+
+    def apply_gate(self, gate, target, control=None):
+        self.apply_matrix(gate.matrix, gate_wires(target, control))
+
+    def apply_matrix(self, matrix, wires):
+        self.__apply(matrix, wires)
+        self.__apply(np.conj(matrix), tuple(self.num_qubits + wire for wire in wires))
+
+    def apply_channel(self, channel, wire):
+        apply_two_qubit_matrix(self.__rho, channel.superoperator, (wire, self.num_qubits + wire), self.__scratch)
+        self.__rho, self.__scratch = self.__scratch, self.__rho
+
+    def probabilities(self, noise_model=None):
+        probabilities = np.ascontiguousarray(self.matrix.diagonal().real)
+        if noise_model is None:
+            return probabilities
+
+        scratch = np.empty_like(probabilities)
+        for qubit in range(self.num_qubits):
+            readout_error = noise_model.readout_error(qubit)
+            if readout_error is not None:
+                apply_single_qubit_matrix(probabilities, readout_error.confusion_matrix, qubit, scratch)
+                probabilities, scratch = scratch, probabilities
+        return probabilities
+
+    def __apply(self, matrix, wires):
+        apply_matrix(self.__rho, matrix, wires, self.__scratch)
+        self.__rho, self.__scratch = self.__scratch, self.__rho
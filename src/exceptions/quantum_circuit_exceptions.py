@@ -11,6 +11,15 @@ class GateNotFoundError(QuantumCircuitError):
         super().__init__(f"Gate '{gate_name}' not found in supported gates.")
 
 
+class InvalidGateParametersError(QuantumCircuitError):
+    """Exception raised when a gate gets the wrong number of parameters."""
+
+    def __init__(self, gate_name, params):
+        self.gate_name = gate_name
+        self.params = params
+        super().__init__(f"Invalid parameters for gate '{gate_name}': {params}")
+
+
 class InvalidGatePositionError(QuantumCircuitError):
     """Exception raised for invalid positions of gates in the quantum circuit."""
 
@@ -45,8 +54,44 @@ class QubitMismatchError(QuantumCircuitError):
 
 
 class ExceedsQubitLimitError(QuantumCircuitError):
-    """Exception raised when attempting to apply a circuit to more than two qubits."""
+    """Exception raised when attempting to simulate more qubits than the backend supports."""
 
-    def __init__(self, number_of_qubits):
+    def __init__(self, number_of_qubits, max_qubits):
         self.number_of_qubits = number_of_qubits
-        super().__init__("Circuit cannot be applied to more than two qubits.")
+        self.max_qubits = max_qubits
+        super().__init__(f"Circuit cannot be applied to {number_of_qubits} qubits, the limit is {max_qubits}.")
+
+
+class InvalidPauliStringError(QuantumCircuitError):
+    """Exception raised when a Pauli string does not match the circuit width or uses unknown symbols."""
+
+    def __init__(self, pauli_string, num_qubits):
+        self.pauli_string = pauli_string
+        self.num_qubits = num_qubits
+        super().__init__(f"Invalid Pauli string '{pauli_string}' for {num_qubits} qubits, expected one of I, X, Y, Z per qubit.")
+
+
+class InvalidConditionError(QuantumCircuitError):
+    """Exception raised when a classical condition is not a (bit, value) pair with a non-negative bit and a 0/1 value."""
+
+    def __init__(self, condition):
+        self.condition = condition
+        super().__init__(f"Invalid classical condition: {condition}")
+
+
+class UnsupportedOperationError(QuantumCircuitError):
+    """Exception raised when a simulation backend cannot run an operation in the circuit."""
+
+    def __init__(self, backend, operation):
+        self.backend = backend
+        self.operation = operation
+        super().__init__(f"The {backend} backend does not support {operation}.")
+
+
+class JobTimeoutError(QuantumCircuitError, TimeoutError):
+    """Exception raised when a simulation job does not finish within its timeout."""
+
+    def __init__(self, job_id, timeout):
+        self.job_id = job_id
+        self.timeout = timeout
+        super().__init__(f"Simulation job {job_id} did not finish within {timeout} seconds.")
@@ -0,0 +1,211 @@
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError
+from src.precision import get_dtype
+from src.statevector import MAX_STATEVECTOR_QUBITS, StateVector, gate_wires
+
+MAX_CLUSTER_QUBITS = MAX_STATEVECTOR_QUBITS
+
+
+class FactorizedState:
+    # A product of small statevectors. Qubits are grouped into clusters with a union-find over qubit
+    # indices, and each cluster root owns a StateVector whose axis i is the cluster's i-th member.
+    # Clusters merge only when a two-qubit gate joins them, and a qubit is split back out as soon as
+    # its Schmidt rank against the rest of its cluster drops to one, so memory follows the largest
+    # entangled cluster instead of 2^n. Every cluster is allocated in the state's precision.
+    def __init__(self, num_qubits, precision=None):
+        self.num_qubits = num_qubits
+        self.dtype = get_dtype(precision)
+        self.__bound_qubits = []
+        self.__set_clusters([([i], StateVector(1, self.dtype)) for i in range(num_qubits)])
+
+    @classmethod
+    def from_qubit_states(cls, states, precision=None):
+        clusters = []
+        for i, state in enumerate(states):
+            register = StateVector(1, precision)
+            register.amplitudes[:] = np.ravel(state) / np.linalg.norm(state)
+            clusters.append(([i], register))
+        factorized_state = cls(0, precision)
+        factorized_state.num_qubits = len(states)
+        factorized_state.__set_clusters(clusters)
+        return factorized_state
+
+    @classmethod
+    def join(cls, factorized_states):
+        # Places the clusters of every state side by side without touching any amplitudes. The bound
+        # qubits move to the joined state, so the given states must not be used afterwards. The
+        # joined state takes the precision of the first one, and clusters in another precision are
+        # converted when a gate merges them.
+        joined = cls(0, factorized_states[0].dtype)
+        clusters = []
+        bound_qubits = []
+        for factorized_state in factorized_states:
+            clusters += [([joined.num_qubits + member for member in members], register) for members, register in factorized_state.clusters]
+            bound_qubits += [(joined.num_qubits + i, qubit) for i, qubit in factorized_state.bound_qubits()]
+            joined.num_qubits += factorized_state.num_qubits
+        joined.__set_clusters(clusters)
+        joined.__bind(bound_qubits)
+        return joined
+
+    @classmethod
+    def from_qubits(cls, qubits):
+        # Joins the states the qubits live in and relabels them so that qubits[i] is index i. Qubits
+        # outside the list that share a state with them follow after them.
+        factorized_states = list({id(qubit.register): qubit.register for qubit in qubits}.values())
+        factorized_state = factorized_states[0] if len(factorized_states) == 1 else cls.join(factorized_states)
+        listed = [qubit.register_index for qubit in qubits]
+        listed_set = set(listed)
+        factorized_state.relabel(listed + [i for i in range(factorized_state.num_qubits) if i not in listed_set])
+        return factorized_state
+
+    @property
+    def clusters(self):
+        return [(self.__members[root], self.__registers[root]) for root in self.__registers]
+
+    @property
+    def max_cluster_size(self):
+        return max((len(members) for members in self.__members.values()), default=0)
+
+    @property
+    def amplitudes(self):
+        return self.__combine([register.amplitudes for _, register in self.clusters])
+
+    @property
+    def state(self):
+        return self.amplitudes.reshape(-1, 1)
+
+    def __str__(self):
+        from src.utilities.quantum_math import format_joint_state
+        return format_joint_state(self.state)
+
+    def probabilities(self):
+        return self.__combine([register.probabilities() for _, register in self.clusters])
+
+    def find(self, qubit_index):
+        parent = self.__parent
+        while parent[qubit_index] != qubit_index:
+            parent[qubit_index] = parent[parent[qubit_index]]
+            qubit_index = parent[qubit_index]
+        return qubit_index
+
+    def apply_gate(self, gate, target, control=None):
+        self.apply_matrix(gate.get_matrix(self.dtype), gate_wires(target, control))
+
+    def apply_matrix(self, matrix, wires):
+        root = self.find(wires[0])
+        for wire in wires[1:]:
+            root = self.__merge(root, self.find(wire))
+
+        members = self.__members[root]
+        self.__registers[root].apply_matrix(matrix, tuple(members.index(wire) for wire in wires))
+        # A gate only changes how its own wires are entangled with the rest of the cluster.
+        if len(wires) > 1:
+            self.__split_separable_qubits(wires)
+
+    def get_outcome_probability(self, qubit_index, outcome):
+        root = self.find(qubit_index)
+        return self.__registers[root].get_outcome_probability(self.__members[root].index(qubit_index), outcome)
+
+    def collapse(self, qubit_index, outcome, probability):
+        root = self.find(qubit_index)
+        members = list(self.__members[root])
+        self.__registers[root].collapse(members.index(qubit_index), outcome, probability)
+        self.__split_separable_qubits(members)
+
+    def measure(self, qubit_index, rng=None):
+        root = self.find(qubit_index)
+        members = list(self.__members[root])
+        outcome = self.__registers[root].measure(members.index(qubit_index), rng)
+        self.__split_separable_qubits(members)
+        return outcome
+
+    def copy(self):
+        factorized_state = FactorizedState(0, self.dtype)
+        factorized_state.num_qubits = self.num_qubits
+        factorized_state.__set_clusters([(list(members), register.copy()) for members, register in self.clusters])
+        return factorized_state
+
+    def is_qubit_entangled(self, qubit_index):
+        # Separable qubits are split out after every operation, so any shared cluster is entangled.
+        return len(self.__members[self.find(qubit_index)]) > 1
+
+    def get_qubit_state(self, qubit_index):
+        root = self.find(qubit_index)
+        return self.__registers[root].get_qubit_state(self.__members[root].index(qubit_index))
+
+    def relabel(self, order):
+        # Index j of the relabelled state is index order[j] of this one.
+        new_index = {old: new for new, old in enumerate(order)}
+        self.__set_clusters([([new_index[member] for member in members], register) for members, register in self.clusters])
+        self.__bind([(new_index[i], qubit) for i, qubit in self.bound_qubits()])
+
+    def bind_qubits(self, qubits):
+        return self.__bind(list(enumerate(qubits)))
+
+    def bound_qubits(self):
+        # A qubit whose state was reassigned since it was bound has moved to another state.
+        return [(i, qubit) for i, qubit in self.__bound_qubits if qubit.register is self and qubit.register_index == i]
+
+    def __bind(self, bound_qubits):
+        self.__bound_qubits = bound_qubits
+        for i, qubit in bound_qubits:
+            qubit.register = self
+            qubit.register_index = i
+        return self
+
+    def __set_clusters(self, clusters):
+        self.__parent = list(range(self.num_qubits))
+        self.__members = {}
+        self.__registers = {}
+        for members, register in clusters:
+            for member in members:
+                self.__parent[member] = members[0]
+            self.__members[members[0]] = members
+            self.__registers[members[0]] = register
+
+    def __merge(self, root, other_root):
+        if root == other_root:
+            return root
+        num_qubits = len(self.__members[root]) + len(self.__members[other_root])
+        if num_qubits > MAX_CLUSTER_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_CLUSTER_QUBITS)
+
+        register = StateVector(num_qubits, self.dtype)
+        left, right = self.__registers[root].amplitudes, self.__registers[other_root].amplitudes
+        np.multiply.outer(left, right, out=register.amplitudes.reshape(len(left), len(right)))
+        self.__parent[other_root] = root
+        self.__members[root] = self.__members[root] + self.__members.pop(other_root)
+        self.__registers[root] = register
+        del self.__registers[other_root]
+        return root
+
+    def __split_separable_qubits(self, qubit_indices):
+        for qubit_index in qubit_indices:
+            root = self.find(qubit_index)
+            members = self.__members[root]
+            position = members.index(qubit_index)
+            if len(members) == 1 or self.__registers[root].is_qubit_entangled(position):
+                continue
+
+            # Deleting from a union-find is not possible in place, so the rest of the cluster is re-rooted.
+            qubit_register, rest_register = self.__registers.pop(root).split_qubit(position)
+            rest = members[:position] + members[position + 1:]
+            del self.__members[root]
+            for member in rest:
+                self.__parent[member] = rest[0]
+            self.__members[rest[0]], self.__registers[rest[0]] = rest, rest_register
+            self.__parent[qubit_index] = qubit_index
+            self.__members[qubit_index], self.__registers[qubit_index] = [qubit_index], qubit_register
+
+    def __combine(self, cluster_vectors):
+        # The dense vector is only built on request, as the outer product of the cluster vectors
+        # with its axes put back into qubit order.
+        if self.num_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(self.num_qubits, MAX_STATEVECTOR_QUBITS)
+
+        combined = np.ones((), dtype=np.result_type(*cluster_vectors) if cluster_vectors else self.dtype)
+        axes = []
+        for (members, _), vector in zip(self.clusters, cluster_vectors):
+            combined = np.multiply.outer(combined, vector.reshape((2,) * len(members)))
+            axes += members
+        return np.transpose(combined, np.argsort(axes)).ravel()
@@ -0,0 +1,82 @@
+from collections import namedtuple
+import numpy as np
+
+GateTargetControl = namedtuple('GateTargetControl', ['gate', 'target', 'control', 'condition', 'bit'], defaults=[None, None])
+
+# One little-endian record per gate; -1 marks a missing control, condition or measurement bit. The
+# binary circuit format stores these records as they are.
+GATE_RECORD_DTYPE = np.dtype([('gate', '<i4'),
+                              ('target', '<i4'),
+                              ('control', '<i4'),
+                              ('condition_bit', '<i4'),
+                              ('condition_value', 'i1'),
+                              ('bit', '<i4')])
+NO_INDEX = -1
+
+
+def get_gate_key(gate):
+    return gate.name, gate.params
+
+
+class GateTable:
+    # Columnar gate storage for QuantumCircuit. Each distinct gate object is kept once and every
+    # record refers to it by index, so bulk loaders append whole record arrays without building a
+    # Python object per gate; GateTargetControl tuples are only made when the gates are iterated.
+    def __init__(self):
+        self.gates = []
+        self.__gate_indices = {}
+        self.__records = np.empty(0, dtype=GATE_RECORD_DTYPE)
+        self.__size = 0
+
+    def __len__(self):
+        return self.__size
+
+    def __getitem__(self, index):
+        return self.__to_tuple(self.records[index].tolist())
+
+    def __iter__(self):
+        for values in self.records.tolist():
+            yield self.__to_tuple(values)
+
+    @property
+    def records(self):
+        return self.__records[:self.__size]
+
+    def get_gate_index(self, gate):
+        key = get_gate_key(gate)
+        if key not in self.__gate_indices:
+            self.__gate_indices[key] = len(self.gates)
+            self.gates.append(gate)
+        return self.__gate_indices[key]
+
+    def append(self, gate, target, control=None, condition=None, bit=None):
+        record = np.zeros(1, dtype=GATE_RECORD_DTYPE)
+        record[0] = (self.get_gate_index(gate),
+                     target,
+                     NO_INDEX if control is None else control,
+                     NO_INDEX if condition is None else condition[0],
+                     0 if condition is None else condition[1],
+                     NO_INDEX if bit is None else bit)
+        self.__append_records(record)
+
+    def extend(self, gates, records):
+        # records['gate'] indexes into gates, which may be any list of gate objects.
+        records = np.array(records, dtype=GATE_RECORD_DTYPE)
+        records['gate'] = np.array([self.get_gate_index(gate) for gate in gates], dtype=np.int32)[records['gate']]
+        self.__append_records(records)
+
+    def __append_records(self, records):
+        if self.__size + len(records) > len(self.__records):
+            grown = np.empty(max(2 * len(self.__records), self.__size + len(records)), dtype=GATE_RECORD_DTYPE)
+            grown[:self.__size] = self.__records[:self.__size]
+            self.__records = grown
+        self.__records[self.__size:self.__size + len(records)] = records
+        self.__size += len(records)
+
+    def __to_tuple(self, values):
+        gate_index, target, control, condition_bit, condition_value, bit = values
+        return GateTargetControl(self.gates[gate_index],
+                                 target,
+                                 None if control == NO_INDEX else control,
+                                 None if condition_bit == NO_INDEX else (condition_bit, condition_value),
+                                 None if bit == NO_INDEX else bit)
@@ -0,0 +1,216 @@
+import asyncio
+import itertools
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from src.exceptions.quantum_circuit_exceptions import JobTimeoutError
+from src.quantum_circuit_runner import QuantumCircuitRunner
+
+DEFAULT_POOL_WORKERS = 4
+DEFAULT_QUEUE_DEPTH = 64
+DEFAULT_PRIORITY = 0
+
+# Seconds a job spent waiting in the queue and running on a worker, None until it got that far.
+JobMetrics = namedtuple('JobMetrics', ['queue_wait', 'run_time'])
+PoolStats = namedtuple('PoolStats', ['queued', 'running', 'completed', 'failed', 'cancelled', 'timed_out',
+                                     'total_queue_wait', 'total_run_time'])
+
+
+def run_job(circuit, num_times, seed, counts, runner_options):
+    # Runs on a worker. Module level, so a ProcessPoolExecutor can be given to the pool as well.
+    runner = QuantumCircuitRunner(circuit, **runner_options)
+    if counts:
+        return runner.run(num_times, seed=seed)
+    return runner.run_circuit_multiple_times(num_times, seed=seed)
+
+
+class SimulationJob:
+    # An awaitable handle to one submitted run. Awaiting it returns what the runner returns, or raises
+    # what it raised, JobTimeoutError once the timeout has passed, or CancelledError after cancel().
+    # Cancelling a task that awaits the job cancels the job too.
+    def __init__(self, job_id, arguments, priority, timeout):
+        loop = asyncio.get_running_loop()
+        self.id = job_id
+        self.priority = priority
+        self.timeout = timeout
+        self.arguments = arguments
+        self.submitted_at = time.perf_counter()
+        self.started_at = None
+        self.finished_at = None
+        self.__future = loop.create_future()
+        self.__timer = None if timeout is None else loop.call_later(timeout, self.__expire)
+        self.__future.add_done_callback(self.__on_done)
+
+    def __await__(self):
+        return self.__future.__await__()
+
+    def __repr__(self):
+        return f"SimulationJob(id={self.id}, priority={self.priority}, status={self.status!r})"
+
+    @property
+    def status(self):
+        if not self.__future.done():
+            return 'queued' if self.started_at is None else 'running'
+        if self.__future.cancelled():
+            return 'cancelled'
+        error = self.__future.exception()
+        if error is None:
+            return 'done'
+        return 'timed_out' if isinstance(error, JobTimeoutError) else 'failed'
+
+    @property
+    def metrics(self):
+        queue_wait = None if self.started_at is None else self.started_at - self.submitted_at
+        run_time = None if self.finished_at is None else self.finished_at - self.started_at
+        return JobMetrics(queue_wait, run_time)
+
+    def done(self):
+        return self.__future.done()
+
+    def cancel(self):
+        return self.__future.cancel()
+
+    def add_done_callback(self, callback):
+        self.__future.add_done_callback(lambda _: callback(self))
+
+    async def run(self, executor):
+        # A simulation cannot be interrupted: after a timeout or cancel() the run still finishes on
+        # its worker, which stays busy until then, and its result is dropped.
+        self.started_at = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, run_job, *self.arguments)
+        except Exception as error:
+            if not self.__future.done():
+                self.__future.set_exception(error)
+        else:
+            if not self.__future.done():
+                self.__future.set_result(result)
+        finally:
+            self.finished_at = time.perf_counter()
+
+    def __expire(self):
+        if not self.__future.done():
+            self.__future.set_exception(JobTimeoutError(self.id, self.timeout))
+
+    def __on_done(self, future):
+        if self.__timer is not None:
+            self.__timer.cancel()
+        # Marks the outcome as seen, so a job nobody awaits does not log an unretrieved exception.
+        if not future.cancelled():
+            future.exception()
+
+
+class SimulationPool:
+    # Runs submitted circuits on a bounded pool of max_workers workers, a thread pool unless an
+    # executor is given. Jobs wait in a priority queue of at most max_queue_size jobs: lower priority
+    # values run first and equal priorities run in submission order. submit() waits while the queue
+    # is full and submit_nowait() raises asyncio.QueueFull instead, which is the pool's backpressure.
+    # A job's timeout counts from its submission and covers both its queue wait and its run.
+    def __init__(self, max_workers=DEFAULT_POOL_WORKERS, max_queue_size=DEFAULT_QUEUE_DEPTH, executor=None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than or equal to 1")
+        if max_queue_size < 1:
+            raise ValueError("max_queue_size must be greater than or equal to 1")
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.__executor = executor
+        self.__owns_executor = executor is None
+        self.__queue = None
+        self.__workers = []
+        self.__job_ids = itertools.count()
+        self.__running = 0
+        self.__outcomes = dict.fromkeys(['done', 'failed', 'cancelled', 'timed_out'], 0)
+        self.__total_queue_wait = 0.0
+        self.__total_run_time = 0.0
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close(cancel_pending=exc_info[0] is not None)
+
+    def start(self):
+        if self.__queue is not None:
+            raise RuntimeError("The simulation pool is already running.")
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='simulation-pool')
+        self.__queue = asyncio.PriorityQueue(self.max_queue_size)
+        self.__workers = [asyncio.create_task(self.__work(self.__queue)) for _ in range(self.max_workers)]
+
+    async def close(self, cancel_pending=False):
+        # Waits for every queued job to finish, or cancels the jobs still waiting with cancel_pending.
+        if self.__queue is None:
+            return
+        queue, self.__queue = self.__queue, None
+        if cancel_pending:
+            while not queue.empty():
+                queue.get_nowait()[-1].cancel()
+                queue.task_done()
+        await queue.join()
+        for worker in self.__workers:
+            worker.cancel()
+        await asyncio.gather(*self.__workers, return_exceptions=True)
+        self.__workers = []
+        if self.__owns_executor:
+            self.__executor.shutdown(wait=False)
+            self.__executor = None
+
+    async def submit(self, circuit, num_times, priority=DEFAULT_PRIORITY, timeout=None, seed=None, counts=False, **runner_options):
+        # Returns once the job is queued. The job runs run_circuit_multiple_times, or run() for a
+        # RunResult with counts=True, on a QuantumCircuitRunner built with runner_options.
+        queue = self.__get_queue()
+        job = self.__create_job(circuit, num_times, priority, timeout, seed, counts, runner_options)
+        await queue.put((priority, job.id, job))
+        return job
+
+    def submit_nowait(self, circuit, num_times, priority=DEFAULT_PRIORITY, timeout=None, seed=None, counts=False, **runner_options):
+        queue = self.__get_queue()
+        if queue.full():
+            raise asyncio.QueueFull
+        job = self.__create_job(circuit, num_times, priority, timeout, seed, counts, runner_options)
+        queue.put_nowait((priority, job.id, job))
+        return job
+
+    def stats(self):
+        return PoolStats(queued=0 if self.__queue is None else self.__queue.qsize(),
+                         running=self.__running,
+                         completed=self.__outcomes['done'],
+                         failed=self.__outcomes['failed'],
+                         cancelled=self.__outcomes['cancelled'],
+                         timed_out=self.__outcomes['timed_out'],
+                         total_queue_wait=self.__total_queue_wait,
+                         total_run_time=self.__total_run_time)
+
+    def __get_queue(self):
+        if self.__queue is None:
+            raise RuntimeError("The simulation pool is not running.")
+        return self.__queue
+
+    def __create_job(self, circuit, num_times, priority, timeout, seed, counts, runner_options):
+        if num_times < 1:
+            raise ValueError("num_times must be greater than or equal to 1")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive")
+        job = SimulationJob(next(self.__job_ids), (circuit, num_times, seed, counts, runner_options), priority, timeout)
+        job.add_done_callback(self.__count_outcome)
+        return job
+
+    def __count_outcome(self, job):
+        self.__outcomes[job.status] += 1
+
+    async def __work(self, queue):
+        while True:
+            _, _, job = await queue.get()
+            try:
+                # Jobs cancelled or timed out while queued are dropped without running.
+                if not job.done():
+                    self.__running += 1
+                    try:
+                        await job.run(self.__executor)
+                    finally:
+                        self.__running -= 1
+                        self.__total_queue_wait += job.metrics.queue_wait
+                        self.__total_run_time += job.metrics.run_time
+            finally:
+                queue.task_done()
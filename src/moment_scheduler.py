@@ -0,0 +1,40 @@
+import numpy as np
+from src.gate_table import NO_INDEX
+
+
+def schedule_moments(gate_table, input_size, span_wires=False):
+    # As-soon-as-possible layering: every gate lands in the moment after the last gate that used any
+    # of its qubits, so the gates of one moment act on disjoint qubits. Measurements and conditioned
+    # gates also claim their classical bit, which keeps a condition after the measurement it reads.
+    # With span_wires a two-qubit gate claims every wire between its qubits, as a diagram needs to
+    # draw its connection.
+    records = gate_table.records
+    num_bits = int(max(records['bit'].max(initial=NO_INDEX), records['condition_bit'].max(initial=NO_INDEX))) + 1
+    frontier = [0] * (input_size + num_bits)
+    moments = np.empty(len(records), dtype=np.int64)
+    for row, (_, target, control, condition_bit, _, bit) in enumerate(records.tolist()):
+        if control == NO_INDEX:
+            resources = [target]
+        elif span_wires:
+            resources = list(range(min(target, control), max(target, control) + 1))
+        else:
+            resources = [target, control]
+        resources += [input_size + classical_bit for classical_bit in (condition_bit, bit) if classical_bit != NO_INDEX]
+
+        moment = max(frontier[resource] for resource in resources)
+        for resource in resources:
+            frontier[resource] = moment + 1
+        moments[row] = moment
+    return moments
+
+
+def get_depth(moments):
+    return int(moments.max()) + 1 if len(moments) else 0
+
+
+def group_by_moment(moments):
+    # Gate rows of each moment, in circuit order.
+    if not len(moments):
+        return []
+    order = np.argsort(moments, kind='stable')
+    return np.split(order, np.cumsum(np.bincount(moments, minlength=get_depth(moments)))[:-1])
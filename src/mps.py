@@ -0,0 +1,135 @@
+from collections import namedtuple
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError
+from src.packed_shots import MAX_OUTCOME_INDEX_QUBITS, bits_to_outcomes
+from src.statevector import MAX_STATEVECTOR_QUBITS
+
+MAX_MPS_QUBITS = 2 ** 10
+# Largest share of a state's weight that one SVD may discard when no threshold is given.
+DEFAULT_TRUNCATION_THRESHOLD = 1e-12
+
+MPSConfig = namedtuple('MPSConfig', ['max_bond_dimension', 'truncation_threshold'], defaults=[None, DEFAULT_TRUNCATION_THRESHOLD])
+
+SWAP_TENSOR = np.eye(4, dtype=np.complex128)[[0, 2, 1, 3]].reshape(2, 2, 2, 2)
+
+
+class MatrixProductState:
+    # Site i holds a (left bond, 2, right bond) tensor for qubit i. The state is kept in mixed canonical
+    # form around an orthogonality center, so every SVD truncation is optimal in the 2-norm and the
+    # discarded weights add up to the reported truncation error.
+    def __init__(self, num_qubits, max_bond_dimension=None, truncation_threshold=DEFAULT_TRUNCATION_THRESHOLD):
+        if num_qubits > MAX_MPS_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_MPS_QUBITS)
+
+        self.num_qubits = num_qubits
+        self.max_bond_dimension = max_bond_dimension
+        self.truncation_threshold = truncation_threshold
+        self.truncation_error = 0.0
+        self.tensors = []
+        for _ in range(num_qubits):
+            tensor = np.zeros((1, 2, 1), dtype=np.complex128)
+            tensor[0, 0, 0] = 1
+            self.tensors.append(tensor)
+        self.__center = 0
+
+    @classmethod
+    def from_config(cls, num_qubits, config):
+        return cls(num_qubits, config.max_bond_dimension, config.truncation_threshold)
+
+    @property
+    def bond_dimensions(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    @property
+    def amplitudes(self):
+        if self.num_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(self.num_qubits, MAX_STATEVECTOR_QUBITS)
+
+        amplitudes = np.ones((1, 1), dtype=np.complex128)
+        for tensor in self.tensors:
+            amplitudes = (amplitudes @ tensor.reshape(tensor.shape[0], -1)).reshape(-1, tensor.shape[2])
+        return amplitudes.ravel()
+
+    def apply_gate(self, gate, target, control=None):
+        self.apply_matrix(np.asarray(gate.matrix, dtype=np.complex128), (target,) if control is None else (target, control))
+
+    def apply_matrix(self, matrix, wires):
+        if len(wires) == 1:
+            site = wires[0]
+            self.tensors[site] = np.einsum('ij,ajb->aib', matrix, self.tensors[site])
+            return
+
+        # The matrix acts on kron(wires[0], wires[1]); reorder it to act on (low, high).
+        gate = matrix.reshape(2, 2, 2, 2)
+        if wires[0] > wires[1]:
+            gate = gate.transpose(1, 0, 3, 2)
+        low, high = sorted(wires)
+        # Distant qubits are brought next to each other with swaps and moved back afterwards.
+        for site in range(high - 1, low, -1):
+            self.__apply_two_site(site, SWAP_TENSOR)
+        self.__apply_two_site(low, gate)
+        for site in range(low + 1, high):
+            self.__apply_two_site(site, SWAP_TENSOR)
+
+    def probabilities(self):
+        return np.abs(self.amplitudes) ** 2
+
+    def get_probabilities(self):
+        return self.probabilities()
+
+    def sample_bits(self, rng, num_shots):
+        # Qubits are drawn left to right. With the center on site 0 every later site is right-canonical,
+        # so the marginal of a qubit given the ones drawn before it only needs the current site.
+        self.__move_center(0)
+        bits = np.empty((num_shots, self.num_qubits), dtype=np.uint8)
+        left = np.ones((num_shots, 1), dtype=np.complex128)
+        for site, tensor in enumerate(self.tensors):
+            conditional = np.einsum('na,asb->nsb', left, tensor)
+            weights = np.sum(np.abs(conditional) ** 2, axis=2)
+            bits[:, site] = rng.random(num_shots) * weights.sum(axis=1) >= weights[:, 0]
+            chosen = conditional[np.arange(num_shots), bits[:, site]]
+            left = chosen / np.linalg.norm(chosen, axis=1, keepdims=True)
+        return bits
+
+    def sample(self, rng, num_shots):
+        if self.num_qubits > MAX_OUTCOME_INDEX_QUBITS:
+            raise ExceedsQubitLimitError(self.num_qubits, MAX_OUTCOME_INDEX_QUBITS)
+        return bits_to_outcomes(self.sample_bits(rng, num_shots)), np.zeros((num_shots, 0), dtype=np.uint8)
+
+    def __apply_two_site(self, site, gate):
+        self.__move_center(site)
+        left, right = self.tensors[site], self.tensors[site + 1]
+        theta = np.einsum('stuv,aub,bvc->astc', gate, left, right)
+        left_bond, right_bond = theta.shape[0], theta.shape[3]
+        u, s, vh = np.linalg.svd(theta.reshape(left_bond * 2, 2 * right_bond), full_matrices=False)
+
+        rank = self.__get_kept_rank(s)
+        self.tensors[site] = u[:, :rank].reshape(left_bond, 2, rank)
+        self.tensors[site + 1] = (s[:rank, np.newaxis] / np.linalg.norm(s[:rank]) * vh[:rank]).reshape(rank, 2, right_bond)
+        self.__center = site + 1
+
+    def __get_kept_rank(self, singular_values):
+        # Keep the fewest singular values whose discarded weight stays under the threshold, then apply
+        # the bond-dimension cap; the weight lost either way is added to the truncation error.
+        weights = singular_values ** 2 / np.sum(singular_values ** 2)
+        discarded_tail = np.cumsum(weights[::-1])[::-1]
+        rank = max(1, int(np.count_nonzero(discarded_tail > self.truncation_threshold)))
+        if self.max_bond_dimension is not None:
+            rank = min(rank, self.max_bond_dimension)
+        if rank < len(weights):
+            self.truncation_error += float(discarded_tail[rank])
+        return rank
+
+    def __move_center(self, site):
+        while self.__center < site:
+            tensor = self.tensors[self.__center]
+            q, r = np.linalg.qr(tensor.reshape(-1, tensor.shape[2]))
+            self.tensors[self.__center] = q.reshape(tensor.shape[0], 2, -1)
+            self.tensors[self.__center + 1] = np.einsum('ab,bsc->asc', r, self.tensors[self.__center + 1])
+            self.__center += 1
+        while self.__center > site:
+            tensor = self.tensors[self.__center]
+            q, r = np.linalg.qr(tensor.reshape(tensor.shape[0], -1).T)
+            self.tensors[self.__center] = q.T.reshape(-1, 2, tensor.shape[2])
+            self.tensors[self.__center - 1] = np.einsum('asb,bc->asc', self.tensors[self.__center - 1], r.T)
+            self.__center -= 1
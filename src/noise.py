@@ -0,0 +1,90 @@
+import numpy as np
+from abc import ABC
+from src.quantum_gate import GATE_REGISTRY, read_only_matrix
+
+IDENTITY_MATRIX = np.eye(2)
+
+
+def validate_probability(name, probability):
+    if not 0 <= probability <= 1:
+        raise ValueError(f"{name} must be between 0 and 1, got {probability}")
+
+
+class KrausChannel(ABC):
+    def __init__(self, name, kraus_operators):
+        self.name = name
+        self.kraus_operators = [read_only_matrix(operator) for operator in kraus_operators]
+        # Sum of K ⊗ K*, which maps ρ to Σ K ρ K† when applied to the (row, column) axes of one qubit.
+        self.superoperator = read_only_matrix(sum(np.kron(operator, np.conj(operator)) for operator in self.kraus_operators))
+
+
+class DepolarizingChannel(KrausChannel):
+    def __init__(self, probability):
+        validate_probability('probability', probability)
+        super().__init__(name='depolarizing',
+                         kraus_operators=[np.sqrt(1 - 3 * probability / 4) * IDENTITY_MATRIX,
+                                          np.sqrt(probability / 4) * GATE_REGISTRY['pauli_x'].matrix,
+                                          np.sqrt(probability / 4) * GATE_REGISTRY['pauli_y'].matrix,
+                                          np.sqrt(probability / 4) * GATE_REGISTRY['pauli_z'].matrix])
+        self.probability = probability
+
+
+class AmplitudeDampingChannel(KrausChannel):
+    def __init__(self, gamma):
+        validate_probability('gamma', gamma)
+        super().__init__(name='amplitude_damping',
+                         kraus_operators=[np.array([[1, 0], [0, np.sqrt(1 - gamma)]]),
+                                          np.array([[0, np.sqrt(gamma)], [0, 0]])])
+        self.gamma = gamma
+
+
+class PhaseDampingChannel(KrausChannel):
+    def __init__(self, gamma):
+        validate_probability('gamma', gamma)
+        super().__init__(name='phase_damping',
+                         kraus_operators=[np.array([[1, 0], [0, np.sqrt(1 - gamma)]]),
+                                          np.array([[0, 0], [0, np.sqrt(gamma)]])])
+        self.gamma = gamma
+
+
+class ReadoutError:
+    def __init__(self, probability_one_given_zero, probability_zero_given_one=None):
+        if probability_zero_given_one is None:
+            probability_zero_given_one = probability_one_given_zero
+        validate_probability('probability_one_given_zero', probability_one_given_zero)
+        validate_probability('probability_zero_given_one', probability_zero_given_one)
+        self.name = 'readout_error'
+        # Column k holds the distribution of the reported bit when the qubit really is in |k⟩.
+        self.confusion_matrix = np.array([[1 - probability_one_given_zero, probability_zero_given_one],
+                                          [probability_one_given_zero, 1 - probability_zero_given_one]])
+        self.confusion_matrix.flags.writeable = False
+
+
+class NoiseModel:
+    def __init__(self):
+        self.__gate_channels = {}
+        self.__qubit_channels = {}
+        self.__readout_errors = {}
+        self.__all_qubits_readout_error = None
+
+    def add_gate_noise(self, gate_name, channel):
+        self.__gate_channels.setdefault(gate_name, []).append(channel)
+
+    def add_qubit_noise(self, qubit, channel):
+        self.__qubit_channels.setdefault(qubit, []).append(channel)
+
+    def add_readout_error(self, readout_error, qubit=None):
+        if qubit is None:
+            self.__all_qubits_readout_error = readout_error
+        else:
+            self.__readout_errors[qubit] = readout_error
+
+    def channels_after(self, gate_name, wires):
+        channels = []
+        for wire in wires:
+            channels += [(channel, wire) for channel in self.__gate_channels.get(gate_name, [])]
+            channels += [(channel, wire) for channel in self.__qubit_channels.get(wire, [])]
+        return channels
+
+    def readout_error(self, qubit):
+        return self.__readout_errors.get(qubit, self.__all_qubits_readout_error)
@@ -0,0 +1,112 @@
+import os
+import numpy as np
+from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
+
+PACKED_SHOTS_MAGIC = b'QCSHOTS1'
+# Magic bytes followed by the number of qubits as a little-endian uint64; the outcomes follow as raw
+# little-endian integers, so np.memmap can map everything after the header directly.
+PACKED_SHOTS_HEADER_SIZE = len(PACKED_SHOTS_MAGIC) + 8
+# Outcomes are int64 basis-state indices; wider registers keep their shots as rows of bits.
+MAX_OUTCOME_INDEX_QUBITS = 63
+
+
+def get_packed_dtype(num_qubits):
+    for dtype in [np.uint8, np.uint16, np.uint32, np.uint64]:
+        if num_qubits <= 8 * np.dtype(dtype).itemsize:
+            return np.dtype(dtype).newbyteorder('<')
+    raise ValueError(f"Cannot pack outcomes of {num_qubits} qubits into a single integer.")
+
+
+def outcomes_to_bits(outcomes, num_qubits):
+    return ((np.asarray(outcomes, dtype=np.int64)[:, np.newaxis] >> np.arange(num_qubits - 1, -1, -1)) & 1).astype(np.uint8)
+
+
+def bits_to_outcomes(bits):
+    # Column i of bits is qubit i, the most significant bit of the outcome.
+    return np.asarray(bits, dtype=np.int64) @ (1 << np.arange(bits.shape[1] - 1, -1, -1, dtype=np.int64))
+
+
+def bits_to_measurements(bits):
+    kets = (ZERO_STATE_KET, ONE_STATE_KET)
+    return [[kets[bit] for bit in row] for row in bits.tolist()]
+
+
+def outcomes_to_measurements(outcomes, num_qubits):
+    return bits_to_measurements(outcomes_to_bits(outcomes, num_qubits))
+
+
+def read_packed_shots_header(path):
+    # The number of qubits a packed shots file was written for.
+    with open(path, 'rb') as file:
+        header = file.read(PACKED_SHOTS_HEADER_SIZE)
+    if len(header) != PACKED_SHOTS_HEADER_SIZE or not header.startswith(PACKED_SHOTS_MAGIC):
+        raise ValueError(f"{path} is not a packed shots file.")
+    return int(np.frombuffer(header[len(PACKED_SHOTS_MAGIC):], dtype='<u8')[0])
+
+
+class PackedShots:
+    def __init__(self, num_qubits, path=None):
+        # With a path, shots are appended to the file: a new one is created with its header, and an
+        # existing one must hold shots of the same width, or a ValueError is raised.
+        self.num_qubits = num_qubits
+        self.dtype = get_packed_dtype(num_qubits)
+        self.path = path
+        self.__buffer = np.empty(0, dtype=self.dtype)
+        self.__size = 0
+
+        if path is not None:
+            try:
+                with open(path, 'xb') as file:
+                    file.write(PACKED_SHOTS_MAGIC + np.uint64(num_qubits).astype('<u8').tobytes())
+            except FileExistsError:
+                self.__check_existing(path)
+
+    def __check_existing(self, path):
+        try:
+            stored_qubits = read_packed_shots_header(path)
+        except ValueError:
+            raise ValueError(f"{path} exists and is not a packed shots file; it will not be overwritten.") from None
+        if stored_qubits != self.num_qubits:
+            raise ValueError(f"{path} holds shots of {stored_qubits} qubits, not {self.num_qubits}; "
+                             f"use PackedShots.open(path) to read it.")
+
+    @classmethod
+    def open(cls, path):
+        shots = cls.__new__(cls)
+        shots.num_qubits = read_packed_shots_header(path)
+        shots.dtype = get_packed_dtype(shots.num_qubits)
+        shots.path = path
+        shots.__buffer = np.empty(0, dtype=shots.dtype)
+        shots.__size = 0
+        return shots
+
+    def __len__(self):
+        if self.path is not None:
+            return (os.path.getsize(self.path) - PACKED_SHOTS_HEADER_SIZE) // self.dtype.itemsize
+        return self.__size
+
+    def append(self, outcomes):
+        outcomes = np.asarray(outcomes).astype(self.dtype, copy=False)
+        if self.path is not None:
+            with open(self.path, 'ab') as file:
+                file.write(outcomes.tobytes())
+            return self
+
+        if self.__size + len(outcomes) > len(self.__buffer):
+            grown = np.empty(max(2 * len(self.__buffer), self.__size + len(outcomes)), dtype=self.dtype)
+            grown[:self.__size] = self.__buffer[:self.__size]
+            self.__buffer = grown
+        self.__buffer[self.__size:self.__size + len(outcomes)] = outcomes
+        self.__size += len(outcomes)
+        return self
+
+    @property
+    def outcomes(self):
+        if self.path is None:
+            return self.__buffer[:self.__size]
+        if len(self) == 0:
+            return np.empty(0, dtype=self.dtype)
+        return np.memmap(self.path, dtype=self.dtype, mode='r', offset=PACKED_SHOTS_HEADER_SIZE, shape=(len(self),))
+
+    def to_measurements(self, start=0, stop=None):
+        return outcomes_to_measurements(self.outcomes[start:stop], self.num_qubits)
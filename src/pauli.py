@@ -0,0 +1,84 @@
+from collections import namedtuple
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import InvalidPauliStringError
+from src.quantum_gate import GATE_REGISTRY
+
+PauliMask = namedtuple('PauliMask', ['x_mask', 'z_mask', 'phase'])
+
+PAULI_MATRICES = {'I': GATE_REGISTRY['identity'].matrix,
+                  'X': GATE_REGISTRY['pauli_x'].matrix,
+                  'Y': GATE_REGISTRY['pauli_y'].matrix,
+                  'Z': GATE_REGISTRY['pauli_z'].matrix}
+
+# Upper bound on the entries of one sign matrix, so wide registers evaluate fewer strings per block.
+SIGN_MATRIX_MAX_ENTRIES = 2 ** 22
+
+
+def get_pauli_action(symbol):
+    # A Pauli maps |b⟩ to phase(b) |b ^ flip⟩; read flip and both phases off its matrix.
+    matrix = PAULI_MATRICES[symbol]
+    flip = int(matrix[0, 0] == 0)
+    return flip, matrix[flip, 0], matrix[1 - flip, 1]
+
+
+def parse_pauli_string(pauli_string, num_qubits):
+    # Character i acts on qubit i, which is bit (n - 1 - i) of a basis-state index. Every Pauli in the
+    # registry is either diagonal or anti-diagonal, so it is a bit flip (x_mask), a sign (-1)^b
+    # (z_mask) and a constant phase.
+    if len(pauli_string) != num_qubits or any(symbol not in PAULI_MATRICES for symbol in pauli_string):
+        raise InvalidPauliStringError(pauli_string, num_qubits)
+
+    x_mask, z_mask, phase = 0, 0, 1
+    for i, symbol in enumerate(pauli_string):
+        flip, phase_of_zero, phase_of_one = get_pauli_action(symbol)
+        bit = 1 << (num_qubits - 1 - i)
+        x_mask |= bit * flip
+        if phase_of_one == -phase_of_zero:
+            z_mask |= bit
+        phase *= phase_of_zero
+    return PauliMask(x_mask, z_mask, phase)
+
+
+def get_parity(values):
+    values = values.copy()
+    shift = 32
+    while shift:
+        values ^= values >> shift
+        shift //= 2
+    return values & 1
+
+
+def state_expectation_values(amplitudes, observables):
+    amplitudes = np.ravel(amplitudes)
+    return _expectation_values(observables, len(amplitudes), lambda indices, x_mask: np.conj(amplitudes[indices ^ x_mask]) * amplitudes)
+
+
+def density_matrix_expectation_values(density_matrix, observables):
+    # Tr(ρP) = Σ_k phase(k) ρ[k, k ^ x].
+    return _expectation_values(observables, len(density_matrix), lambda indices, x_mask: density_matrix[indices, indices ^ x_mask])
+
+
+def _expectation_values(observables, dimension, get_products):
+    # Pauli strings sharing an x_mask share the products conj(ψ[k ^ x]) ψ[k]; each distinct x_mask
+    # is gathered once and all of its strings are evaluated as one sign-matrix product.
+    num_qubits = dimension.bit_length() - 1
+    groups = {}
+    for observable_index, observable in enumerate(observables):
+        weighted_strings = {observable: 1} if isinstance(observable, str) else observable
+        for pauli_string, coefficient in weighted_strings.items():
+            mask = parse_pauli_string(pauli_string, num_qubits)
+            groups.setdefault(mask.x_mask, []).append((observable_index, coefficient, mask))
+
+    indices = np.arange(dimension, dtype=np.int64)
+    block_size = max(1, SIGN_MATRIX_MAX_ENTRIES // dimension)
+    values = np.zeros(len(observables), dtype=np.complex128)
+    for x_mask, group in groups.items():
+        products = get_products(indices, x_mask)
+        for start in range(0, len(group), block_size):
+            block = group[start:start + block_size]
+            z_masks = np.array([mask.z_mask for _, _, mask in block], dtype=np.int64)
+            signs = 1 - 2 * get_parity(indices[np.newaxis, :] & z_masks[:, np.newaxis])
+            sums = signs @ products
+            for (observable_index, coefficient, mask), total in zip(block, sums):
+                values[observable_index] += coefficient * mask.phase * total
+    return values.real
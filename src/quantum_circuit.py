@@ -1,96 +1,219 @@
 import logging
-from collections import namedtuple
-from src.quantum_gates.quantum_gate import get_quantum_gate_list
-from src.exceptions.quantum_circuit_exceptions import GateNotFoundError, InvalidGatePositionError, InvalidControlError, MissingControlError, QubitMismatchError, \
-    ExceedsQubitLimitError
-
-GateTargetControl = namedtuple('GateTargetControl', ['gate', 'target', 'control'])
+import numpy as np
+from src.quantum_gate import get_gate, MEASURE_GATE
+from src.exceptions.quantum_circuit_exceptions import InvalidGatePositionError, InvalidControlError, MissingControlError, QubitMismatchError, InvalidConditionError, \
+    UnsupportedOperationError
+from src.circuit_cache import get_default_cache, get_structural_hash
+from src.factorized_state import FactorizedState
+from src.gate_table import GATE_RECORD_DTYPE, NO_INDEX, GateTable, GateTargetControl
+from src.moment_scheduler import get_depth, group_by_moment, schedule_moments
+from src.stabilizer import is_clifford_gate
+from src.statevector import BatchedStateVector, gate_wires
 
 
 class QuantumCircuit:
     def __init__(self, input_size):
         self.input_size = input_size
-        self.__supported_gates_list = get_quantum_gate_list()
-        self.__gates = []
+        self.__gate_table = GateTable()
+        self.__compiled = None
+        self.__moments = None
+        self.__structural_hash = None
 
     def __len__(self):
-        return len(self.__gates)
+        return len(self.__gate_table)
+
+    @property
+    def gates(self):
+        return tuple(self.__gate_table)
+
+    @property
+    def gate_table(self):
+        return self.__gate_table
+
+    @property
+    def structural_hash(self):
+        # Computed on first use and reset whenever a gate or measurement is added.
+        if self.__structural_hash is None:
+            self.__structural_hash = get_structural_hash(self.input_size, self.__gate_table)
+        return self.__structural_hash
 
-    def add_gate(self, name, target, control=None):
-        gate_obj = self.__get_gate_object(name)
+    def add_gate(self, name, target, control=None, params=(), condition=None):
+        gate_obj = get_gate(name, params)
         if gate_obj.is_two_qubit_gate() and control is None:
             raise MissingControlError(name)
         elif not gate_obj.is_two_qubit_gate() and control is not None:
             raise InvalidControlError(name)
-        elif gate_obj.is_two_qubit_gate() and (target >= self.input_size or control >= self.input_size or target < 0 or control < 0):
+        elif gate_obj.is_two_qubit_gate() and (target >= self.input_size or control >= self.input_size or target < 0 or control < 0 or target == control):
             raise InvalidGatePositionError(target, control)
-
-        logging.debug(f"The gate {name} successfully added to the quantum circuit.")
-        self.__gates.append(GateTargetControl(gate_obj, target, control))
-
-    def __get_gate_object(self, name):
-        for gate in self.__supported_gates_list:
-            if gate.name == name:
-                return gate
-        raise GateNotFoundError(name)
+        elif not gate_obj.is_two_qubit_gate() and (target >= self.input_size or target < 0):
+            raise InvalidGatePositionError(target, control)
+        elif condition is not None and (not isinstance(condition, (tuple, list)) or len(condition) != 2 or condition[0] < 0 or condition[1] not in (0, 1)):
+            raise InvalidConditionError(condition)
+
+        logging.debug("The gate %s successfully added to the quantum circuit.", name)
+        self.__gate_table.append(gate_obj, target, control, None if condition is None else tuple(condition))
+        self.__compiled = None
+        self.__moments = None
+        self.__structural_hash = None
+
+    def add_gate_records(self, gates, records):
+        # Bulk counterpart of add_gate and add_measure for loaders: records is a GATE_RECORD_DTYPE array
+        # whose 'gate' column indexes into gates. It is validated column by column and appended as is.
+        records = np.asarray(records, dtype=GATE_RECORD_DTYPE)
+        gate_index = records['gate']
+        is_two_qubit_gate = np.array([gate.is_two_qubit_gate() for gate in gates], dtype=bool)[gate_index]
+        is_measurement = np.array([gate.is_measurement() for gate in gates], dtype=bool)[gate_index]
+        targets, controls, condition_bits, bits = records['target'], records['control'], records['condition_bit'], records['bit']
+        has_control = controls != NO_INDEX
+
+        condition_values = records['condition_value']
+        has_condition = condition_bits != NO_INDEX
+        missing_control = is_two_qubit_gate & ~has_control
+        extra_control = ~is_two_qubit_gate & has_control
+        invalid_position = (targets < 0) | (targets >= self.input_size) | (has_control & ((controls < 0) | (controls >= self.input_size) | (controls == targets)))
+        invalid_condition = (condition_bits < NO_INDEX) | (has_condition & ((condition_values < 0) | (condition_values > 1) | is_measurement))
+        invalid_bit = (bits < NO_INDEX) | (is_measurement != (bits != NO_INDEX))
+
+        for invalid, get_error in [(missing_control, lambda i: MissingControlError(gates[gate_index[i]].name)),
+                                   (extra_control, lambda i: InvalidControlError(gates[gate_index[i]].name)),
+                                   (invalid_position, lambda i: InvalidGatePositionError(int(targets[i]), int(controls[i]) if has_control[i] else None)),
+                                   (invalid_condition, lambda i: InvalidConditionError((int(condition_bits[i]), int(condition_values[i])))),
+                                   (invalid_bit, lambda i: InvalidConditionError((int(bits[i]), None)))]:
+            if np.any(invalid):
+                raise get_error(int(np.argmax(invalid)))
+
+        logging.debug("%d gates successfully added to the quantum circuit.", len(records))
+        self.__gate_table.extend(gates, records)
+        self.__compiled = None
+        self.__moments = None
+        self.__structural_hash = None
+
+    def add_measure(self, target, bit=None):
+        if target >= self.input_size or target < 0:
+            raise InvalidGatePositionError(target, None)
+        bit = target if bit is None else bit
+        if bit < 0:
+            raise InvalidConditionError((bit, None))
+
+        logging.debug("Measurement of qubit %d into bit %d successfully added to the quantum circuit.", target, bit)
+        self.__gate_table.append(MEASURE_GATE, target, bit=bit)
+        self.__compiled = None
+        self.__moments = None
+        self.__structural_hash = None
+
+    def __get_moment_indices(self):
+        if self.__moments is None:
+            self.__moments = schedule_moments(self.__gate_table, self.input_size)
+        return self.__moments
+
+    def compile(self):
+        if self.__compiled is None:
+            self.__compiled = get_default_cache().get_compiled(self)
+            logging.debug("Compiled %d gates into %d operations.", self.__compiled.report.original_operations, self.__compiled.report.compiled_operations)
+        return self.__compiled
+
+    @property
+    def depth(self):
+        return get_depth(self.__get_moment_indices())
+
+    def get_moments(self):
+        # Lists of gates on disjoint qubits; applying the moments in order is the same as applying the gates.
+        return [[self.__gate_table[row] for row in rows.tolist()] for rows in group_by_moment(self.__get_moment_indices())]
 
     def show(self):
+        print(self.draw())
+
+    def draw(self):
+        # One column per moment, laid out in a preallocated character grid with a wire row for every
+        # qubit (highest on top) and a gap row between neighbouring wires. Two-qubit gates take every
+        # wire between their qubits in this layout, so connections never cross another gate.
         CONNECTION = '|'
-        EMPTY = "-"
-        circuit = [str(i) + ' ' + EMPTY for i in range(self.input_size)]
-        gap_lines = ['  ' + EMPTY for i in range(self.input_size - 1)]
-
-        for gate_tuple in self.__gates:
-
-            for i in range(len(circuit)):
-                if circuit[i][0] == str(gate_tuple.target):
-                    circuit[i] += EMPTY + gate_tuple.gate.icon.target + EMPTY
-                elif gate_tuple.control is not None:
-                    if circuit[i][0] == str(gate_tuple.control):
-                        circuit[i] += EMPTY + gate_tuple.gate.icon.control + EMPTY
-                    elif max(gate_tuple.target, gate_tuple.control) > int(circuit[i][0]) > min(gate_tuple.target, gate_tuple.control):
-                        circuit[i] += 2 * EMPTY + CONNECTION + 2 * EMPTY
-                    else:
-                        circuit[i] += 5 * EMPTY
-                elif gate_tuple.control is None:
-                    circuit[i] += 5 * EMPTY
-
-            for i in range(len(gap_lines)):
-                if gate_tuple.control is not None:
-                    if max(gate_tuple.target, gate_tuple.control) > i >= min(gate_tuple.target, gate_tuple.control):
-                        gap_lines[i] += 2 * EMPTY + CONNECTION + 2 * EMPTY
-                    else:
-                        gap_lines[i] += 5 * EMPTY
-                else:
-                    gap_lines[i] += 5 * EMPTY
+        EMPTY = '-'
+        COLUMN_WIDTH = 5
+        moments = schedule_moments(self.__gate_table, self.input_size, span_wires=True)
+        grid = np.full((2 * self.input_size - 1, 1 + COLUMN_WIDTH * get_depth(moments)), EMPTY, dtype='<U1')
+
+        def get_row(wire):
+            return 2 * (self.input_size - 1 - wire)
+
+        for gate_tuple, moment in zip(self.__gate_table, moments.tolist()):
+            column = 1 + COLUMN_WIDTH * moment
+            grid[get_row(gate_tuple.target), column + 1:column + 4] = list(gate_tuple.gate.icon.target)
+            if gate_tuple.control is not None:
+                grid[get_row(gate_tuple.control), column + 1:column + 4] = list(gate_tuple.gate.icon.control)
+                top, bottom = sorted([get_row(gate_tuple.target), get_row(gate_tuple.control)])
+                grid[top + 1:bottom, column + 2] = CONNECTION
 
-        circuit.reverse()
-        gap_lines.reverse()
-        for i in range(len(circuit) - 1):
-            print(circuit[i])
-            print(gap_lines[i])
-        print(circuit[-1])
+        label_width = len(str(self.input_size - 1))
+        labels = [f'{wire:<{label_width}} ' for wire in range(self.input_size - 1, -1, -1)]
+        rows = np.ascontiguousarray(grid).view(f'<U{grid.shape[1]}').ravel().tolist()
+        return '\n'.join((labels[row // 2] if row % 2 == 0 else ' ' * (label_width + 1)) + line for row, line in enumerate(rows))
 
-    def apply_circuit(self, *qubits):
+    def apply_circuit(self, *qubits, rng=None):
         if self.input_size != len(qubits):
             raise QubitMismatchError(expected_qubits=self.input_size, actual_qubits=len(qubits))
-        if len(qubits) > 2:
-            raise ExceedsQubitLimitError(len(qubits))
 
-        for i in range(len(qubits)):
-            logging.debug(f"Initial state of qubit {i + 1} is: {qubits[i]}")
-
-        for gate_tuple in self.__gates:
-            control_qubit = None
-            if gate_tuple.control is not None:
-                control_qubit = qubits[gate_tuple.control]
-            qubits[gate_tuple.target].apply_gate(gate_tuple.gate, control_qubit)
-
-            if control_qubit is None:
-                logging.debug(f"The gate {gate_tuple.gate.name} successfully applied on qubit {gate_tuple.target + 1}")
-            else:
-                logging.debug(f"The gate {gate_tuple.gate.name} successfully applied on qubit {gate_tuple.target + 1} with control qubit {gate_tuple.control + 1}")
-            for i in range(len(qubits)):
-                logging.debug(f"Qubit {i + 1} state: {qubits[i]}")
-            if qubits[gate_tuple.target].entangled_system is not None:
-                logging.debug(f"Qubits 1 and 2 in entangled system: {qubits[gate_tuple.target].entangled_system}")
+        # Per-operation events, with the states in between if requested, go to the tracer of src.tracing.
+        self.apply_to_state(FactorizedState.from_qubits(qubits), rng=rng)
+
+    def apply_circuit_batch(self, states, return_probabilities=False, precision=None):
+        if not self.compile().is_unitary:
+            raise UnsupportedOperationError('batched statevector', 'mid-circuit measurement or classically conditioned gates')
+
+        batch = BatchedStateVector.from_states(np.asarray(states), precision)
+        if batch.num_qubits != self.input_size:
+            raise QubitMismatchError(expected_qubits=self.input_size, actual_qubits=batch.num_qubits)
+
+        self.apply_to_state(batch)
+        return batch.probabilities() if return_probabilities else batch.amplitudes
+
+    def get_unitary(self):
+        return get_default_cache().get_unitary(self)
+
+    def apply_to_state(self, register, classical_bits=None, rng=None):
+        return self.compile().apply_to_state(register, classical_bits, rng)
+
+    def is_clifford(self):
+        records = self.__gate_table.records
+        is_clifford = np.array([is_clifford_gate(gate) for gate in self.__gate_table.gates], dtype=bool)
+        return bool(np.all(is_clifford[records['gate']]) and np.all(records['condition_bit'] == NO_INDEX))
+
+    def apply_to_tableau(self, tableau):
+        # The tableau tracks Clifford gates exactly, so it takes the unfused gate list.
+        if not self.is_clifford():
+            raise UnsupportedOperationError('stabilizer tableau', 'non-Clifford gates, mid-circuit measurement or classically conditioned gates')
+        # Gates of a moment act on disjoint qubits and commute, so each moment's single-qubit gates are
+        # applied one layer per gate kind.
+        for moment in self.get_moments():
+            layers = {}
+            for gate_tuple in moment:
+                if gate_tuple.control is None:
+                    layers.setdefault(gate_tuple.gate.name, (gate_tuple.gate, []))[1].append(gate_tuple.target)
+                else:
+                    tableau.apply_gate(gate_tuple.gate, gate_tuple.target, gate_tuple.control)
+            for gate, targets in layers.values():
+                tableau.apply_layer(gate, targets)
+        return tableau
+
+    def apply_to_mps(self, mps):
+        if not self.compile().is_unitary:
+            raise UnsupportedOperationError('matrix product state', 'mid-circuit measurement or classically conditioned gates')
+        for operation in self.compile().operations:
+            mps.apply_matrix(operation.matrix, operation.wires)
+        return mps
+
+    def apply_to_density_matrix(self, density_matrix, noise_model=None):
+        if not self.compile().is_unitary:
+            raise UnsupportedOperationError('density matrix', 'mid-circuit measurement or classically conditioned gates')
+        if noise_model is None:
+            for operation in self.compile().operations:
+                density_matrix.apply_matrix(operation.matrix, operation.wires)
+            return density_matrix
+
+        # Noise is attached to individual gates, so the unfused gate list is applied.
+        for gate_tuple in self.__gate_table:
+            wires = gate_wires(gate_tuple.target, gate_tuple.control)
+            density_matrix.apply_matrix(gate_tuple.gate.matrix, wires)
+            for channel, wire in noise_model.channels_after(gate_tuple.gate.name, wires):
+                density_matrix.apply_channel(channel, wire)
+        return density_matrix
@@ -1,75 +1,195 @@
-import logging
 import numpy as np
-import matplotlib.pyplot as plt
-from collections import Counter
-from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError
-from src.qubit import Qubit
-from src.utilities.quantum_constants import ZERO_STATE_KET_STRING, ZERO_STATE_KET, ONE_STATE_KET, ONE_STATE_KET_STRING, TWO_QUBIT_SHARED_SPACE
-from src.utilities.quantum_math import get_base_shared_space_from_two_qubit_states
+from concurrent.futures import ProcessPoolExecutor
+from src.branching import BranchTree
+from src.circuit_cache import get_default_cache
+from src.circuit_optimizer import optimize_circuit
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError, UnsupportedOperationError
+from src.density_matrix import MAX_DENSITY_MATRIX_QUBITS, DensityMatrix
+from src.run_result import get_run_result_type
+from src.mps import MAX_MPS_QUBITS, MatrixProductState
+from src.pauli import state_expectation_values, density_matrix_expectation_values
+from src.precision import PRECISIONS, get_dtype
+from src.packed_shots import MAX_OUTCOME_INDEX_QUBITS, PackedShots, bits_to_measurements, outcomes_to_measurements
+from src.stabilizer import MAX_STABILIZER_QUBITS, StabilizerTableau
+from src.statevector import MAX_STATEVECTOR_QUBITS
 
-logging.getLogger('matplotlib').setLevel(logging.WARNING)
+
+SHOT_CHUNK_SIZE = 2 ** 16
+
+_worker_sampler = None
+
+
+def _initialize_worker(runner, num_shots):
+    # Runs once per worker process: the runner carries the circuit with its compiled form,
+    # which is simulated here a single time and reused by every chunk the worker samples.
+    global _worker_sampler
+    _worker_sampler = runner.get_sampler(num_shots)
+
+
+def _sample_worker_chunk(seed_sequence, num_shots):
+    outcomes, _ = _worker_sampler.sample(np.random.default_rng(seed_sequence), num_shots)
+    return outcomes
+
+
+def get_chunk_sizes(num_times, chunk_size):
+    return [min(chunk_size, num_times - start) for start in range(0, num_times, chunk_size)]
 
 
 class QuantumCircuitRunner:
-    def __init__(self, circuit):
-        if circuit.input_size > 2:
-            raise ExceedsQubitLimitError(circuit.input_size)
+    def __init__(self, circuit, noise_model=None, mps_config=None, optimize=False, precision=None):
+        # precision selects the statevector dtype (see src.precision); the density matrix and matrix
+        # product state backends only run in complex128.
+        if noise_model is not None and mps_config is not None:
+            raise UnsupportedOperationError('matrix product state', 'noise models')
+        if precision is not None and get_dtype(precision) != PRECISIONS['complex128']:
+            if noise_model is not None:
+                raise UnsupportedOperationError('density matrix', f'{precision} precision')
+            if mps_config is not None:
+                raise UnsupportedOperationError('matrix product state', f'{precision} precision')
+        # Noise channels follow individual gates, so a noisy circuit is run exactly as it was built.
+        if noise_model is not None and optimize:
+            raise UnsupportedOperationError('circuit optimizer', 'noise models')
+        self.optimization_stats = None
+        if optimize:
+            circuit, self.optimization_stats = optimize_circuit(circuit)
+        if noise_model is not None:
+            max_qubits = MAX_DENSITY_MATRIX_QUBITS
+        elif mps_config is not None:
+            max_qubits = MAX_MPS_QUBITS
+        else:
+            max_qubits = MAX_STABILIZER_QUBITS if circuit.is_clifford() else MAX_STATEVECTOR_QUBITS
+        if circuit.input_size > max_qubits:
+            raise ExceedsQubitLimitError(circuit.input_size, max_qubits)
 
         self.circuit = circuit
+        self.noise_model = noise_model
+        self.mps_config = mps_config
+        # Resolved now, so worker processes use the precision that was the default here.
+        self.precision = get_dtype(precision).name
+
+    def run_circuit_multiple_times(self, num_times, show_plot=False, workers=1, seed=None, plot_path=None):
+        self.__validate_run(num_times, workers)
+        plot = show_plot or plot_path is not None
+        if self.circuit.input_size > MAX_OUTCOME_INDEX_QUBITS:
+            if plot:
+                raise ValueError(f"Cannot plot outcomes of more than {MAX_OUTCOME_INDEX_QUBITS} qubits")
+            return bits_to_measurements(self.sample_bits(num_times, seed=seed))
+
+        outcomes = self.sample_outcomes(num_times, workers=workers, seed=seed)
+        if plot:
+            get_run_result_type(self.circuit.input_size).from_outcomes(self.circuit.input_size, outcomes).plot(path=plot_path, show=show_plot)
+
+        return outcomes_to_measurements(outcomes, self.circuit.input_size)
+
+    def run(self, num_times, workers=1, seed=None):
+        # Counts only: with one worker the shots are folded into the result a chunk at a time and
+        # never held all at once. The outcomes are the ones sample_outcomes draws for the same seed.
+        # Circuits wider than MAX_DENSE_RESULT_QUBITS, which only the stabilizer and MPS backends
+        # sample, get a SparseRunResult of the observed outcomes.
+        self.__validate_run(num_times, workers)
+        if self.circuit.input_size > MAX_OUTCOME_INDEX_QUBITS:
+            raise ExceedsQubitLimitError(self.circuit.input_size, MAX_OUTCOME_INDEX_QUBITS)
+        result_type = get_run_result_type(self.circuit.input_size)
+        if workers > 1:
+            return result_type.from_outcomes(self.circuit.input_size, self.sample_outcomes(num_times, workers=workers, seed=seed))
+
+        result = result_type(self.circuit.input_size)
+        for outcomes in self.iter_shots(num_times, seed=seed):
+            result.update(outcomes)
+        return result
 
-    def run_circuit_multiple_times(self, num_times, show_plot=False):
+    def __validate_run(self, num_times, workers):
         if num_times < 1:
             raise ValueError("num_times must be greater than or equal to 1")
+        if workers < 1:
+            raise ValueError("workers must be greater than or equal to 1")
+
+    def get_sampler(self, num_shots=None):
+        # An MPS config opts into the matrix-product-state backend. Otherwise Clifford circuits run on the
+        # stabilizer tableau in polynomial time and memory, and every other circuit is simulated into its
+        # measurement branch tree, with no more branches than there are shots to draw from it.
+        if self.mps_config is not None:
+            return self.circuit.apply_to_mps(MatrixProductState.from_config(self.circuit.input_size, self.mps_config))
+        if self.noise_model is None and self.circuit.is_clifford():
+            return self.circuit.apply_to_tableau(StabilizerTableau(self.circuit.input_size))
+        return self.get_branch_tree(num_shots)
+
+    def get_branch_tree(self, max_branches=None):
+        if self.noise_model is None:
+            # The final state of a circuit without measurements comes from the compiled-circuit cache,
+            # so a circuit that was submitted before is not simulated again.
+            if self.circuit.compile().is_unitary:
+                return BranchTree.from_register(get_default_cache().get_final_state(self.circuit, self.precision))
+            return BranchTree.from_compiled_circuit(self.circuit.compile(), self.precision, max_branches)
+
+        density_matrix = self.circuit.apply_to_density_matrix(DensityMatrix(self.circuit.input_size), self.noise_model)
+        return BranchTree.from_probabilities(density_matrix.probabilities(self.noise_model))
+
+    def get_probabilities(self):
+        return self.get_sampler().get_probabilities()
+
+    def expectation_values(self, observables):
+        # Exact values from the final state, so no basis-change circuits and no shots are needed.
+        # After mid-circuit measurement the final state is a mixture of the measurement branches. The
+        # state is dense, so stabilizer and MPS circuits are only accepted up to MAX_STATEVECTOR_QUBITS,
+        # and an MPS circuit is evaluated on its truncated state as it is sampled.
+        if self.noise_model is not None:
+            density_matrix = self.circuit.apply_to_density_matrix(DensityMatrix(self.circuit.input_size), self.noise_model)
+            return density_matrix_expectation_values(density_matrix.matrix, observables)
+        if self.circuit.input_size > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(self.circuit.input_size, MAX_STATEVECTOR_QUBITS)
+        if self.mps_config is not None:
+            return state_expectation_values(self.get_sampler().amplitudes, observables)
+        return sum(probability * state_expectation_values(register.amplitudes, observables)
+                   for probability, _, register in self.get_branch_tree().iter_leaves())
+
+    def sample_outcomes(self, num_times, workers=1, seed=None):
+        # The circuit is simulated once into its measurement branch tree (a single branch when there
+        # is no mid-circuit measurement) and every shot is drawn from that tree. Shots are split into
+        # fixed-size chunks, each with its own child of one SeedSequence, so the outcomes for a
+        # given seed do not depend on how many workers draw the chunks.
+        if workers == 1:
+            return np.concatenate(list(self.iter_shots(num_times, seed=seed)))
+
+        chunk_sizes = get_chunk_sizes(num_times, SHOT_CHUNK_SIZE)
+        chunk_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker, initargs=(self, num_times)) as pool:
+            chunks = list(pool.map(_sample_worker_chunk, chunk_seeds, chunk_sizes))
+        return np.concatenate(chunks)
+
+    def sample_bits(self, num_times, seed=None):
+        # One row per shot and one column per qubit, which also holds outcomes too wide for an integer index.
+        return np.concatenate(list(self.__iter_samples(num_times, SHOT_CHUNK_SIZE, seed, as_bits=True)))
+
+    def sample_with_classical_bits(self, num_times, seed=None):
+        chunks = list(self.__iter_samples(num_times, SHOT_CHUNK_SIZE, seed))
+        return np.concatenate([outcomes for outcomes, _ in chunks]), np.concatenate([classical_bits for _, classical_bits in chunks])
+
+    def iter_shots(self, num_times, chunk_size=SHOT_CHUNK_SIZE, seed=None):
+        for outcomes, _ in self.__iter_samples(num_times, chunk_size, seed):
+            yield outcomes
+
+    def __iter_samples(self, num_times, chunk_size, seed, as_bits=False):
+        # Child seeds are spawned one chunk at a time, which yields the same sequence as spawning
+        # them all up front, so memory stays bounded by one chunk however many shots are drawn.
+        sampler = self.get_sampler(num_times)
+        seed_sequence = np.random.SeedSequence(seed)
+        for start in range(0, num_times, chunk_size):
+            chunk_seed, = seed_sequence.spawn(1)
+            rng, num_shots = np.random.default_rng(chunk_seed), min(chunk_size, num_times - start)
+            yield sampler.sample_bits(rng, num_shots) if as_bits else sampler.sample(rng, num_shots)
+
+    def store_shots(self, num_times, path=None, chunk_size=SHOT_CHUNK_SIZE, seed=None):
+        # With a path the shots are appended to that archive, which is created if it does not exist.
+        shots = PackedShots(self.circuit.input_size, path)
+        for outcomes in self.iter_shots(num_times, chunk_size=chunk_size, seed=seed):
+            shots.append(outcomes)
+        return shots
 
-        results = []
-        for _ in range(num_times):
-            qubits = [Qubit() for _ in range(self.circuit.input_size)]
-            self.circuit.apply_circuit(*qubits)
-            measurements = [q.measure() for q in qubits]
-            results.append(measurements)
-
-        if show_plot:
-            self.__plot_results(results)
-
-        return results
-
-    def __plot_results(self, results):
-        if not results:
-            raise ValueError("No results to plot.")
-
-        element_counts = self.__processed_results(results)
-        total_elements = len(results)
-        density = {element: count / total_elements for element, count in element_counts.items()}
-        labels, values = zip(*density.items())
-        plt.bar(labels, values)
-
-        plt.xlabel("Measurement Outcome")
-        plt.ylabel("Probability Density")
-        plt.title(f"Measurement Results\nNumber of runs: {len(results)}")
-        plt.ylim(0, 1)
-        plt.grid(axis="y", alpha=0.75)
-        plt.show()
-
-    def __processed_results(self, results):
-        processed_results = []
-        options = []
-
-        if self.circuit.input_size == 2:
-            options = [base_shared_space.str for base_shared_space in TWO_QUBIT_SHARED_SPACE]
-            for measurements in results:
-                base_shared_space = get_base_shared_space_from_two_qubit_states(measurements[0], measurements[1])
-                processed_results.append(base_shared_space.str)
-        if self.circuit.input_size == 1:
-            options = [ZERO_STATE_KET_STRING, ONE_STATE_KET_STRING]
-            for measurements in results:
-                if all(measurements[0] == ZERO_STATE_KET):
-                    processed_results.append(ZERO_STATE_KET_STRING)
-                elif all(measurements[0] == ONE_STATE_KET):
-                    processed_results.append(ONE_STATE_KET_STRING)
-
-        element_counts = Counter(processed_results)
-        for x in options:
-            if x not in element_counts.keys():
-                element_counts[x] = 0
-
-        return element_counts
+    def stream_histogram(self, num_times, chunk_size=SHOT_CHUNK_SIZE, seed=None):
+        # The counts so far after every chunk, in the same dense or sparse result type run() returns.
+        if self.circuit.input_size > MAX_OUTCOME_INDEX_QUBITS:
+            raise ExceedsQubitLimitError(self.circuit.input_size, MAX_OUTCOME_INDEX_QUBITS)
+        histogram = get_run_result_type(self.circuit.input_size)(self.circuit.input_size)
+        for outcomes in self.iter_shots(num_times, chunk_size=chunk_size, seed=seed):
+            yield histogram.update(outcomes)
@@ -1,26 +1,62 @@
 from collections import namedtuple
+from functools import lru_cache
+from types import MappingProxyType
 import numpy as np
 from abc import ABC
+from src.exceptions.quantum_circuit_exceptions import GateNotFoundError, InvalidGateParametersError
+from src.precision import PRECISIONS, get_dtype
 
 TextIcon = namedtuple('TextIcon', ['target', 'control'])
 
 UNICODE_CIRCLE_X = '\u29BB'
 UNICODE_BULLET = '\u25CF'
 
+PARAMETRIC_GATE_CACHE_SIZE = 4096
+
 
 def phase_matrix(phi):
     return np.array([[1, 0], [0, np.exp(1j * phi)]])
 
 
+def rx_matrix(theta):
+    return np.array([[np.cos(theta / 2), -1j * np.sin(theta / 2)], [-1j * np.sin(theta / 2), np.cos(theta / 2)]])
+
+
+def ry_matrix(theta):
+    return np.array([[np.cos(theta / 2), -np.sin(theta / 2)], [np.sin(theta / 2), np.cos(theta / 2)]])
+
+
+def rz_matrix(theta):
+    return np.array([[np.exp(-1j * theta / 2), 0], [0, np.exp(1j * theta / 2)]])
+
+
+def read_only_matrix(matrix, dtype=np.complex128):
+    matrix = np.array(matrix, dtype=dtype, order='C')
+    matrix.flags.writeable = False
+    return matrix
+
+
 class QuantumGate(ABC):
-    def __init__(self, name, matrix, icon):
+    def __init__(self, name, matrix, icon, params=()):
         self.name = name
-        self.matrix = matrix
+        self.matrix = read_only_matrix(matrix)
         self.icon = icon
+        self.params = params
+        # Rounded into every supported precision up front, so gates shared through GATE_REGISTRY are
+        # never written to after construction and threads can read them without a lock.
+        self.__matrices = MappingProxyType({dtype: self.matrix if dtype == self.matrix.dtype else read_only_matrix(self.matrix, dtype)
+                                            for dtype in PRECISIONS.values()})
+
+    def get_matrix(self, dtype):
+        # The matrix in a state's amplitude dtype, a name or dtype from src.precision.PRECISIONS.
+        return self.__matrices[get_dtype(dtype)]
 
     def is_two_qubit_gate(self):
         return not (self.icon.control is None)
 
+    def is_measurement(self):
+        return False
+
 
 class IdentityGate(QuantumGate):
     def __init__(self):
@@ -92,14 +128,62 @@ class CNotGate(QuantumGate):
                          icon=TextIcon(target=f'-{UNICODE_CIRCLE_X}-', control=f'-{UNICODE_BULLET}-'))
 
 
+class MeasureGate(QuantumGate):
+    # Not a unitary: circuits treat it as a projective measurement into a classical bit. The identity
+    # matrix only keeps the QuantumGate interface uniform and is never applied.
+    def __init__(self):
+        super().__init__(name='measure',
+                         matrix=np.array([[1, 0], [0, 1]]),
+                         icon=TextIcon(target='|M|', control=None))
+
+    def is_measurement(self):
+        return True
+
+
+class ParametricGate(QuantumGate):
+    def __init__(self, name, params):
+        matrix_function, icon = PARAMETRIC_GATE_DEFINITIONS[name]
+        super().__init__(name=name,
+                         matrix=matrix_function(*params),
+                         icon=icon,
+                         params=params)
+
+
+PARAMETRIC_GATE_DEFINITIONS = MappingProxyType({'rx': (rx_matrix, TextIcon(target='(X)', control=None)),
+                                                'ry': (ry_matrix, TextIcon(target='(Y)', control=None)),
+                                                'rz': (rz_matrix, TextIcon(target='(Z)', control=None)),
+                                                'phase': (phase_matrix, TextIcon(target='|P|', control=None))})
+
+GATE_REGISTRY = MappingProxyType({gate.name: gate for gate in [IdentityGate(),
+                                                               PauliXGate(),
+                                                               PauliYGate(),
+                                                               PauliZGate(),
+                                                               HadamardGate(),
+                                                               PhaseGate(),
+                                                               TGate(),
+                                                               NotGate(),
+                                                               SwapGate(),
+                                                               CNotGate()]})
+
+MEASURE_GATE = MeasureGate()
+
+
 def get_quantum_gate_list():
-    return [IdentityGate(),
-            PauliXGate(),
-            PauliYGate(),
-            PauliZGate(),
-            HadamardGate(),
-            PhaseGate(),
-            TGate(),
-            NotGate(),
-            SwapGate(),
-            CNotGate()]
+    return list(GATE_REGISTRY.values())
+
+
+def get_gate(name, params=()):
+    if not params and name in GATE_REGISTRY:
+        return GATE_REGISTRY[name]
+    if name in PARAMETRIC_GATE_DEFINITIONS:
+        if len(params) != 1:
+            raise InvalidGateParametersError(name, params)
+        return get_parametric_gate(name, tuple(float(param) for param in params))
+    if name in GATE_REGISTRY:
+        raise InvalidGateParametersError(name, params)
+    raise GateNotFoundError(name)
+
+
+@lru_cache(maxsize=PARAMETRIC_GATE_CACHE_SIZE)
+def get_parametric_gate(name, params):
+    return ParametricGate(name, params)
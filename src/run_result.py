@@ -0,0 +1,161 @@
+import numpy as np
+from src.shot_histogram import ShotHistogram
+from src.utilities.quantum_math import get_basis_state_string
+
+# Widest result kept as a dense array of 2^n counts, 128 MiB. Wider results keep only the observed
+# outcomes, in a SparseRunResult.
+MAX_DENSE_RESULT_QUBITS = 24
+
+
+def get_run_result_type(num_qubits):
+    return RunResult if num_qubits <= MAX_DENSE_RESULT_QUBITS else SparseRunResult
+
+
+def check_marginal_qubits(qubits, num_qubits):
+    if len(set(qubits)) != len(qubits) or any(qubit < 0 or qubit >= num_qubits for qubit in qubits):
+        raise ValueError(f"Invalid qubits {qubits} for a result of {num_qubits} qubits.")
+
+
+def merge_counts(outcomes, counts):
+    # Sums the counts of repeated outcomes, and returns the distinct outcomes in increasing order with their counts.
+    outcomes, inverse = np.unique(outcomes, return_inverse=True)
+    return outcomes, np.bincount(inverse.ravel(), weights=counts, minlength=len(outcomes)).astype(np.int64)
+
+
+def plot_probabilities(probabilities, num_shots, path=None, show=False):
+    # Without show the figure is drawn on a standalone Figure, which needs no display or GUI
+    # backend, and saved to path when one is given. Only observed outcomes get a bar.
+    if num_shots == 0:
+        raise ValueError("No results to plot.")
+
+    if show:
+        import matplotlib.pyplot as plt
+        figure = plt.figure()
+    else:
+        from matplotlib.figure import Figure
+        figure = Figure()
+
+    axes = figure.subplots()
+    labels, values = zip(*probabilities.items())
+    axes.bar(labels, values)
+    axes.set_xlabel("Measurement Outcome")
+    axes.set_ylabel("Probability Density")
+    axes.set_title(f"Measurement Results\nNumber of runs: {num_shots}")
+    axes.set_ylim(0, 1)
+    axes.grid(axis="y", alpha=0.75)
+
+    if path is not None:
+        figure.savefig(path)
+    if show:
+        plt.show()
+    return figure
+
+
+class RunResult(ShotHistogram):
+    # Counts of every outcome of a run, indexed by the outcome integer (qubit 0 is the most
+    # significant bit). Marginals and merges work on the count array directly, and matplotlib is
+    # only imported when a plot is drawn.
+    def __init__(self, num_qubits, counts=None):
+        super().__init__(num_qubits)
+        if counts is not None:
+            counts = np.asarray(counts, dtype=np.int64)
+            if counts.shape != self.counts.shape:
+                raise ValueError(f"Expected {len(self.counts)} counts for {num_qubits} qubits, got {counts.shape}.")
+            self.counts = counts
+            self.num_shots = int(counts.sum())
+
+    @classmethod
+    def from_outcomes(cls, num_qubits, outcomes):
+        return cls(num_qubits, np.bincount(np.asarray(outcomes, dtype=np.int64), minlength=2 ** num_qubits))
+
+    @classmethod
+    def merge_all(cls, results):
+        results = list(results)
+        merged = cls(results[0].num_qubits)
+        for result in results:
+            merged.merge_into(result)
+        return merged
+
+    def __add__(self, other):
+        return RunResult(self.num_qubits, self.counts.copy()).merge_into(other)
+
+    def __eq__(self, other):
+        return isinstance(other, ShotHistogram) and self.num_qubits == other.num_qubits and np.array_equal(self.counts, other.counts)
+
+    def merge_into(self, other):
+        # Adds the counts of another run of the same circuit width in place.
+        if other.num_qubits != self.num_qubits:
+            raise ValueError(f"Cannot merge results of {other.num_qubits} qubits into results of {self.num_qubits} qubits.")
+        self.counts += other.counts
+        self.num_shots += other.num_shots
+        return self
+
+    def marginal(self, qubits):
+        # Counts over the given qubits, in the given order, summed over every other qubit.
+        qubits = list(qubits)
+        check_marginal_qubits(qubits, self.num_qubits)
+        others = tuple(qubit for qubit in range(self.num_qubits) if qubit not in qubits)
+        kept = self.counts.reshape((2,) * self.num_qubits).sum(axis=others)
+        order = sorted(qubits)
+        return RunResult(len(qubits), kept.transpose([order.index(qubit) for qubit in qubits]).ravel())
+
+    def to_probability_dict(self):
+        outcomes = np.flatnonzero(self.counts)
+        return {get_basis_state_string(outcome, self.num_qubits): probability
+                for outcome, probability in zip(outcomes.tolist(), (self.counts[outcomes] / self.num_shots).tolist())}
+
+    def plot(self, path=None, show=False):
+        return plot_probabilities(self.to_probability_dict(), self.num_shots, path, show)
+
+
+class SparseRunResult:
+    # The counts of a run too wide for a dense count array: the distinct observed outcomes in
+    # increasing order, and how often each of them was seen.
+    def __init__(self, num_qubits, outcomes=(), counts=()):
+        self.num_qubits = num_qubits
+        self.outcomes = np.asarray(outcomes, dtype=np.int64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.num_shots = int(self.counts.sum())
+
+    @classmethod
+    def from_outcomes(cls, num_qubits, outcomes):
+        return cls(num_qubits, *np.unique(np.asarray(outcomes, dtype=np.int64), return_counts=True))
+
+    def __add__(self, other):
+        return SparseRunResult(self.num_qubits, self.outcomes, self.counts).merge_into(other)
+
+    def __eq__(self, other):
+        return (isinstance(other, SparseRunResult) and self.num_qubits == other.num_qubits
+                and np.array_equal(self.outcomes, other.outcomes) and np.array_equal(self.counts, other.counts))
+
+    def update(self, outcomes):
+        return self.merge_into(SparseRunResult.from_outcomes(self.num_qubits, outcomes))
+
+    def merge_into(self, other):
+        if other.num_qubits != self.num_qubits:
+            raise ValueError(f"Cannot merge results of {other.num_qubits} qubits into results of {self.num_qubits} qubits.")
+        self.outcomes, self.counts = merge_counts(np.concatenate([self.outcomes, other.outcomes]), np.concatenate([self.counts, other.counts]))
+        self.num_shots += other.num_shots
+        return self
+
+    def marginal(self, qubits):
+        # A marginal narrow enough for a dense count array is returned as a RunResult.
+        qubits = list(qubits)
+        check_marginal_qubits(qubits, self.num_qubits)
+        kept = np.zeros_like(self.outcomes)
+        for qubit in qubits:
+            kept = (kept << 1) | ((self.outcomes >> (self.num_qubits - 1 - qubit)) & 1)
+        if len(qubits) <= MAX_DENSE_RESULT_QUBITS:
+            return RunResult(len(qubits), np.bincount(kept, weights=self.counts, minlength=2 ** len(qubits)))
+        return SparseRunResult(len(qubits), *merge_counts(kept, self.counts))
+
+    def probabilities(self):
+        # The probability of each outcome in self.outcomes.
+        return self.counts / self.num_shots
+
+    def to_probability_dict(self):
+        return {get_basis_state_string(outcome, self.num_qubits): probability
+                for outcome, probability in zip(self.outcomes.tolist(), self.probabilities().tolist())}
+
+    def plot(self, path=None, show=False):
+        return plot_probabilities(self.to_probability_dict(), self.num_shots, path, show)
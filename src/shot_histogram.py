@@ -0,0 +1,22 @@
+from collections import Counter
+import numpy as np
+from src.utilities.quantum_math import get_basis_state_string
+
+
+class ShotHistogram:
+    def __init__(self, num_qubits):
+        self.num_qubits = num_qubits
+        self.counts = np.zeros(2 ** num_qubits, dtype=np.int64)
+        self.num_shots = 0
+
+    def update(self, outcomes):
+        # One buffered bincount per chunk; np.add.at would count in place but takes its slow unbuffered path.
+        self.counts += np.bincount(outcomes, minlength=len(self.counts))
+        self.num_shots += len(outcomes)
+        return self
+
+    def probabilities(self):
+        return self.counts / self.num_shots
+
+    def to_counter(self):
+        return Counter({get_basis_state_string(i, self.num_qubits): int(count) for i, count in enumerate(self.counts)})
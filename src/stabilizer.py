@@ -0,0 +1,244 @@
+from types import MappingProxyType
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError, UnsupportedOperationError
+from src.packed_shots import MAX_OUTCOME_INDEX_QUBITS, bits_to_outcomes
+from src.statevector import MAX_STATEVECTOR_QUBITS, gate_wires
+
+MAX_STABILIZER_QUBITS = 2 ** 14
+WORD_BITS = 64
+# Directions of the outcome space are XORed in groups of this many through a lookup table.
+SAMPLING_GROUP_BITS = 8
+# Set bits of every byte value. np.bitwise_count needs NumPy 2, and requirements.txt pins 1.26.
+BYTE_POPCOUNTS = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+BYTE_POPCOUNTS.flags.writeable = False
+
+# Every Clifford gate of the registry as tableau primitives on its wires, where wire 0 is the target
+# and wire 1 the control. The gate matrices act on kron(target, control), so cnot flips the control
+# wire when the target is set.
+CLIFFORD_DECOMPOSITIONS = MappingProxyType({'identity': (),
+                                            'pauli_x': (('x', 0),),
+                                            'not': (('x', 0),),
+                                            'pauli_y': (('y', 0),),
+                                            'pauli_z': (('z', 0),),
+                                            'hadamard': (('h', 0),),
+                                            'phase': (('s', 0),),
+                                            'swap': (('swap', 0, 1),),
+                                            'cnot': (('cnot', 0, 1),)})
+
+
+def is_clifford_gate(gate):
+    return gate.name in CLIFFORD_DECOMPOSITIONS and not gate.params
+
+
+def get_word_count(num_qubits):
+    return max(1, -(-num_qubits // WORD_BITS))
+
+
+def get_popcount(words):
+    return BYTE_POPCOUNTS[np.ascontiguousarray(words).view(np.uint8)].sum(axis=-1, dtype=np.int64)
+
+
+def get_product_phases(x, z, r, source_x, source_z, source_r):
+    # Sign bits of source * row for every row, as in the CHP rowsum: i^(2r + 2r_source + Σ g), where g
+    # is +1 or -1 for each qubit on which the two Paulis multiply to ±i times a third one.
+    plus = (source_x & source_z & ~x & z) | (source_x & ~source_z & x & z) | (~source_x & source_z & x & ~z)
+    minus = (source_x & source_z & x & ~z) | (source_x & ~source_z & ~x & z) | (~source_x & source_z & x & z)
+    exponent = 2 * r.astype(np.int64) + 2 * int(source_r) + get_popcount(plus) - get_popcount(minus)
+    return ((exponent % 4) // 2).astype(np.uint8)
+
+
+class StabilizerTableau:
+    # Aaronson-Gottesman (CHP) tableau: rows 0..n-1 are the destabilizers and rows n..2n-1 the
+    # stabilizers of the state, each row a Pauli string stored as packed x and z bits (qubit q is bit
+    # q % 64 of word q // 64) plus a sign bit. Gates cost O(n) and memory is O(n^2) bits.
+    def __init__(self, num_qubits):
+        if num_qubits > MAX_STABILIZER_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_STABILIZER_QUBITS)
+
+        self.num_qubits = num_qubits
+        self.x = np.zeros((2 * num_qubits, get_word_count(num_qubits)), dtype=np.uint64)
+        self.z = np.zeros_like(self.x)
+        self.r = np.zeros(2 * num_qubits, dtype=np.uint8)
+        for qubit in range(num_qubits):
+            self.__flip(self.x, qubit, self.__unit_column(qubit))
+            self.__flip(self.z, qubit, self.__unit_column(num_qubits + qubit))
+        self.__outcome_space = None
+        self.__primitives = {'x': self.__pauli_x, 'y': self.__pauli_y, 'z': self.__pauli_z, 'h': self.__hadamard, 's': self.__phase,
+                             'swap': self.__swap, 'cnot': self.__cnot}
+        self.__layer_primitives = {'x': self.__pauli_x_layer, 'y': self.__pauli_y_layer, 'z': self.__pauli_z_layer, 'h': self.__hadamard_layer,
+                                   's': self.__phase_layer}
+
+    def apply_gate(self, gate, target, control=None):
+        if not is_clifford_gate(gate):
+            raise UnsupportedOperationError('stabilizer tableau', f"the non-Clifford gate '{gate.name}'")
+
+        wires = gate_wires(target, control)
+        for name, *positions in CLIFFORD_DECOMPOSITIONS[gate.name]:
+            self.__primitives[name](*[wires[position] for position in positions])
+        self.__outcome_space = None
+
+    def apply_layer(self, gate, targets):
+        # One single-qubit Clifford gate on distinct qubits, e.g. all of its gates in a moment. Each
+        # primitive runs as masked operations on whole words, so the layer costs one pass over the
+        # tableau instead of one column update per qubit.
+        if not is_clifford_gate(gate) or gate.is_two_qubit_gate():
+            raise UnsupportedOperationError('stabilizer tableau layer', f"the gate '{gate.name}'")
+
+        targets = np.asarray(targets, dtype=np.uint64)
+        mask = np.zeros(self.x.shape[1], dtype=np.uint64)
+        np.bitwise_or.at(mask, (targets // np.uint64(WORD_BITS)).astype(np.intp), np.uint64(1) << (targets % np.uint64(WORD_BITS)))
+        for name, _ in CLIFFORD_DECOMPOSITIONS[gate.name]:
+            self.__layer_primitives[name](mask)
+        self.__outcome_space = None
+
+    def get_outcome_space(self):
+        # Z-basis outcomes of a stabilizer state are uniform over an affine space offset + span(directions).
+        # Bringing the stabilizers to echelon form on their x bits leaves k rows whose x parts are the
+        # directions and n - k diagonal rows ±Z^z, each fixing the parity z·b of an outcome to its sign bit.
+        if self.__outcome_space is None:
+            n = self.num_qubits
+            x, z, r = self.x[n:].copy(), self.z[n:].copy(), self.r[n:].copy()
+            num_directions = self.__row_reduce(x, z, r, 0, multiply_phases=True)
+            self.__row_reduce(z, x, r, num_directions, multiply_phases=False)
+
+            # Back substitution over the echelon form: each diagonal row fixes the outcome bit at its pivot.
+            offset = np.zeros(x.shape[1], dtype=np.uint64)
+            for row in range(n - 1, num_directions - 1, -1):
+                pivot = self.__first_set_bit(z[row])
+                if (get_popcount(z[row] & offset) + r[row]) % 2:
+                    offset[pivot // WORD_BITS] ^= np.uint64(1) << np.uint64(pivot % WORD_BITS)
+            self.__outcome_space = offset, x[:num_directions]
+        return self.__outcome_space
+
+    def sample_bits(self, rng, num_shots):
+        # The lookup table holds every XOR combination of one group of directions, so each group costs a
+        # single gather per shot instead of one pass per direction.
+        offset, directions = self.get_outcome_space()
+        packed = np.tile(offset, (num_shots, 1))
+        for start in range(0, len(directions), SAMPLING_GROUP_BITS):
+            group = directions[start:start + SAMPLING_GROUP_BITS]
+            table = np.zeros((2 ** len(group), len(offset)), dtype=np.uint64)
+            for i, direction in enumerate(group):
+                table[2 ** i:2 ** (i + 1)] = table[:2 ** i] ^ direction
+            packed ^= table[rng.integers(0, len(table), size=num_shots)]
+        bits = np.unpackbits(packed.astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        return bits[:, :self.num_qubits]
+
+    def sample(self, rng, num_shots):
+        if self.num_qubits > MAX_OUTCOME_INDEX_QUBITS:
+            raise ExceedsQubitLimitError(self.num_qubits, MAX_OUTCOME_INDEX_QUBITS)
+        return bits_to_outcomes(self.sample_bits(rng, num_shots)), np.zeros((num_shots, 0), dtype=np.uint8)
+
+    def get_probabilities(self):
+        if self.num_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(self.num_qubits, MAX_STATEVECTOR_QUBITS)
+
+        offset, directions = self.get_outcome_space()
+        bits = np.unpackbits(np.vstack([offset, directions]).astype('<u8').view(np.uint8), axis=1, bitorder='little')
+        offset_index, *direction_indices = bits_to_outcomes(bits[:, :self.num_qubits])
+        outcomes = np.array([offset_index], dtype=np.int64)
+        for direction_index in direction_indices:
+            outcomes = np.concatenate([outcomes, outcomes ^ direction_index])
+        probabilities = np.zeros(2 ** self.num_qubits)
+        probabilities[outcomes] = 1 / len(outcomes)
+        return probabilities
+
+    def __row_reduce(self, pivot_bits, other_bits, r, first_row, multiply_phases):
+        # Forward elimination to echelon form on pivot_bits from first_row down; returns the row after the
+        # last pivot. Clearing only the rows below a pivot keeps sparse generators sparse.
+        # Stabilizer rows multiply as Paulis, so their sign bits follow the rowsum phase rule; diagonal
+        # rows commute without a phase and their sign bits simply XOR.
+        pivot_row = first_row
+        for qubit in range(self.num_qubits):
+            column = self.__column(pivot_bits, qubit)
+            candidates = np.flatnonzero(column[pivot_row:])
+            if len(candidates) == 0:
+                continue
+
+            row = pivot_row + candidates[0]
+            for bits in [pivot_bits, other_bits, r]:
+                bits[[pivot_row, row]] = bits[[row, pivot_row]]
+            rows = np.flatnonzero(self.__column(pivot_bits, qubit))
+            rows = rows[rows > pivot_row]
+            if multiply_phases:
+                r[rows] = get_product_phases(pivot_bits[rows], other_bits[rows], r[rows], pivot_bits[pivot_row], other_bits[pivot_row], r[pivot_row])
+            else:
+                r[rows] ^= r[pivot_row]
+            pivot_bits[rows] ^= pivot_bits[pivot_row]
+            other_bits[rows] ^= other_bits[pivot_row]
+            pivot_row += 1
+            if pivot_row == len(r):
+                break
+        return pivot_row
+
+    def __column(self, bits, qubit):
+        return (bits[:, qubit // WORD_BITS] >> np.uint64(qubit % WORD_BITS)) & np.uint64(1)
+
+    def __flip(self, bits, qubit, column):
+        bits[:, qubit // WORD_BITS] ^= column << np.uint64(qubit % WORD_BITS)
+
+    def __unit_column(self, row):
+        column = np.zeros(2 * self.num_qubits, dtype=np.uint64)
+        column[row] = 1
+        return column
+
+    def __first_set_bit(self, words):
+        for word_index in np.flatnonzero(words):
+            word = int(words[word_index])
+            return word_index * WORD_BITS + (word & -word).bit_length() - 1
+        return None
+
+    def __pauli_x(self, qubit):
+        self.r ^= self.__column(self.z, qubit).astype(np.uint8)
+
+    def __pauli_y(self, qubit):
+        self.r ^= (self.__column(self.x, qubit) ^ self.__column(self.z, qubit)).astype(np.uint8)
+
+    def __pauli_z(self, qubit):
+        self.r ^= self.__column(self.x, qubit).astype(np.uint8)
+
+    def __hadamard(self, qubit):
+        x, z = self.__column(self.x, qubit), self.__column(self.z, qubit)
+        self.r ^= (x & z).astype(np.uint8)
+        self.__flip(self.x, qubit, x ^ z)
+        self.__flip(self.z, qubit, x ^ z)
+
+    def __phase(self, qubit):
+        x, z = self.__column(self.x, qubit), self.__column(self.z, qubit)
+        self.r ^= (x & z).astype(np.uint8)
+        self.__flip(self.z, qubit, x)
+
+    def __swap(self, qubit, other_qubit):
+        for bits in [self.x, self.z]:
+            difference = self.__column(bits, qubit) ^ self.__column(bits, other_qubit)
+            self.__flip(bits, qubit, difference)
+            self.__flip(bits, other_qubit, difference)
+
+    def __cnot(self, control, target):
+        x_control, z_control = self.__column(self.x, control), self.__column(self.z, control)
+        x_target, z_target = self.__column(self.x, target), self.__column(self.z, target)
+        self.r ^= (x_control & z_target & (x_target ^ z_control ^ np.uint64(1))).astype(np.uint8)
+        self.__flip(self.x, target, x_control)
+        self.__flip(self.z, control, z_target)
+
+    def __flip_signs(self, bits):
+        self.r ^= (get_popcount(bits) & 1).astype(np.uint8)
+
+    def __pauli_x_layer(self, mask):
+        self.__flip_signs(self.z & mask)
+
+    def __pauli_y_layer(self, mask):
+        self.__flip_signs((self.x ^ self.z) & mask)
+
+    def __pauli_z_layer(self, mask):
+        self.__flip_signs(self.x & mask)
+
+    def __hadamard_layer(self, mask):
+        self.__flip_signs(self.x & self.z & mask)
+        difference = (self.x ^ self.z) & mask
+        self.x ^= difference
+        self.z ^= difference
+
+    def __phase_layer(self, mask):
+        self.__flip_signs(self.x & self.z & mask)
+        self.z ^= self.x & mask
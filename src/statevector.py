@@ -0,0 +1,255 @@
+from functools import reduce
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError
+from src.exceptions.vector_exception import VectorError
+from src.precision import get_basis_state_tolerance, get_dtype, get_separability_tolerance, get_zero_tolerance
+from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
+
+MAX_STATEVECTOR_QUBITS = 30
+# Reductions over one qubit's two halves of the state run over slices of at most this many amplitudes,
+# so they never copy the whole state.
+REDUCTION_CHUNK_AMPLITUDES = 2 ** 16
+
+
+# The kernels below work on any C-contiguous array whose leading axes are the qubit axes
+# (qubit 0 is the most significant bit), so trailing axes such as a batch axis come for free.
+# Results are written into `out`, which must not overlap `state`. Matrices must already have the
+# state's dtype: a complex128 matrix would make numpy compute a complex64 state in complex128.
+
+def apply_single_qubit_matrix(state, matrix, wire, out):
+    shape = (2 ** wire, 2, -1)
+    np.matmul(matrix, state.reshape(shape), out=out.reshape(shape))
+    return out
+
+
+def apply_two_qubit_matrix(state, matrix, wires, out):
+    # The 4x4 matrix acts on kron(wires[0], wires[1]), the same ordering Qubit.apply_gate uses.
+    low, high = sorted(wires)
+    shape = (2 ** low, 2, 2 ** (high - low - 1), 2, -1)
+    gate = matrix.reshape(2, 2, 2, 2)
+    if wires[0] > wires[1]:
+        gate = gate.transpose(1, 0, 3, 2)
+    np.einsum(gate, [5, 6, 1, 3], state.reshape(shape), [0, 1, 2, 3, 4], [0, 5, 2, 6, 4], out=out.reshape(shape))
+    return out
+
+
+def apply_matrix(state, matrix, wires, out):
+    if len(wires) == 1:
+        return apply_single_qubit_matrix(state, matrix, wires[0], out)
+    return apply_two_qubit_matrix(state, matrix, wires, out)
+
+
+# The kernels below take one matrix per batch column, as a (B, k, k) stack, for a (2^n, B) state whose
+# columns run different circuits with the same wires.
+
+def apply_single_qubit_matrices(state, matrices, wire, out):
+    shape = (2 ** wire, 2, -1, matrices.shape[0])
+    np.einsum('bij,ajcb->aicb', matrices, state.reshape(shape), out=out.reshape(shape))
+    return out
+
+
+def apply_two_qubit_matrices(state, matrices, wires, out):
+    low, high = sorted(wires)
+    shape = (2 ** low, 2, 2 ** (high - low - 1), 2, -1, matrices.shape[0])
+    gates = matrices.reshape(-1, 2, 2, 2, 2)
+    if wires[0] > wires[1]:
+        gates = gates.transpose(0, 2, 1, 4, 3)
+    np.einsum('bpqjl,ajcldb->apcqdb', gates, state.reshape(shape), out=out.reshape(shape))
+    return out
+
+
+def apply_matrices(state, matrices, wires, out):
+    if len(wires) == 1:
+        return apply_single_qubit_matrices(state, matrices, wires[0], out)
+    return apply_two_qubit_matrices(state, matrices, wires, out)
+
+
+def iter_block_slices(blocks):
+    # Slices of the leading axis of a (left, 2, right) view, each covering at most REDUCTION_CHUNK_AMPLITUDES.
+    step = max(1, REDUCTION_CHUNK_AMPLITUDES // (2 * blocks.shape[2]))
+    return (slice(start, start + step) for start in range(0, blocks.shape[0], step))
+
+
+def get_reduced_density_matrix(state, wire):
+    # Accumulated in complex128 one slice at a time, so that a complex64 state's eigenvalues resolve
+    # below its own rounding. Entry (i, j) is the overlap of the |i⟩ and |j⟩ halves of the state.
+    blocks = state.reshape(2 ** wire, 2, -1)
+    matrix = np.zeros((2, 2), dtype=np.complex128)
+    for rows in iter_block_slices(blocks):
+        chunk = blocks[rows].astype(np.complex128, copy=False)
+        zero, one = np.ascontiguousarray(chunk[:, 0, :]), np.ascontiguousarray(chunk[:, 1, :])
+        overlap = np.vdot(one, zero)
+        matrix += [[np.vdot(zero, zero), overlap], [np.conj(overlap), np.vdot(one, one)]]
+    return matrix
+
+
+def gate_wires(target, control=None):
+    if control is None:
+        return (target,)
+    return (target, control)
+
+
+class StateVector:
+    # precision is a name or dtype accepted by src.precision.get_dtype, the default precision if None.
+    # Gate matrices are cast to the amplitude dtype before they reach a kernel.
+    def __init__(self, num_qubits, precision=None):
+        if num_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_STATEVECTOR_QUBITS)
+
+        self.num_qubits = num_qubits
+        self.dtype = get_dtype(precision)
+        self.__tolerance = get_zero_tolerance(self.dtype)
+        self.__separability_tolerance = get_separability_tolerance(self.dtype)
+        self.__amplitudes = np.zeros(2 ** num_qubits, dtype=self.dtype)
+        self.__scratch = np.empty_like(self.__amplitudes)
+        self.__amplitudes[0] = 1
+
+    @classmethod
+    def from_qubits(cls, qubits, precision=None):
+        register = cls(len(qubits), precision)
+        shared_register = qubits[0].register
+        if all(qubit.register is shared_register for qubit in qubits) and [qubit.register_index for qubit in qubits] == list(range(shared_register.num_qubits)):
+            register.amplitudes[:] = shared_register.amplitudes
+        else:
+            register.amplitudes[:] = reduce(np.kron, [np.ravel(qubit.state) for qubit in qubits])
+        return register
+
+    @property
+    def amplitudes(self):
+        return self.__amplitudes
+
+    @property
+    def state(self):
+        return self.__amplitudes.reshape(-1, 1)
+
+    def __str__(self):
+        from src.utilities.quantum_math import format_joint_state
+        return format_joint_state(self.state)
+
+    def apply_gate(self, gate, target, control=None):
+        self.apply_matrix(gate.get_matrix(self.dtype), gate_wires(target, control))
+
+    def apply_matrix(self, matrix, wires):
+        apply_matrix(self.__amplitudes, np.asarray(matrix, dtype=self.dtype), wires, self.__scratch)
+        self.__amplitudes, self.__scratch = self.__scratch, self.__amplitudes
+
+    def probabilities(self):
+        return np.abs(self.__amplitudes) ** 2
+
+    def copy(self):
+        register = StateVector(self.num_qubits, self.dtype)
+        register.amplitudes[:] = self.__amplitudes
+        return register
+
+    def get_outcome_probability(self, qubit_index, outcome):
+        blocks = self.__amplitudes.reshape(2 ** qubit_index, 2, -1)
+        return np.vdot(blocks[:, outcome, :], blocks[:, outcome, :]).real
+
+    def collapse(self, qubit_index, outcome, probability):
+        blocks = self.__amplitudes.reshape(2 ** qubit_index, 2, -1)
+        blocks[:, 1 - outcome, :] = 0
+        blocks /= np.sqrt(probability)
+
+    def measure(self, qubit_index, rng=None):
+        # rng is a numpy Generator, a fresh unseeded one if None; pass a seeded one for reproducible outcomes.
+        rng = np.random.default_rng() if rng is None else rng
+        probability_of_one = self.get_outcome_probability(qubit_index, 1)
+        outcome = int(rng.random() < probability_of_one)
+        self.collapse(qubit_index, outcome, probability_of_one if outcome else 1 - probability_of_one)
+        return outcome
+
+    def is_qubit_entangled(self, qubit_index):
+        # The smaller eigenvalue of the reduced density matrix is the weight split_qubit would drop, so
+        # the qubit only counts as separable when that weight is at rounding level.
+        eigenvalues = np.linalg.eigvalsh(get_reduced_density_matrix(self.__amplitudes, qubit_index))
+        return eigenvalues[0] > self.__separability_tolerance * eigenvalues.sum()
+
+    def get_qubit_state(self, qubit_index):
+        # Entangled qubits get the sum of their conditional amplitudes, which is what
+        # get_qubit_states_from_shared_space reports for two qubits; separable qubits get their exact ket.
+        qubit_state = self.__summed_amplitudes(qubit_index)
+        if not self.is_qubit_entangled(qubit_index) or np.linalg.norm(qubit_state) < self.__tolerance:
+            qubit_state = self.__principal_state(qubit_index)
+        qubit_state = qubit_state.reshape(2, 1) / np.linalg.norm(qubit_state)
+
+        for basis_ket in [ZERO_STATE_KET, ONE_STATE_KET]:
+            if np.allclose(qubit_state, basis_ket, atol=get_basis_state_tolerance(self.dtype)):
+                return basis_ket.astype(self.dtype, copy=False)
+        return qubit_state.astype(self.dtype, copy=False)
+
+    def split_qubit(self, qubit_index):
+        # Only valid for a qubit that is not entangled: its matrix is then the outer product of the
+        # qubit's state and the state of the rest of the register, up to the weight is_qubit_entangled
+        # allows, which is dropped. The rest is projected out slice by slice.
+        qubit_state = self.__principal_state(qubit_index)
+        zero_weight, one_weight = qubit_state.conj().astype(self.dtype)
+
+        qubit_register, rest_register = StateVector(1, self.dtype), StateVector(self.num_qubits - 1, self.dtype)
+        qubit_register.amplitudes[:] = qubit_state
+        blocks = self.__amplitudes.reshape(2 ** qubit_index, 2, -1)
+        rest = rest_register.amplitudes.reshape(blocks.shape[0], blocks.shape[2])
+        for rows in iter_block_slices(blocks):
+            np.multiply(blocks[rows, 0, :], zero_weight, out=rest[rows])
+            rest[rows] += one_weight * blocks[rows, 1, :]
+        rest /= np.sqrt(np.vdot(rest, rest).real)
+        return qubit_register, rest_register
+
+    def __summed_amplitudes(self, qubit_index):
+        blocks = self.__amplitudes.reshape(2 ** qubit_index, 2, -1)
+        return np.array([blocks[:, 0, :].sum(), blocks[:, 1, :].sum()])
+
+    def __principal_state(self, qubit_index):
+        # The dominant eigenvector of the reduced density matrix, which is the qubit's state when it is
+        # separable, in the phase of its summed amplitudes where they do not vanish.
+        _, eigenvectors = np.linalg.eigh(get_reduced_density_matrix(self.__amplitudes, qubit_index))
+        qubit_state = eigenvectors[:, 1]
+        overlap = np.vdot(qubit_state, self.__summed_amplitudes(qubit_index))
+        if abs(overlap) > self.__tolerance:
+            qubit_state = qubit_state * (overlap / abs(overlap))
+        return qubit_state
+
+
+class BatchedStateVector:
+    # Column b of the (2^n, B) amplitude array is the b-th state of the batch. The batch axis trails
+    # the qubit axes, so each kernel call is one matrix-matrix product over the whole batch.
+    def __init__(self, num_qubits, batch_size, precision=None):
+        if num_qubits > MAX_STATEVECTOR_QUBITS:
+            raise ExceedsQubitLimitError(num_qubits, MAX_STATEVECTOR_QUBITS)
+
+        self.num_qubits = num_qubits
+        self.batch_size = batch_size
+        self.dtype = get_dtype(precision)
+        self.__amplitudes = np.zeros((2 ** num_qubits, batch_size), dtype=self.dtype)
+        self.__scratch = np.empty_like(self.__amplitudes)
+        self.__amplitudes[0] = 1
+
+    @classmethod
+    def from_states(cls, states, precision=None):
+        if states.ndim != 2 or not is_power_of_two(states.shape[0]):
+            raise VectorError('Invalid batch input: expected a (2^n, B) array of column states.')
+        batch = cls(states.shape[0].bit_length() - 1, states.shape[1], precision)
+        batch.amplitudes[:] = states
+        return batch
+
+    @property
+    def amplitudes(self):
+        return self.__amplitudes
+
+    def apply_gate(self, gate, target, control=None):
+        self.apply_matrix(gate.get_matrix(self.dtype), gate_wires(target, control))
+
+    def apply_matrix(self, matrix, wires):
+        apply_matrix(self.__amplitudes, np.asarray(matrix, dtype=self.dtype), wires, self.__scratch)
+        self.__amplitudes, self.__scratch = self.__scratch, self.__amplitudes
+
+    def apply_matrices(self, matrices, wires):
+        # matrices[b] acts on column b.
+        apply_matrices(self.__amplitudes, np.asarray(matrices, dtype=self.dtype), wires, self.__scratch)
+        self.__amplitudes, self.__scratch = self.__scratch, self.__amplitudes
+
+    def probabilities(self):
+        return np.abs(self.__amplitudes) ** 2
+
+
+def is_power_of_two(number):
+    return number > 0 and number & (number - 1) == 0
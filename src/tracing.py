@@ -0,0 +1,78 @@
+import json
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+import numpy as np
+
+DEFAULT_TRACE_CAPACITY = 2 ** 16
+
+# One applied operation: the gates fused into it, its wires, when it started (seconds since the
+# tracer was created), how long it took, and optionally the register's amplitudes afterwards.
+TraceEvent = namedtuple('TraceEvent', ['index', 'gates', 'wires', 'start', 'duration', 'state'])
+
+_active_tracer = None
+
+
+class CircuitTracer:
+    # A bounded ring buffer of TraceEvents: once capacity events are held, each new event drops the
+    # oldest one. Engines look the active tracer up once per run, so nothing is paid per gate while
+    # no tracer is installed. While one is installed the compiled-circuit cache simulates circuits
+    # again instead of returning their cached final states, so every run is traced.
+    def __init__(self, capacity=DEFAULT_TRACE_CAPACITY, capture_state=False):
+        self.capacity = capacity
+        self.capture_state = capture_state
+        self.__events = deque(maxlen=capacity)
+        self.__recorded = 0
+        self.__origin = time.perf_counter()
+
+    def __len__(self):
+        return len(self.__events)
+
+    @property
+    def events(self):
+        return list(self.__events)
+
+    @property
+    def dropped(self):
+        return self.__recorded - len(self.__events)
+
+    def record(self, gates, wires, start, end, register):
+        state = np.array(register.amplitudes) if self.capture_state else None
+        self.__events.append(TraceEvent(self.__recorded, tuple(gates), tuple(int(wire) for wire in wires), start - self.__origin, end - start, state))
+        self.__recorded += 1
+
+    def clear(self):
+        self.__events.clear()
+        self.__recorded = 0
+
+    def to_dict(self):
+        # Plain lists and numbers only, so the result can be passed to json.dump as is.
+        return {'capacity': self.capacity,
+                'dropped': self.dropped,
+                'events': [dict(event._asdict(), gates=list(event.gates), wires=list(event.wires), state=None if event.state is None else np.stack([event.state.real, event.state.imag], axis=-1).tolist())
+                           for event in self.__events]}
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+
+
+def get_tracer():
+    return _active_tracer
+
+
+def set_tracer(tracer):
+    global _active_tracer
+    _active_tracer = tracer
+
+
+@contextmanager
+def tracing(tracer=None):
+    # Installs a tracer (a new one by default) for the duration of the block and yields it.
+    previous = get_tracer()
+    tracer = CircuitTracer() if tracer is None else tracer
+    set_tracer(tracer)
+    try:
+        yield tracer
+    finally:
+        set_tracer(previous)
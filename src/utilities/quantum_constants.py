@@ -1,14 +1,15 @@
 from collections import namedtuple
 import numpy as np
 
-ZERO_STATE_KET = np.array([[1], [0]])  # state |0⟩
-ONE_STATE_KET = np.array([[0], [1]])  # state |1⟩
+# complex128 like every state and gate matrix, so combining them with amplitudes never promotes.
+ZERO_STATE_KET = np.array([[1], [0]], dtype=np.complex128)  # state |0⟩
+ONE_STATE_KET = np.array([[0], [1]], dtype=np.complex128)  # state |1⟩
 
 ZERO_STATE_KET_STRING = '|0⟩'
 ONE_STATE_KET_STRING = '|1⟩'
 
-ZERO_STATE_BRA = np.array([[1, 0]])  # state ⟨0|
-ONE_STATE_BRA = np.array([[0, 1]])  # state ⟨1|
+ZERO_STATE_BRA = np.array([[1, 0]], dtype=np.complex128)  # state ⟨0|
+ONE_STATE_BRA = np.array([[0, 1]], dtype=np.complex128)  # state ⟨1|
 
 SharedSpaceVectorTuple = namedtuple('SharedSpaceVectorTuple', ['base_vector', 'left_qubit', 'right_qubit', 'str'])
 
@@ -69,16 +69,11 @@ def get_linear_dependence_on_basis_vectors(vector, normalize=True):
 
 
 def get_qubit_states_from_shared_space(shared_state):
-    linear_dependence = get_linear_dependence_on_basis_vectors(shared_state)
-    left_qubit = np.array([[0], [0]], dtype=np.float64)
-    right_qubit = np.array([[0], [0]], dtype=np.float64)
-    i = 0
-    for shared_space_vector_tuple in TWO_QUBIT_SHARED_SPACE:
-        coefficient = linear_dependence[i]
-        left_qubit += shared_space_vector_tuple.left_qubit * coefficient
-        right_qubit += shared_space_vector_tuple.right_qubit * coefficient
-        i += 1
-
+    # Coefficient (i, j) belongs to |i⟩ ⊗ |j⟩: the left qubit sums them over j and the right qubit over
+    # i, in the coefficients' own dtype.
+    coefficients = np.asarray(get_linear_dependence_on_basis_vectors(shared_state)).reshape(2, 2)
+    left_qubit = coefficients.sum(axis=1).reshape(2, 1)
+    right_qubit = coefficients.sum(axis=0).reshape(2, 1)
     return left_qubit / np.linalg.norm(left_qubit), right_qubit / np.linalg.norm(right_qubit)
 
 
@@ -87,3 +82,20 @@ def get_base_shared_space_from_two_qubit_states(qubit_one_state, qubit_two_state
         if all(qubit_one_state == shared_space_vector_tuple.left_qubit) and all(qubit_two_state == shared_space_vector_tuple.right_qubit):
             return shared_space_vector_tuple
     return None
+
+
+def get_basis_state_string(index, num_qubits):
+    return f"|{index:0{num_qubits}b}⟩"
+
+
+def format_joint_state(state):
+    from sympy import nsimplify, sqrt
+
+    amplitudes = np.ravel(state) / np.linalg.norm(state)
+    num_qubits = int(np.log2(len(amplitudes)))
+    terms = []
+    for i in np.flatnonzero(amplitudes):
+        coefficient = nsimplify(amplitudes[i], [sqrt(2), sqrt(3), sqrt(5), sqrt(7), sqrt(11)])
+        if coefficient != 0:
+            terms.append(f"{coefficient} * {get_basis_state_string(i, num_qubits)}")
+    return ' +'.join(terms)
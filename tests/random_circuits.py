@@ -0,0 +1,18 @@
+import numpy as np
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_quantum_gate_list
+
+
+def random_circuit(rng, num_qubits, num_gates, gates=None, rotation=None, rotation_probability=1):
+    # num_gates gates drawn from gates (every registered gate by default), each on random distinct
+    # wires. With a rotation gate name, each gate is followed with probability rotation_probability
+    # by that rotation at a random angle on its first wire.
+    gates = get_quantum_gate_list() if gates is None else gates
+    qc = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        gate = gates[rng.integers(len(gates))]
+        wires = rng.choice(num_qubits, size=2 if gate.is_two_qubit_gate() else 1, replace=False).tolist()
+        qc.add_gate(gate.name, *wires)
+        if rotation is not None and rng.random() < rotation_probability:
+            qc.add_gate(rotation, wires[0], params=(rng.uniform(0, 2 * np.pi),))
+    return qc
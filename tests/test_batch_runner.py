@@ -0,0 +1,61 @@
+import unittest
+import numpy as np
+from src.batch_runner import group_circuits, run_many, simulate_group
+from src.circuit_cache import get_default_cache
+from src.quantum_circuit import QuantumCircuit
+
+
+def get_ansatz(first_gate, second_gate):
+    qc = QuantumCircuit(2)
+    qc.add_gate(first_gate, 0)
+    qc.add_gate(second_gate, 1)
+    qc.add_gate('cnot', 0, 1)
+    qc.add_gate('t_gate', 1)
+    return qc
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.ansatzes = [get_ansatz(first_gate, second_gate) for first_gate in ['hadamard', 'pauli_x', 'phase'] for second_gate in ['hadamard', 'pauli_y']]
+        self.ghz = QuantumCircuit(3)
+        self.ghz.add_gate('hadamard', 0)
+        self.ghz.add_gate('cnot', 0, 1)
+        self.ghz.add_gate('cnot', 1, 2)
+        self.measured = QuantumCircuit(2)
+        self.measured.add_gate('hadamard', 0)
+        self.measured.add_measure(0)
+        self.measured.add_gate('pauli_x', 1, condition=(0, 1))
+
+    def test_group_states_match_single_circuits(self):
+        groups, unbatched = group_circuits(self.ansatzes + [self.ghz])
+        self.assertEqual(unbatched, [])
+        self.assertEqual([len(group.circuits) for group in groups], [6, 1])
+        for group in groups:
+            final_states = simulate_group(group)
+            for index, circuit in enumerate(group.circuits):
+                np.testing.assert_array_almost_equal(final_states[:, index], get_default_cache().get_final_state(circuit).amplitudes)
+
+    def test_identical_circuits_are_simulated_once(self):
+        circuits = [get_ansatz('hadamard', 'pauli_y'), self.ghz, get_ansatz('hadamard', 'pauli_y'), get_ansatz('pauli_x', 'pauli_y')]
+        groups, _ = group_circuits(circuits)
+        self.assertEqual([group.positions for group in groups], [[[0, 2], [3]], [[1]]])
+
+    def test_results_in_submission_order(self):
+        circuits = [self.ghz, self.measured] + self.ansatzes
+        results = run_many(circuits, [100, 200] + [4000] * len(self.ansatzes), seed=11)
+        self.assertEqual([result.num_qubits for result in results], [3, 2] + [2] * len(self.ansatzes))
+        self.assertEqual([result.num_shots for result in results], [100, 200] + [4000] * len(self.ansatzes))
+        self.assertEqual(results[0].counts[1:7].sum(), 0)
+        self.assertEqual(results[1].counts[1] + results[1].counts[2], 0)
+        for circuit, result in zip(self.ansatzes, results[2:]):
+            probabilities = get_default_cache().get_final_state(circuit).probabilities()
+            np.testing.assert_allclose(result.counts / result.num_shots, probabilities, atol=0.05)
+        self.assertEqual(run_many(circuits, 100, seed=11)[3:], run_many(circuits, 100, seed=11)[3:])
+
+    def test_invalid_shots(self):
+        with self.assertRaises(ValueError):
+            run_many([self.ghz, self.ghz], [10, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
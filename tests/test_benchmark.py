@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout, redirect_stderr
+from io import StringIO
+from unittest import mock
+from src.benchmark import (BENCHMARK_CASES, QUICK_BENCHMARK_GRID, BenchmarkResult, compare_results, get_random_circuit, get_result_key, main,
+                           run_benchmarks, time_case)
+from src.circuit_cache import CompiledCircuitCache, get_default_cache, set_default_cache
+from src.circuit_compiler import CompiledCircuit
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_quick_grid_covers_every_case(self):
+        results = run_benchmarks(QUICK_BENCHMARK_GRID, repeat=1)
+        self.assertEqual({result.name for result in results}, {case.name for case in BENCHMARK_CASES})
+        self.assertTrue(all(0 <= result.min_seconds <= result.median_seconds for result in results))
+
+    def test_simulation_cases_bypass_compiled_circuit_cache(self):
+        params = {'width': 4, 'depth': 10}
+        self.assertFalse(get_random_circuit(**params).is_clifford())
+        self.addCleanup(set_default_cache, get_default_cache())
+        cases = {case.name: case for case in BENCHMARK_CASES}
+        for name, case_params in [('apply_circuit', params), ('run_circuit_multiple_times', dict(params, shots=100))]:
+            with self.subTest(name):
+                set_default_cache(CompiledCircuitCache())
+                with mock.patch.object(CompiledCircuit, 'apply_to_state', autospec=True, side_effect=CompiledCircuit.apply_to_state) as apply_to_state:
+                    time_case(cases[name], case_params, repeat=3)
+                # The warm-up run and every repetition compile and simulate the circuit.
+                self.assertEqual(get_default_cache().stats.misses, 4)
+                self.assertEqual(apply_to_state.call_count, 4)
+
+    def test_compare_results(self):
+        result = BenchmarkResult('add_gate', {'width': 2, 'depth': 5}, 0.2, 0.3)
+        key = get_result_key(result.name, result.params)
+        self.assertEqual(key, 'add_gate[depth=5,width=2]')
+        self.assertEqual(compare_results([result], {key: 0.18}, tolerance=0.25), [])
+        self.assertEqual(compare_results([result], {'other': 0.01}, tolerance=0.25), [])
+        regression, = compare_results([result], {key: 0.1}, tolerance=0.25)
+        self.assertAlmostEqual(regression.ratio, 2)
+
+    def test_main_exits_non_zero_on_regression(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output, baseline = os.path.join(directory, 'results.json'), os.path.join(directory, 'baseline.json')
+            arguments = ['--quick', '--repeat', '1', '--filter', 'add_gate', '--output', output, '--baseline', baseline]
+            with redirect_stdout(StringIO()), redirect_stderr(StringIO()):
+                self.assertEqual(main(arguments + ['--save-baseline']), 0)
+                self.assertEqual(main(arguments + ['--tolerance', '1000']), 0)
+
+                with open(baseline) as file:
+                    data = json.load(file)
+                for result in data['results']:
+                    result['min_seconds'] = 1e-12
+                with open(baseline, 'w') as file:
+                    json.dump(data, file)
+                self.assertEqual(main(arguments), 1)
+
+            with open(output) as file:
+                self.assertEqual({result['name'] for result in json.load(file)['results']}, {'add_gate'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import tracemalloc
+import unittest
+from unittest import mock
+import numpy as np
+from src.branching import MAX_BRANCH_AMPLITUDES, BranchTree
+from src.density_matrix import DensityMatrix
+from src.exceptions.quantum_circuit_exceptions import InvalidConditionError, UnsupportedOperationError
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.statevector import StateVector
+
+
+class TestBranching(unittest.TestCase):
+    def setUp(self):
+        self.qc = QuantumCircuit(input_size=3)
+
+    def __add_teleportation(self):
+        # Teleports ry(0.7)|0⟩ from qubit 0 to qubit 2. The gate matrices act on kron(target, control),
+        # so the qubit flipped by cnot is the one passed as control.
+        self.qc.add_gate('ry', 0, params=(0.7,))
+        self.qc.add_gate('hadamard', 1)
+        self.qc.add_gate('cnot', 1, 2)
+        self.qc.add_gate('cnot', 0, 1)
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_measure(0)
+        self.qc.add_measure(1)
+        self.qc.add_gate('pauli_x', 2, condition=(1, 1))
+        self.qc.add_gate('pauli_z', 2, condition=(0, 1))
+
+    def test_teleportation_is_deterministic_on_target(self):
+        self.__add_teleportation()
+        runner = QuantumCircuitRunner(self.qc)
+        probabilities = runner.get_probabilities().reshape(4, 2).sum(axis=0)
+        np.testing.assert_array_almost_equal(probabilities, [np.cos(0.35) ** 2, np.sin(0.35) ** 2])
+        np.testing.assert_array_almost_equal(runner.expectation_values(['IIZ']), [np.cos(0.7)])
+
+    def test_classical_bits_match_measured_qubits(self):
+        self.__add_teleportation()
+        outcomes, classical_bits = QuantumCircuitRunner(self.qc).sample_with_classical_bits(2000, seed=5)
+        self.assertEqual(classical_bits.shape, (2000, 2))
+        np.testing.assert_array_equal((outcomes >> 2) & 1, classical_bits[:, 0])
+        np.testing.assert_array_equal((outcomes >> 1) & 1, classical_bits[:, 1])
+        self.assertEqual(len(np.unique(classical_bits, axis=0)), 4)
+
+    def test_prefix_is_simulated_once_per_branch(self):
+        self.__add_teleportation()
+        tree = BranchTree.from_compiled_circuit(self.qc.compile())
+        self.assertEqual(len(tree.probabilities), 4)
+        self.assertAlmostEqual(tree.probabilities.sum(), 1)
+        with mock.patch.object(StateVector, 'apply_matrix', autospec=True, side_effect=StateVector.apply_matrix) as apply_matrix:
+            QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=300)
+        # The two fused blocks of the prefix, then each conditional gate on the two branches that satisfy it.
+        self.assertEqual(apply_matrix.call_count, 2 + 2 + 2)
+
+    def test_deterministic_measurement_does_not_branch(self):
+        self.qc.add_gate('pauli_x', 0)
+        self.qc.add_measure(0, bit=1)
+        self.qc.add_gate('pauli_x', 2, condition=(1, 1))
+        tree = BranchTree.from_compiled_circuit(self.qc.compile())
+        self.assertEqual(tree.classical_bits.tolist(), [[0, 1]])
+        self.assertAlmostEqual(QuantumCircuitRunner(self.qc).get_probabilities()[0b101], 1)
+
+    def test_capped_tree_matches_full_tree(self):
+        self.__add_teleportation()
+        full = BranchTree.from_compiled_circuit(self.qc.compile())
+        capped = BranchTree.from_compiled_circuit(self.qc.compile(), max_branches=1)
+        self.assertEqual(len(capped.probabilities), 1)
+        self.assertTrue(capped.pending)
+        np.testing.assert_array_almost_equal(capped.get_probabilities(), full.get_probabilities())
+        self.assertEqual(len(list(capped.iter_leaves())), 4)
+
+        outcomes, classical_bits = capped.sample(np.random.default_rng(2), 4000)
+        np.testing.assert_array_equal((outcomes >> 2) & 1, classical_bits[:, 0])
+        np.testing.assert_array_equal((outcomes >> 1) & 1, classical_bits[:, 1])
+        np.testing.assert_allclose(np.mean(outcomes & 1), np.sin(0.35) ** 2, atol=0.03)
+
+    def test_repeated_measurements_are_batched(self):
+        # 2^10 branches of a 2-qubit register fit under the amplitude cap, and past a lower cap the
+        # shots are resampled in batches without running any register once per shot.
+        qc = QuantumCircuit(input_size=2)
+        for measurement in range(10):
+            qc.add_gate('hadamard', measurement % 2)
+            qc.add_measure(measurement % 2, measurement)
+        qc.add_gate('pauli_x', 0, condition=(9, 1))
+        full = BranchTree.from_compiled_circuit(qc.compile())
+        self.assertEqual((len(full.probabilities), len(full.pending)), (1024, 0))
+
+        capped = BranchTree.from_compiled_circuit(qc.compile(), max_branches=8)
+        self.assertEqual(len(capped.probabilities), 8)
+        with mock.patch.object(StateVector, 'apply_matrix', autospec=True, side_effect=StateVector.apply_matrix) as apply_matrix:
+            outcomes, classical_bits = capped.sample(np.random.default_rng(6), 20000)
+        apply_matrix.assert_not_called()
+        np.testing.assert_array_equal(outcomes & 1, classical_bits[:, 9])
+        np.testing.assert_array_equal(outcomes >> 1, classical_bits[:, 8] ^ classical_bits[:, 9])
+        np.testing.assert_allclose(classical_bits.mean(axis=0), 0.5, atol=0.02)
+        self.assertEqual(len(np.unique(classical_bits, axis=0)), 1024)
+
+    def test_many_measured_qubits_in_bounded_memory(self):
+        # Enumerating all 2^14 branches would hold 4 GiB of statevectors.
+        qc = QuantumCircuit(input_size=14)
+        for qubit in range(14):
+            qc.add_gate('hadamard', qubit)
+            qc.add_measure(qubit)
+        tracemalloc.start()
+        try:
+            outcomes = QuantumCircuitRunner(qc).sample_outcomes(100, seed=4)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, 4 * 16 * MAX_BRANCH_AMPLITUDES)
+        self.assertGreater(len(np.unique(outcomes)), 90)
+
+    def test_invalid_condition(self):
+        for condition in [(0, 2), (-1, 0), 1, (0,)]:
+            with self.subTest(f'condition {condition}'):
+                with self.assertRaises(InvalidConditionError):
+                    self.qc.add_gate('pauli_x', 0, condition=condition)
+
+    def test_non_unitary_circuit_rejected_by_unitary_paths(self):
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_measure(0)
+        with self.assertRaises(UnsupportedOperationError):
+            self.qc.apply_circuit_batch(np.eye(8))
+        with self.assertRaises(UnsupportedOperationError):
+            self.qc.apply_to_density_matrix(DensityMatrix(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import numpy as np
+from src.circuit_cache import CachedCircuit, CompiledCircuitCache, get_structural_hash
+from src.exceptions.quantum_circuit_exceptions import UnsupportedOperationError
+from src.gate_table import GATE_RECORD_DTYPE, NO_INDEX
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_gate
+from src.statevector import StateVector
+
+
+def build_circuit(angle=0.5, num_qubits=3):
+    qc = QuantumCircuit(num_qubits)
+    qc.add_gate('hadamard', 0)
+    qc.add_gate('cnot', 0, 1)
+    qc.add_gate('rz', 2, params=(angle,))
+    qc.add_gate('t_gate', 1)
+    return qc
+
+
+class TestCompiledCircuitCache(unittest.TestCase):
+    def test_structural_hash(self):
+        qc = build_circuit()
+        self.assertEqual(qc.structural_hash, build_circuit().structural_hash)
+        self.assertNotEqual(qc.structural_hash, build_circuit(angle=0.6).structural_hash)
+        self.assertNotEqual(qc.structural_hash, build_circuit(num_qubits=4).structural_hash)
+
+        original = qc.structural_hash
+        qc.add_gate('pauli_x', 2)
+        self.assertNotEqual(qc.structural_hash, original)
+        self.assertEqual(qc.structural_hash, get_structural_hash(qc.input_size, qc.gate_table))
+
+    def test_hash_ignores_gate_registration_order(self):
+        gates = [get_gate('pauli_x'), get_gate('hadamard')]
+        records = np.array([(1, 0, NO_INDEX, NO_INDEX, 0, NO_INDEX), (0, 1, NO_INDEX, NO_INDEX, 0, NO_INDEX)], dtype=GATE_RECORD_DTYPE)
+        loaded = QuantumCircuit(2)
+        loaded.add_gate_records(gates, records)
+        built = QuantumCircuit(2)
+        built.add_gate('hadamard', 0)
+        built.add_gate('pauli_x', 1)
+        self.assertEqual(loaded.structural_hash, built.structural_hash)
+
+    def test_hits_and_misses(self):
+        cache = CompiledCircuitCache()
+        compiled = cache.get_compiled(build_circuit())
+        self.assertIs(cache.get_compiled(build_circuit()), compiled)
+        cache.get_compiled(build_circuit(angle=0.1))
+        stats = cache.stats
+        self.assertEqual((stats.hits, stats.misses, stats.entries), (1, 2, 2))
+        self.assertIn(build_circuit(), cache)
+
+    def test_final_state_and_unitary(self):
+        cache = CompiledCircuitCache()
+        qc = build_circuit()
+        expected = qc.compile().apply_to_state(StateVector(3)).amplitudes
+        first = cache.get_final_state(qc)
+        first.apply_gate(get_gate('pauli_x'), 0)
+        np.testing.assert_array_almost_equal(cache.get_final_state(qc).amplitudes, expected)
+        np.testing.assert_array_almost_equal(cache.get_unitary(qc)[:, 0], expected)
+
+        qc.add_measure(0)
+        with self.assertRaises(UnsupportedOperationError):
+            cache.get_final_state(qc)
+
+    def test_evicts_least_recently_used_by_bytes(self):
+        circuits = [build_circuit(angle=angle) for angle in [0.1, 0.2, 0.3]]
+        cache = CompiledCircuitCache()
+        cache.get_compiled(circuits[0])
+        entry_bytes = cache.stats.bytes
+        cache = CompiledCircuitCache(max_bytes=2 * entry_bytes)
+        for qc in circuits[:2]:
+            cache.get_compiled(qc)
+        cache.get_compiled(circuits[0])
+        cache.get_compiled(circuits[2])
+        self.assertIn(circuits[0], cache)
+        self.assertNotIn(circuits[1], cache)
+        self.assertEqual(cache.stats.evictions, 1)
+        self.assertLessEqual(cache.stats.bytes, cache.max_bytes)
+
+    def test_bytes_count_every_dtype(self):
+        cache = CompiledCircuitCache()
+        qc = build_circuit()
+        cache.get_compiled(qc)
+        compiled_bytes = cache.stats.bytes
+        cache.get_final_state(qc, 'complex64')
+        # The matrices converted to complex64 take half the bytes, and the state 8 amplitudes of 8 bytes.
+        single_bytes = compiled_bytes // 2 + 8 * 8
+        self.assertEqual(cache.stats.bytes, compiled_bytes + single_bytes)
+        cache.get_final_state(qc, 'complex128')
+        self.assertEqual(cache.stats.bytes, compiled_bytes + single_bytes + 8 * 16)
+
+    def test_conversions_outside_the_cache_are_counted(self):
+        cache = CompiledCircuitCache()
+        qc = build_circuit()
+        compiled = cache.get_compiled(qc)
+        compiled_bytes = cache.stats.bytes
+        compiled.get_matrices('complex64')
+        self.assertEqual(cache.stats.bytes, compiled_bytes + compiled_bytes // 2)
+        # A hit only reorders the entries and never measures them again.
+        with mock.patch.object(CachedCircuit, 'nbytes', new_callable=mock.PropertyMock) as nbytes:
+            self.assertIs(cache.get_compiled(qc), compiled)
+        nbytes.assert_not_called()
+
+        cache.clear()
+        compiled.get_matrices(np.complex128)
+        self.assertEqual(cache.stats.bytes, 0)
+
+    def test_threads_share_cache(self):
+        circuits = [build_circuit(angle=angle) for angle in np.linspace(0, 1, 8)]
+        cache = CompiledCircuitCache()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            states = list(pool.map(lambda i: cache.get_final_state(circuits[i % 8], ('complex64', 'complex128')[i // 8 % 2]), range(64)))
+        for i, state in enumerate(states):
+            expected = circuits[i % 8].compile().apply_to_state(StateVector(3)).amplitudes
+            np.testing.assert_allclose(state.amplitudes, expected, atol=1e-6)
+        sequential = CompiledCircuitCache()
+        for qc in circuits:
+            for precision in ['complex64', 'complex128']:
+                sequential.get_final_state(qc, precision)
+        self.assertEqual(cache.stats.entries, 8)
+        self.assertEqual(cache.stats.bytes, sequential.stats.bytes)
+
+    def test_disk_tier_survives_new_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            qc = build_circuit()
+            CompiledCircuitCache(directory=directory).get_final_state(qc)
+
+            cache = CompiledCircuitCache(directory=directory)
+            with mock.patch('src.circuit_cache.compile_gates') as compile_gates:
+                state = cache.get_final_state(build_circuit())
+            compile_gates.assert_not_called()
+            np.testing.assert_array_almost_equal(state.amplitudes, qc.compile().apply_to_state(StateVector(3)).amplitudes)
+            self.assertEqual((cache.stats.disk_hits, cache.stats.misses), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import numpy as np
+from src.quantum_circuit import QuantumCircuit
+from src.statevector import StateVector
+from tests.random_circuits import random_circuit
+
+
+class TestCircuitCompiler(unittest.TestCase):
+    def test_compiled_circuit_matches_gate_by_gate(self):
+        rng = np.random.default_rng(42)
+        for i in range(20):
+            with self.subTest(f'random circuit {i}'):
+                qc = random_circuit(rng, 4, 40)
+                expected = StateVector(4)
+                for gate, target, control, _, _ in qc.gate_table:
+                    expected.apply_gate(gate, target, control)
+                actual = qc.compile().apply_to_state(StateVector(4))
+                np.testing.assert_array_almost_equal(actual.amplitudes, expected.amplitudes)
+
+    def test_single_qubit_chain_is_fused(self):
+        qc = QuantumCircuit(2)
+        for name in ['hadamard', 'phase', 't_gate', 'pauli_x', 'pauli_z', 'hadamard']:
+            qc.add_gate(name, 0)
+        compiled = qc.compile()
+        self.assertEqual(len(compiled), 1)
+        self.assertEqual(compiled.report.original_operations, 6)
+        self.assertEqual(compiled.report.fused_operations, 5)
+
+    def test_single_qubit_gates_fold_into_two_qubit_block(self):
+        qc = QuantumCircuit(3)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('pauli_x', 1)
+        qc.add_gate('cnot', 0, 1)
+        qc.add_gate('t_gate', 1)
+        qc.add_gate('hadamard', 2)
+        compiled = qc.compile()
+        self.assertEqual(len(compiled), 2)
+        self.assertEqual(compiled.operations[0].wires, (0, 1))
+        self.assertEqual(compiled.operations[0].gates, ('hadamard', 'pauli_x', 'cnot', 't_gate'))
+
+    def test_identity_products_are_dropped(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('hadamard', 1)
+        qc.add_gate('hadamard', 1)
+        qc.add_gate('cnot', 0, 1)
+        qc.add_gate('cnot', 0, 1)
+        self.assertEqual(len(qc.compile()), 0)
+
+    def test_add_gate_invalidates_compiled_circuit(self):
+        qc = QuantumCircuit(1)
+        qc.add_gate('pauli_x', 0)
+        compiled = qc.compile()
+        self.assertIs(qc.compile(), compiled)
+        qc.add_gate('pauli_x', 0)
+        self.assertIsNot(qc.compile(), compiled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import io
+import unittest
+from unittest import mock
+import numpy as np
+from src import circuit_io
+from src.circuit_io import load_binary_circuit, load_qasm, load_qasm_string, save_binary_circuit, to_qasm_string
+from src.exceptions.quantum_circuit_exceptions import GateNotFoundError, InvalidGatePositionError, MissingControlError, \
+    UnsupportedOperationError
+from src.gate_table import GATE_RECORD_DTYPE, NO_INDEX
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_gate
+
+
+def build_circuit():
+    qc = QuantumCircuit(3)
+    qc.add_gate('hadamard', 0)
+    qc.add_gate('cnot', 0, 1)
+    qc.add_gate('rz', 2, params=(0.25,))
+    qc.add_gate('phase', 1, params=(1.5,))
+    qc.add_measure(0, 0)
+    qc.add_gate('pauli_x', 2, condition=(0, 1))
+    qc.add_gate('t_gate', 1)
+    qc.add_measure(2, 1)
+    return qc
+
+
+def describe(qc):
+    return [(gate.gate.name, gate.gate.params, gate.target, gate.control, gate.condition, gate.bit) for gate in qc.gates]
+
+
+class TestCircuitIO(unittest.TestCase):
+    def test_qasm_round_trip(self):
+        qc = build_circuit()
+        self.assertEqual(describe(load_qasm_string(to_qasm_string(qc))), describe(qc))
+
+    def test_binary_round_trip(self):
+        qc = build_circuit()
+        buffer = io.BytesIO()
+        save_binary_circuit(qc, buffer)
+        buffer.seek(0)
+        loaded = load_binary_circuit(buffer, chunk_size=3)
+        self.assertEqual(loaded.input_size, 3)
+        self.assertEqual(describe(loaded), describe(qc))
+
+    def test_loads_qelib_names_and_registers(self):
+        text = '''OPENQASM 2.0;
+include "qelib1.inc";
+qreg a[2];
+qreg b[2];
+creg c[1];
+h a[0]; cx a[1],b[0];
+u1(pi/2) b[1];
+barrier a[0],b[1];
+if(c==1) x b[1];
+measure b[0] -> c[0];
+'''
+        self.assertEqual(describe(load_qasm_string(text)),
+                         [('hadamard', (), 0, None, None, None),
+                          ('cnot', (), 1, 2, None, None),
+                          ('phase', (np.pi / 2,), 3, None, None, None),
+                          ('pauli_x', (), 3, None, (0, 1), None),
+                          ('measure', (), 2, None, None, 0)])
+
+    def test_small_chunks_and_comments(self):
+        lines = ['OPENQASM 2.0;', 'qreg q[4]; // four qubits; not five', 'creg c0[1];']
+        lines += [f'rz(pi/{i + 1}) q[{i % 4}]; // gate {i}' for i in range(50)]
+        lines += ['cx q[3],', '   q[0];', 'measure q[1] -> c0[0];']
+        text = '\n'.join(lines)
+        expected = load_qasm_string(text)
+        self.assertEqual(len(expected.gates), 52)
+        for chunk_size in [1, 7, 64]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(describe(load_qasm(io.StringIO(text), chunk_size)), describe(expected))
+
+    def test_single_line_file_is_scanned_once(self):
+        # Without newlines every chunk ends inside a line, and must still be cut at its last ';'
+        # rather than carried whole into the next one.
+        text = 'OPENQASM 2.0; qreg q[2]; ' + 'h q[0]; cx q[0],q[1]; rz(pi/4) q[1]; ' * 20000 + '// a ; comment' * 2000 + '\nh q[1];'
+        scanned = []
+        pattern = circuit_io.QASM_CHUNK_STATEMENT
+        with mock.patch.object(circuit_io, 'QASM_CHUNK_STATEMENT', mock.Mock(findall=lambda chunk: scanned.append(len(chunk)) or pattern.findall(chunk))):
+            loaded = load_qasm(io.StringIO(text), chunk_size=2 ** 14)
+        self.assertEqual(len(loaded.gates), 60001)
+        self.assertEqual(describe(loaded)[-4:], describe(load_qasm_string(text))[-4:])
+        self.assertLessEqual(max(scanned), 2 * 2 ** 14)
+
+    def test_invalid_qasm(self):
+        cases = [('qreg q[1]; foo q[0];', GateNotFoundError),
+                 ('qreg q[1]; h q[1];', ValueError),
+                 ('qreg q[1]; h r[0];', ValueError),
+                 ('qreg q[2]; cx q[0];', MissingControlError),
+                 ('qreg q[2]; cx q[0],q[0];', InvalidGatePositionError),
+                 ('qreg q[1]; creg c[2]; if(c==1) x q[0];', UnsupportedOperationError),
+                 ('qreg q[1]; reset q[0];', UnsupportedOperationError),
+                 ('qreg q[1]; h q[0]; qreg r[1];', ValueError),
+                 ('qreg q[1]; rx(__import__) q[0];', ValueError),
+                 ('qreg q[1]; h q[0]', ValueError)]
+        for text, error in cases:
+            with self.subTest(text):
+                with self.assertRaises(error):
+                    load_qasm_string(text)
+
+    def test_invalid_binary(self):
+        buffer = io.BytesIO()
+        save_binary_circuit(build_circuit(), buffer)
+        data = buffer.getvalue()
+        for name, corrupted in [('magic', b'NOTACIRC' + data[8:]), ('truncated', data[:-5])]:
+            with self.subTest(name):
+                with self.assertRaises(ValueError):
+                    load_binary_circuit(io.BytesIO(corrupted))
+
+    def test_add_gate_records_validates_columns(self):
+        gates = [get_gate('hadamard'), get_gate('cnot')]
+        records = np.array([(0, 0, NO_INDEX, NO_INDEX, 0, NO_INDEX), (1, 1, 0, NO_INDEX, 0, NO_INDEX)], dtype=GATE_RECORD_DTYPE)
+        qc = QuantumCircuit(2)
+        qc.add_gate_records(gates, records)
+        self.assertEqual([(gate.gate.name, gate.target, gate.control) for gate in qc.gates], [('hadamard', 0, None), ('cnot', 1, 0)])
+
+        records['target'][1] = 2
+        with self.assertRaises(InvalidGatePositionError):
+            qc.add_gate_records(gates, records)
+        self.assertEqual(len(qc.gates), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import numpy as np
+from src.circuit_optimizer import CircuitOptimizer, cancel_inverse_pairs, optimize_circuit
+from src.exceptions.quantum_circuit_exceptions import UnsupportedOperationError
+from src.noise import NoiseModel
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from tests.random_circuits import random_circuit
+
+
+def describe(qc):
+    return [(gate.gate.name, gate.gate.params, gate.target, gate.control) for gate in qc.gates]
+
+
+class TestCircuitOptimizer(unittest.TestCase):
+    def test_redundant_gates_are_removed(self):
+        qc = QuantumCircuit(3)
+        for name, *wires in [('hadamard', 0), ('hadamard', 0), ('pauli_x', 1), ('pauli_x', 1), ('identity', 2), ('cnot', 0, 1), ('cnot', 0, 1)]:
+            qc.add_gate(name, *wires)
+        result = optimize_circuit(qc)
+        self.assertEqual(describe(result.circuit), [])
+        self.assertEqual(result.stats, (7, 0, 4, 0))
+
+    def test_phase_gates_merge(self):
+        qc = QuantumCircuit(2)
+        for name in ['t_gate', 't_gate', 'phase']:
+            qc.add_gate(name, 0)
+        qc.add_gate('t_gate', 1)
+        qc.add_gate('phase', 1, params=(0.5,))
+        self.assertEqual(describe(optimize_circuit(qc).circuit), [('pauli_z', (), 0, None), ('phase', (np.pi / 4 + 0.5,), 1, None)])
+
+    def test_commutation_exposes_cancellations(self):
+        # T on the wire cnot conditions on commutes with it, so the two cnots cancel, and the T gates merge.
+        qc = QuantumCircuit(2)
+        qc.add_gate('cnot', 0, 1)
+        qc.add_gate('t_gate', 0)
+        qc.add_gate('cnot', 0, 1)
+        qc.add_gate('t_gate', 0)
+        self.assertEqual(describe(optimize_circuit(qc).circuit), [('phase', (), 0, None)])
+
+        qc = QuantumCircuit(2)
+        qc.add_gate('cnot', 0, 1)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('cnot', 0, 1)
+        self.assertEqual(len(optimize_circuit(qc).circuit), 3)
+
+    def test_measurements_and_conditions_are_barriers(self):
+        qc = QuantumCircuit(1)
+        qc.add_gate('hadamard', 0)
+        qc.add_measure(0)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('pauli_x', 0, condition=(0, 1))
+        qc.add_gate('pauli_x', 0, condition=(0, 1))
+        self.assertEqual(describe(optimize_circuit(qc).circuit), describe(qc))
+
+    def test_random_circuits_keep_their_unitary(self):
+        rng = np.random.default_rng(17)
+        for circuit_index in range(20):
+            with self.subTest(f'random circuit {circuit_index}'):
+                qc = random_circuit(rng, 3, 60)
+                result = optimize_circuit(qc)
+                self.assertLessEqual(result.stats.gates_after, result.stats.gates_before)
+                np.testing.assert_array_almost_equal(result.circuit.get_unitary(), qc.get_unitary())
+
+    def test_custom_passes(self):
+        qc = QuantumCircuit(1)
+        qc.add_gate('identity', 0)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('hadamard', 0)
+        result = CircuitOptimizer(passes=[cancel_inverse_pairs]).optimize(qc)
+        self.assertEqual(describe(result.circuit), [('identity', (), 0, None)])
+
+    def test_runner_optimizes_on_request(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('pauli_x', 0)
+        qc.add_gate('hadamard', 1)
+        qc.add_gate('hadamard', 1)
+        runner = QuantumCircuitRunner(qc, optimize=True)
+        self.assertEqual(runner.optimization_stats.gates_after, 1)
+        np.testing.assert_array_almost_equal(runner.get_probabilities(), [0, 0, 1, 0])
+        self.assertIsNone(QuantumCircuitRunner(qc).optimization_stats)
+        with self.assertRaises(UnsupportedOperationError):
+            QuantumCircuitRunner(qc, noise_model=NoiseModel(), optimize=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import numpy as np
+from src.density_matrix import DensityMatrix
+from src.noise import NoiseModel, DepolarizingChannel, AmplitudeDampingChannel, PhaseDampingChannel, ReadoutError
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.statevector import StateVector
+from src.utilities.quantum_math import calculate_density_matrix
+
+
+class TestDensityMatrix(unittest.TestCase):
+    def setUp(self):
+        self.qc = QuantumCircuit(3)
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_gate('t_gate', 0)
+        self.qc.add_gate('cnot', 0, 1)
+        self.qc.add_gate('pauli_y', 2)
+        self.qc.add_gate('swap', 2, 0)
+
+    def test_noiseless_evolution_matches_statevector(self):
+        register = self.qc.apply_to_state(StateVector(3))
+        density_matrix = self.qc.apply_to_density_matrix(DensityMatrix(3))
+        np.testing.assert_array_almost_equal(density_matrix.matrix, calculate_density_matrix(register.state))
+        np.testing.assert_array_almost_equal(density_matrix.probabilities(), register.probabilities())
+
+    def test_gate_by_gate_matches_compiled(self):
+        noise_model = NoiseModel()
+        compiled = self.qc.apply_to_density_matrix(DensityMatrix(3))
+        gate_by_gate = self.qc.apply_to_density_matrix(DensityMatrix(3), noise_model)
+        np.testing.assert_array_almost_equal(gate_by_gate.matrix, compiled.matrix)
+
+    def test_full_depolarizing_gives_maximally_mixed_qubit(self):
+        density_matrix = DensityMatrix.from_state(np.array([1, 1j]) / np.sqrt(2))
+        density_matrix.apply_channel(DepolarizingChannel(1), 0)
+        np.testing.assert_array_almost_equal(density_matrix.matrix, np.eye(2) / 2)
+
+    def test_amplitude_damping_decays_to_ground_state(self):
+        density_matrix = DensityMatrix.from_state(np.array([0, 0, 0, 1]))
+        density_matrix.apply_channel(AmplitudeDampingChannel(1), 1)
+        np.testing.assert_array_almost_equal(density_matrix.probabilities(), [0, 0, 1, 0])
+        density_matrix.apply_channel(AmplitudeDampingChannel(0.25), 0)
+        np.testing.assert_array_almost_equal(density_matrix.probabilities(), [0.25, 0, 0.75, 0])
+
+    def test_phase_damping_removes_coherences(self):
+        density_matrix = DensityMatrix.from_state(np.array([1, 1]) / np.sqrt(2))
+        density_matrix.apply_channel(PhaseDampingChannel(1), 0)
+        np.testing.assert_array_almost_equal(density_matrix.matrix, np.eye(2) / 2)
+        self.assertAlmostEqual(density_matrix.trace(), 1)
+
+    def test_channels_preserve_trace(self):
+        noise_model = NoiseModel()
+        noise_model.add_gate_noise('cnot', DepolarizingChannel(0.1))
+        noise_model.add_qubit_noise(2, AmplitudeDampingChannel(0.2))
+        noise_model.add_qubit_noise(0, PhaseDampingChannel(0.3))
+        density_matrix = self.qc.apply_to_density_matrix(DensityMatrix(3), noise_model)
+        self.assertAlmostEqual(density_matrix.trace(), 1)
+        np.testing.assert_array_almost_equal(density_matrix.matrix, density_matrix.matrix.conj().T)
+
+    def test_readout_error(self):
+        noise_model = NoiseModel()
+        noise_model.add_readout_error(ReadoutError(0.1, 0.2), qubit=1)
+        density_matrix = DensityMatrix.from_state(np.array([0, 1, 0, 0]))
+        np.testing.assert_array_almost_equal(density_matrix.probabilities(noise_model), [0.2, 0.8, 0, 0])
+        noise_model.add_readout_error(ReadoutError(0.5))
+        np.testing.assert_array_almost_equal(density_matrix.probabilities(noise_model), [0.1, 0.4, 0.1, 0.4])
+
+    def test_runner_uses_exact_noisy_probabilities(self):
+        qc = QuantumCircuit(1)
+        qc.add_gate('pauli_x', 0)
+        noise_model = NoiseModel()
+        noise_model.add_gate_noise('pauli_x', AmplitudeDampingChannel(0.3))
+        runner = QuantumCircuitRunner(qc, noise_model=noise_model)
+        np.testing.assert_array_almost_equal(runner.get_probabilities(), [0.3, 0.7])
+        self.assertEqual(len(runner.run_circuit_multiple_times(num_times=50)), 50)
+
+    def test_invalid_probability(self):
+        with self.assertRaises(ValueError):
+            DepolarizingChannel(1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import numpy as np
+from src.factorized_state import FactorizedState
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_gate, get_quantum_gate_list
+from src.qubit import Qubit
+from src.statevector import StateVector
+
+
+class TestFactorizedState(unittest.TestCase):
+    def setUp(self):
+        self.gates = {gate.name: gate for gate in get_quantum_gate_list()}
+        self.num_qubits = 5
+
+    def test_random_circuits_match_statevector(self):
+        rng = np.random.default_rng(11)
+        names = list(self.gates)
+        for circuit_index in range(20):
+            with self.subTest(f'random circuit {circuit_index}'):
+                factorized_state, register = FactorizedState(self.num_qubits), StateVector(self.num_qubits)
+                for _ in range(30):
+                    gate = self.gates[names[rng.integers(len(names))]]
+                    wires = rng.choice(self.num_qubits, size=2 if gate.is_two_qubit_gate() else 1, replace=False).tolist()
+                    factorized_state.apply_gate(gate, *wires)
+                    register.apply_gate(gate, *wires)
+                np.testing.assert_array_almost_equal(factorized_state.amplitudes, register.amplitudes)
+
+    def test_near_separable_states_match_statevector(self):
+        # Entanglement far below a percent must survive: a rotation that is split off between each
+        # pair of cnots accumulates over the repetitions.
+        small_rotation = get_gate('ry', (1e-3,))
+        factorized_state, register = FactorizedState(2), StateVector(2)
+        for state in [factorized_state, register]:
+            state.apply_gate(get_gate('ry', (1e-6,)), 0)
+            state.apply_gate(self.gates['cnot'], 0, 1)
+        np.testing.assert_allclose(factorized_state.amplitudes, register.amplitudes, rtol=0, atol=1e-12)
+        self.assertEqual(factorized_state.max_cluster_size, 2)
+
+        for _ in range(1000):
+            for state in [factorized_state, register]:
+                state.apply_gate(small_rotation, 0)
+                state.apply_gate(self.gates['cnot'], 0, 1)
+                state.apply_gate(self.gates['cnot'], 0, 1)
+        np.testing.assert_allclose(factorized_state.amplitudes, register.amplitudes, rtol=0, atol=1e-10)
+        self.assertAlmostEqual(register.probabilities()[2], np.sin(0.5) ** 2)
+
+    def test_clusters_merge_and_split(self):
+        factorized_state = FactorizedState(4)
+        factorized_state.apply_gate(self.gates['hadamard'], 0)
+        factorized_state.apply_gate(self.gates['cnot'], 0, 3)
+        self.assertEqual(factorized_state.find(0), factorized_state.find(3))
+        self.assertEqual(factorized_state.max_cluster_size, 2)
+        self.assertFalse(factorized_state.is_qubit_entangled(1))
+
+        # Undoing the cnot leaves a product state again, so the cluster splits.
+        factorized_state.apply_gate(self.gates['cnot'], 0, 3)
+        self.assertEqual(factorized_state.max_cluster_size, 1)
+        np.testing.assert_array_almost_equal(factorized_state.probabilities()[[0, 8]], [0.5, 0.5])
+
+    def test_measure_splits_cluster(self):
+        np.random.seed(3)
+        factorized_state = FactorizedState(3)
+        factorized_state.apply_gate(self.gates['hadamard'], 0)
+        factorized_state.apply_gate(self.gates['cnot'], 0, 1)
+        factorized_state.apply_gate(self.gates['cnot'], 1, 2)
+        self.assertEqual(factorized_state.max_cluster_size, 3)
+        outcome = factorized_state.measure(1)
+        self.assertEqual(factorized_state.max_cluster_size, 1)
+        self.assertAlmostEqual(factorized_state.probabilities()[0b111 * outcome], 1)
+
+    def test_copy_is_independent(self):
+        factorized_state = FactorizedState(2)
+        factorized_state.apply_gate(self.gates['hadamard'], 0)
+        copied = factorized_state.copy()
+        copied.apply_gate(self.gates['cnot'], 0, 1)
+        np.testing.assert_array_almost_equal(factorized_state.probabilities(), [0.5, 0, 0.5, 0])
+        np.testing.assert_array_almost_equal(copied.probabilities(), [0.5, 0, 0, 0.5])
+
+    def test_circuit_on_qubits_from_separate_states(self):
+        # qubits[1] and outside are entangled before the circuit runs on qubits[0] and qubits[1].
+        qubits, outside = [Qubit(), Qubit()], Qubit()
+        qubits[1].apply_gate(self.gates['hadamard'])
+        qubits[1].apply_gate(self.gates['cnot'], outside)
+        qc = QuantumCircuit(2)
+        qc.add_gate('cnot', target=1, control=0)
+        qc.apply_circuit(*qubits)
+
+        register = qubits[0].register
+        self.assertIs(outside.register, register)
+        self.assertEqual([qubit.register_index for qubit in qubits + [outside]], [0, 1, 2])
+        np.testing.assert_array_almost_equal(register.probabilities(), [0.5, 0, 0, 0, 0, 0, 0, 0.5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import os
+import subprocess
+import sys
+import unittest
+
+IMPORT_TIME_BUDGET_SECONDS = 0.5
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIMULATE_AND_MEASURE_SCRIPT = """
+import sys
+import time
+start = time.perf_counter()
+from src.factorized_state import FactorizedState
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.qubit import Qubit
+import_time = time.perf_counter() - start
+
+qc = QuantumCircuit(2)
+qc.add_gate('hadamard', 0)
+qc.add_gate('cnot', 0, 1)
+qubits = [Qubit(), Qubit()]
+qc.apply_circuit(*qubits)
+[qubit.measure() for qubit in qubits]
+QuantumCircuitRunner(qc).run_circuit_multiple_times(num_times=100)
+print(import_time, 'sympy' in sys.modules, 'matplotlib' in sys.modules)
+"""
+
+
+class TestImportTime(unittest.TestCase):
+    def test_simulate_and_measure_skips_sympy_and_matplotlib(self):
+        output = subprocess.run([sys.executable, '-c', SIMULATE_AND_MEASURE_SCRIPT], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True).stdout
+        import_time, sympy_loaded, matplotlib_loaded = output.split()
+        self.assertLess(float(import_time), IMPORT_TIME_BUDGET_SECONDS)
+        self.assertEqual(sympy_loaded, 'False')
+        self.assertEqual(matplotlib_loaded, 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
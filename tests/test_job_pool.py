@@ -0,0 +1,113 @@
+import asyncio
+import threading
+import unittest
+from unittest import mock
+from src.exceptions.quantum_circuit_exceptions import JobTimeoutError
+from src.job_pool import SimulationPool, run_job
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+
+
+class TestSimulationPool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.qc = QuantumCircuit(2)
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_gate('cnot', 0, 1)
+        self.started = []
+        self.release = threading.Event()
+
+    def gated_run_job(self, circuit, num_times, seed, counts, runner_options):
+        # Stands in for run_job: records which job started and holds the worker until released.
+        self.started.append(num_times)
+        self.release.wait(5)
+        return num_times
+
+    async def test_results_match_runner(self):
+        async with SimulationPool(max_workers=2) as pool:
+            jobs = [await pool.submit(self.qc, 100, seed=7), await pool.submit(self.qc, 100, seed=7, counts=True)]
+            measurements, counts = await asyncio.gather(*jobs)
+        runner = QuantumCircuitRunner(self.qc)
+        self.assertEqual(measurements, runner.run_circuit_multiple_times(100, seed=7))
+        self.assertEqual(counts, runner.run(100, seed=7))
+        self.assertEqual(pool.stats().completed, 2)
+
+    async def test_runner_errors_are_raised_on_await(self):
+        async with SimulationPool(max_workers=1) as pool:
+            job = await pool.submit(self.qc, 10, workers=2)
+            with self.assertRaises(TypeError):
+                await job
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(pool.stats().failed, 1)
+
+    async def test_priorities(self):
+        with mock.patch('src.job_pool.run_job', self.gated_run_job):
+            async with SimulationPool(max_workers=1) as pool:
+                first = await pool.submit(self.qc, 1)
+                await asyncio.sleep(0.05)
+                jobs = [await pool.submit(self.qc, num_times, priority=priority)
+                        for num_times, priority in [(2, 5), (3, 0), (4, 5), (5, -1)]]
+                self.release.set()
+                await asyncio.gather(first, *jobs)
+        self.assertEqual(self.started, [1, 5, 3, 2, 4])
+
+    async def test_queue_depth(self):
+        with mock.patch('src.job_pool.run_job', self.gated_run_job):
+            async with SimulationPool(max_workers=1, max_queue_size=1) as pool:
+                running = pool.submit_nowait(self.qc, 1)
+                await asyncio.sleep(0.05)
+                queued = pool.submit_nowait(self.qc, 2)
+                with self.assertRaises(asyncio.QueueFull):
+                    pool.submit_nowait(self.qc, 3)
+                with self.assertRaises(TimeoutError):
+                    await asyncio.wait_for(pool.submit(self.qc, 3), 0.05)
+                self.assertEqual(pool.stats().queued, 1)
+                self.assertEqual(pool.stats().running, 1)
+                self.release.set()
+                self.assertEqual(await asyncio.gather(running, queued), [1, 2])
+
+    async def test_timeout_and_cancel(self):
+        with mock.patch('src.job_pool.run_job', self.gated_run_job):
+            async with SimulationPool(max_workers=1) as pool:
+                running = await pool.submit(self.qc, 1, timeout=0.05)
+                expired = await pool.submit(self.qc, 2, timeout=0.05)
+                cancelled = await pool.submit(self.qc, 3)
+                cancelled.cancel()
+                with self.assertRaises(JobTimeoutError):
+                    await running
+                with self.assertRaises(JobTimeoutError):
+                    await expired
+                with self.assertRaises(asyncio.CancelledError):
+                    await cancelled
+                self.release.set()
+        # The running job finishes on its worker, the queued ones never start.
+        self.assertEqual(self.started, [1])
+        self.assertEqual((running.status, expired.status, cancelled.status), ('timed_out', 'timed_out', 'cancelled'))
+        self.assertIsNotNone(running.metrics.run_time)
+        self.assertEqual(expired.metrics, (None, None))
+        stats = pool.stats()
+        self.assertEqual((stats.timed_out, stats.cancelled, stats.completed), (2, 1, 0))
+
+    async def test_metrics(self):
+        async with SimulationPool(max_workers=1) as pool:
+            jobs = [await pool.submit(self.qc, 1000, seed=seed) for seed in range(3)]
+            await asyncio.gather(*jobs)
+        for job in jobs:
+            self.assertEqual(job.status, 'done')
+            self.assertGreaterEqual(job.metrics.queue_wait, 0)
+            self.assertGreater(job.metrics.run_time, 0)
+        self.assertGreater(jobs[2].metrics.queue_wait, jobs[0].metrics.queue_wait)
+        self.assertAlmostEqual(pool.stats().total_run_time, sum(job.metrics.run_time for job in jobs))
+
+    async def test_closed_pool(self):
+        pool = SimulationPool()
+        with self.assertRaises(RuntimeError):
+            await pool.submit(self.qc, 1)
+        with self.assertRaises(ValueError):
+            SimulationPool(max_workers=0)
+
+    def test_run_job(self):
+        self.assertEqual(run_job(self.qc, 10, 1, True, {'optimize': True}).num_shots, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError, UnsupportedOperationError
+from src.mps import MPSConfig, MatrixProductState
+from src.noise import DepolarizingChannel, NoiseModel
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.statevector import StateVector
+from tests.random_circuits import random_circuit
+
+
+class TestMatrixProductState(unittest.TestCase):
+    def test_untruncated_circuits_match_statevector(self):
+        rng = np.random.default_rng(21)
+        for circuit_index in range(15):
+            with self.subTest(f'random circuit {circuit_index}'):
+                qc = random_circuit(rng, 6, 40, rotation='ry', rotation_probability=0.3)
+                mps = qc.apply_to_mps(MatrixProductState(6))
+                np.testing.assert_array_almost_equal(mps.amplitudes, qc.apply_to_state(StateVector(6)).amplitudes)
+                self.assertLess(mps.truncation_error, 1e-10)
+
+    def test_bond_dimension_cap_reports_truncation_error(self):
+        qc = random_circuit(np.random.default_rng(4), 8, 120, rotation='ry', rotation_probability=0.3)
+        exact = qc.apply_to_state(StateVector(8)).amplitudes
+        mps = qc.apply_to_mps(MatrixProductState(8, max_bond_dimension=2))
+        self.assertLessEqual(max(mps.bond_dimensions), 2)
+        self.assertGreater(mps.truncation_error, 0)
+        self.assertAlmostEqual(np.linalg.norm(mps.amplitudes), 1)
+        # The infidelity of the truncated state is bounded by the accumulated discarded weight.
+        self.assertLessEqual(1 - abs(np.vdot(exact, mps.amplitudes)) ** 2, mps.truncation_error + 1e-9)
+
+    def test_samples_follow_probabilities(self):
+        qc = random_circuit(np.random.default_rng(9), 4, 30, rotation='ry', rotation_probability=0.3)
+        mps = qc.apply_to_mps(MatrixProductState(4))
+        outcomes, _ = mps.sample(np.random.default_rng(1), 20000)
+        np.testing.assert_allclose(np.bincount(outcomes, minlength=16) / 20000, mps.probabilities(), atol=0.02)
+
+    def test_wide_chain_through_runner(self):
+        num_qubits = 80
+        qc = QuantumCircuit(num_qubits)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('t_gate', 0)
+        for i in range(num_qubits - 1):
+            qc.add_gate('cnot', i, i + 1)
+        runner = QuantumCircuitRunner(qc, mps_config=MPSConfig(max_bond_dimension=4))
+        mps = runner.get_sampler()
+        self.assertEqual(max(mps.bond_dimensions), 2)
+        self.assertLess(mps.truncation_error, 1e-10)
+
+        bits = runner.sample_bits(500, seed=3)
+        self.assertTrue(np.all(bits == bits[:, :1]))
+        self.assertTrue(0 < bits[:, 0].sum() < 500)
+        with self.assertRaises(ExceedsQubitLimitError):
+            runner.run(10)
+        with self.assertRaises(ExceedsQubitLimitError):
+            runner.expectation_values(['Z' * num_qubits])
+
+    def test_runner_results_use_mps(self):
+        qc = QuantumCircuit(30)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('t_gate', 0)
+        for i in range(29):
+            qc.add_gate('cnot', i, i + 1)
+        runner = QuantumCircuitRunner(qc, mps_config=MPSConfig(max_bond_dimension=4))
+        result = runner.run(200, seed=5)
+        self.assertEqual(result.outcomes.tolist(), [0, 2 ** 30 - 1])
+        self.assertEqual(result.num_shots, 200)
+
+        small = random_circuit(np.random.default_rng(9), 5, 30, rotation='ry', rotation_probability=0.3)
+        np.testing.assert_array_almost_equal(QuantumCircuitRunner(small, mps_config=MPSConfig()).expectation_values(['ZZIII', 'XIXIY']),
+                                             QuantumCircuitRunner(small).expectation_values(['ZZIII', 'XIXIY']))
+
+    def test_noise_model_is_rejected(self):
+        noise_model = NoiseModel()
+        noise_model.add_gate_noise('hadamard', DepolarizingChannel(0.1))
+        with self.assertRaises(UnsupportedOperationError):
+            QuantumCircuitRunner(QuantumCircuit(2), noise_model=noise_model, mps_config=MPSConfig())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.packed_shots import PackedShots, get_packed_dtype, outcomes_to_measurements
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
+
+
+class TestPackedShots(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'shots.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_packed_dtype_follows_width(self):
+        self.assertEqual(get_packed_dtype(1), np.uint8)
+        self.assertEqual(get_packed_dtype(8), np.uint8)
+        self.assertEqual(get_packed_dtype(9), np.uint16)
+        self.assertEqual(get_packed_dtype(30), np.uint32)
+        self.assertEqual(get_packed_dtype(64), np.uint64)
+
+    def test_in_memory_append(self):
+        shots = PackedShots(num_qubits=3)
+        shots.append([1, 7])
+        shots.append(np.array([0, 5, 6]))
+        self.assertEqual(len(shots), 5)
+        np.testing.assert_array_equal(shots.outcomes, [1, 7, 0, 5, 6])
+        self.assertEqual(shots.outcomes.dtype, np.uint8)
+
+    def test_file_round_trip_with_memmap(self):
+        shots = PackedShots(num_qubits=10, path=self.path)
+        shots.append(np.arange(1000))
+        shots.append(np.arange(24))
+        self.assertEqual(os.path.getsize(self.path), 16 + 2 * 1024)
+
+        reopened = PackedShots.open(self.path)
+        self.assertEqual(reopened.num_qubits, 10)
+        self.assertIsInstance(reopened.outcomes, np.memmap)
+        np.testing.assert_array_equal(reopened.outcomes[998:1002], [998, 999, 0, 1])
+
+    def test_open_rejects_other_files(self):
+        with open(self.path, 'wb') as file:
+            file.write(b'not shots')
+        with self.assertRaises(ValueError):
+            PackedShots.open(self.path)
+
+    def test_existing_file_is_appended_to(self):
+        PackedShots(num_qubits=3, path=self.path).append([1, 2, 3])
+        shots = PackedShots(num_qubits=3, path=self.path).append([4])
+        np.testing.assert_array_equal(shots.outcomes, [1, 2, 3, 4])
+        with self.assertRaisesRegex(ValueError, 'PackedShots.open'):
+            PackedShots(num_qubits=4, path=self.path)
+        self.assertEqual(len(PackedShots.open(self.path)), 4)
+
+        other_path = os.path.join(self.directory.name, 'other.bin')
+        with open(other_path, 'wb') as file:
+            file.write(b'not shots')
+        with self.assertRaises(ValueError):
+            PackedShots(num_qubits=3, path=other_path)
+        with open(other_path, 'rb') as file:
+            self.assertEqual(file.read(), b'not shots')
+
+    def test_to_measurements_matches_list_format(self):
+        shots = PackedShots(num_qubits=2).append([2, 1])
+        expected = [[ONE_STATE_KET, ZERO_STATE_KET], [ZERO_STATE_KET, ONE_STATE_KET]]
+        self.assertEqual([[m.tolist() for m in row] for row in shots.to_measurements()], [[m.tolist() for m in row] for row in expected])
+
+    def test_runner_stores_shots(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('cnot', 0, 1)
+        runner = QuantumCircuitRunner(qc)
+        shots = runner.store_shots(num_times=5000, path=self.path, chunk_size=1024, seed=11)
+        expected = np.concatenate(list(runner.iter_shots(5000, chunk_size=1024, seed=11)))
+        np.testing.assert_array_equal(PackedShots.open(self.path).outcomes, expected)
+        self.assertEqual(set(np.unique(shots.outcomes)), {0, 3})
+        runner.store_shots(num_times=100, path=self.path, seed=12)
+        self.assertEqual(len(PackedShots.open(self.path)), 5100)
+        results = runner.run_circuit_multiple_times(num_times=3, seed=11)
+        self.assertEqual([[m.tolist() for m in row] for row in results], [[m.tolist() for m in row] for row in outcomes_to_measurements(runner.sample_outcomes(3, seed=11), 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
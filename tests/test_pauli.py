@@ -0,0 +1,60 @@
+import unittest
+from functools import reduce
+import numpy as np
+from src.density_matrix import DensityMatrix
+from src.exceptions.quantum_circuit_exceptions import InvalidPauliStringError
+from src.noise import NoiseModel, DepolarizingChannel
+from src.pauli import PAULI_MATRICES, state_expectation_values, density_matrix_expectation_values
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+
+
+def dense_expectation_value(amplitudes, pauli_string):
+    operator = reduce(np.kron, [PAULI_MATRICES[symbol] for symbol in pauli_string])
+    return np.vdot(amplitudes, operator @ amplitudes).real
+
+
+class TestPauliExpectationValues(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        amplitudes = rng.normal(size=8) + 1j * rng.normal(size=8)
+        self.amplitudes = amplitudes / np.linalg.norm(amplitudes)
+        self.pauli_strings = ['III', 'ZII', 'IZI', 'ZZZ', 'XII', 'XYZ', 'YYI', 'IXY', 'YIX', 'ZXZ']
+
+    def test_matches_dense_operators(self):
+        values = state_expectation_values(self.amplitudes, self.pauli_strings)
+        for pauli_string, value in zip(self.pauli_strings, values):
+            with self.subTest(f'Pauli string {pauli_string}'):
+                self.assertAlmostEqual(value, dense_expectation_value(self.amplitudes, pauli_string))
+
+    def test_weighted_sums(self):
+        hamiltonian = {'ZZI': 0.5, 'XIX': -1.25, 'IYY': 2}
+        value, = state_expectation_values(self.amplitudes, [hamiltonian])
+        expected = sum(coefficient * dense_expectation_value(self.amplitudes, pauli_string) for pauli_string, coefficient in hamiltonian.items())
+        self.assertAlmostEqual(value, expected)
+
+    def test_density_matrix_matches_pure_state(self):
+        density_matrix = DensityMatrix.from_state(self.amplitudes)
+        np.testing.assert_array_almost_equal(density_matrix_expectation_values(density_matrix.matrix, self.pauli_strings),
+                                             state_expectation_values(self.amplitudes, self.pauli_strings))
+
+    def test_runner_expectation_values(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('cnot', 0, 1)
+        np.testing.assert_array_almost_equal(QuantumCircuitRunner(qc).expectation_values(['ZZ', 'XX', 'YY', 'ZI', {'ZZ': 1, 'XX': 1}]),
+                                             [1, 1, -1, 0, 2])
+
+        noise_model = NoiseModel()
+        noise_model.add_gate_noise('cnot', DepolarizingChannel(1))
+        np.testing.assert_array_almost_equal(QuantumCircuitRunner(qc, noise_model).expectation_values(['ZZ', 'XX']), [0, 0])
+
+    def test_invalid_pauli_string(self):
+        with self.assertRaises(InvalidPauliStringError):
+            state_expectation_values(self.amplitudes, ['ZZ'])
+        with self.assertRaises(InvalidPauliStringError):
+            state_expectation_values(self.amplitudes, ['ZZA'])
+
+
+if __name__ == '__main__':
+    unittest.main()
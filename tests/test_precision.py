@@ -0,0 +1,119 @@
+import unittest
+import numpy as np
+from src.batch_runner import run_many
+from src.exceptions.quantum_circuit_exceptions import UnsupportedOperationError
+from src.noise import NoiseModel
+from src.precision import get_default_precision, get_dtype, set_default_precision
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.quantum_gate import get_gate, get_quantum_gate_list
+from src.qubit import Qubit
+from src.statevector import BatchedStateVector, StateVector
+from tests.random_circuits import random_circuit
+
+# Documented accuracy of complex64 against the complex128 path, for random circuits of 12 qubits and
+# 600 gates: every amplitude within 1e-5 and a fidelity within 1e-6 of one. The measured amplitude
+# errors are around 3e-8, so the bounds leave room for much deeper circuits.
+AMPLITUDE_TOLERANCE = 1e-5
+FIDELITY_TOLERANCE = 1e-6
+
+
+class TestPrecision(unittest.TestCase):
+    def tearDown(self):
+        set_default_precision('complex128')
+
+    def test_get_dtype(self):
+        self.assertEqual(get_dtype(), np.complex128)
+        self.assertEqual(get_dtype('complex64'), np.complex64)
+        self.assertEqual(get_dtype(np.complex64), np.complex64)
+        with self.assertRaises(ValueError):
+            get_dtype('float32')
+        set_default_precision(np.complex64)
+        self.assertEqual(get_default_precision(), 'complex64')
+        self.assertEqual(StateVector(2).dtype, np.complex64)
+        self.assertEqual(Qubit().register.dtype, np.complex64)
+
+    def test_gate_matrices(self):
+        gate = get_gate('hadamard')
+        matrix = gate.get_matrix(np.complex64)
+        self.assertEqual(matrix.dtype, np.complex64)
+        self.assertIs(gate.get_matrix('complex64'), matrix)
+        self.assertIs(gate.get_matrix(np.complex128), gate.matrix)
+        self.assertFalse(matrix.flags.writeable)
+
+    def test_state_stays_in_precision(self):
+        register = StateVector(4, 'complex64')
+        self.assertEqual(register.amplitudes.nbytes, StateVector(4).amplitudes.nbytes // 2)
+        for gate in get_quantum_gate_list():
+            register.apply_gate(gate, 0, 2 if gate.is_two_qubit_gate() else None)
+            self.assertEqual(register.amplitudes.dtype, np.complex64)
+        register.apply_matrix(np.eye(4), (1, 3))
+        register.measure(1)
+        self.assertEqual(register.amplitudes.dtype, np.complex64)
+        self.assertEqual(register.copy().dtype, np.complex64)
+        self.assertEqual(register.get_qubit_state(3).dtype, np.complex64)
+        self.assertEqual([part.dtype for part in register.split_qubit(1)], [np.complex64, np.complex64])
+
+        batch = BatchedStateVector(3, 5, 'complex64')
+        random_circuit(np.random.default_rng(0), 3, 10, rotation='rx').apply_to_state(batch)
+        self.assertEqual(batch.amplitudes.dtype, np.complex64)
+
+    def test_statevector_accuracy(self):
+        for seed in range(3):
+            with self.subTest(f'random circuit {seed}'):
+                circuit = random_circuit(np.random.default_rng(seed), 12, 300, rotation='rx')
+                single = circuit.apply_to_state(StateVector(12, 'complex64')).amplitudes
+                double = circuit.apply_to_state(StateVector(12, 'complex128')).amplitudes
+                np.testing.assert_allclose(single, double, rtol=0, atol=AMPLITUDE_TOLERANCE)
+                self.assertLess(1 - abs(np.vdot(double, single.astype(np.complex128))) ** 2, FIDELITY_TOLERANCE)
+
+    def test_qubit_accuracy(self):
+        # The factorized path splits and merges clusters, so it is held to the same bounds as StateVector.
+        for seed in range(3):
+            with self.subTest(f'random circuit {seed}'):
+                circuit = random_circuit(np.random.default_rng(seed), 12, 300, rotation='rx')
+                qubits = [Qubit('complex64') for _ in range(12)]
+                circuit.apply_circuit(*qubits)
+                single = qubits[0].register.amplitudes
+                double = circuit.apply_to_state(StateVector(12, 'complex128')).amplitudes
+                self.assertEqual(single.dtype, np.complex64)
+                np.testing.assert_allclose(single, double, rtol=0, atol=AMPLITUDE_TOLERANCE)
+                self.assertLess(1 - abs(np.vdot(double, single.astype(np.complex128))) ** 2, FIDELITY_TOLERANCE)
+
+    def test_near_separable_qubit_accuracy(self):
+        # Each rotation of qubit 0 is briefly entangled with qubits 1 and 2 at an amplitude of 5e-4,
+        # which a single-precision split must not mistake for rounding error.
+        circuit = QuantumCircuit(3)
+        for _ in range(1000):
+            circuit.add_gate('ry', 0, params=(1e-3,))
+            circuit.add_gate('cnot', 0, 1)
+            circuit.add_gate('cnot', 1, 2)
+            circuit.add_gate('cnot', 1, 2)
+            circuit.add_gate('cnot', 0, 1)
+        qubits = [Qubit('complex64') for _ in range(3)]
+        circuit.apply_circuit(*qubits)
+        double = circuit.apply_to_state(StateVector(3, 'complex128')).amplitudes
+        np.testing.assert_allclose(qubits[0].register.amplitudes, double, rtol=0, atol=AMPLITUDE_TOLERANCE)
+        np.testing.assert_allclose(qubits[0].state.ravel(), [np.cos(0.5), np.sin(0.5)], rtol=0, atol=AMPLITUDE_TOLERANCE)
+
+    def test_runner_accuracy(self):
+        circuit = random_circuit(np.random.default_rng(5), 8, 100, rotation='rx')
+        circuit.add_measure(3)
+        circuit.add_gate('hadamard', 2, condition=(0, 1))
+        single = QuantumCircuitRunner(circuit, precision='complex64')
+        double = QuantumCircuitRunner(circuit)
+        np.testing.assert_allclose(single.get_probabilities(), double.get_probabilities(), rtol=0, atol=AMPLITUDE_TOLERANCE)
+        self.assertEqual(single.run(1000, seed=3).num_shots, 1000)
+        with self.assertRaises(UnsupportedOperationError):
+            QuantumCircuitRunner(circuit, noise_model=NoiseModel(), precision='complex64')
+
+    def test_run_many_accuracy(self):
+        circuits = [random_circuit(np.random.default_rng(seed), 4, 20, rotation='rx') for seed in range(4)]
+        single = run_many(circuits, 100000, seed=1, precision='complex64')
+        double = run_many(circuits, 100000, seed=1)
+        for single_result, double_result in zip(single, double):
+            np.testing.assert_allclose(single_result.counts, double_result.counts, atol=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,12 @@
 import unittest
+from unittest import mock
 from io import StringIO
 from contextlib import redirect_stdout
 from src.quantum_circuit import QuantumCircuit
 from src.exceptions.quantum_circuit_exceptions import InvalidGatePositionError, InvalidControlError, MissingControlError, GateNotFoundError, QubitMismatchError, \
-    ExceedsQubitLimitError
+    ExceedsQubitLimitError, InvalidGateParametersError
 from src.qubit import Qubit
+from src.statevector import MAX_STATEVECTOR_QUBITS
 
 
 class TestQuantumCircuit(unittest.TestCase):
@@ -41,18 +43,25 @@ class TestQuantumCircuit(unittest.TestCase):
         with self.assertRaises(MissingControlError):
             self.qc.add_gate('cnot', target=1)
 
+    def test_add_parametric_gate(self):
+        self.qc.add_gate('rx', target=0, params=(0.5,))
+        self.qc.add_gate('phase', target=1, params=(0.25,))
+        self.assertEqual(len(self.qc), 2)
+        with self.assertRaises(InvalidGateParametersError):
+            self.qc.add_gate('ry', target=0)
+
     def test_add_invalid_gate_name(self):
         with self.assertRaises(GateNotFoundError):
             self.qc.add_gate('invalid_gate', target=0)
 
     def test_show_circuit(self):
-        # Test displaying the circuit and check if the output matches the expected output
+        # Test displaying the circuit: gates on disjoint wires share a column
         expected_output = (
-            "2 -------|X|-\n"
-            "  -----------\n"
-            "1 ---⦻-------\n"
-            "  ---|-------\n"
-            "0 ---●-------\n"
+            "2 --|X|-\n"
+            "  ------\n"
+            "1 ---⦻--\n"
+            "  ---|--\n"
+            "0 ---●--\n"
         )
 
         with StringIO() as buffer, redirect_stdout(buffer):
@@ -63,19 +72,81 @@ class TestQuantumCircuit(unittest.TestCase):
 
         self.assertEqual(actual_output.strip(), expected_output.strip())
 
+    def test_draw_wide_circuit(self):
+        qc = QuantumCircuit(12)
+        qc.add_gate('cnot', target=11, control=1)
+        qc.add_gate('hadamard', target=10)
+        qc.add_gate('pauli_x', target=0)
+        lines = qc.draw().split('\n')
+        self.assertEqual(len(lines), 23)
+        self.assertEqual(lines[0], '11 ---⦻-------')
+        self.assertEqual(lines[2], '10 ---|---|H|-')
+        self.assertEqual(lines[20], '1  ---●-------')
+        self.assertEqual(lines[22], '0  --|X|------')
+
+    def test_moments(self):
+        qc = QuantumCircuit(4)
+        qc.add_gate('hadamard', target=0)
+        qc.add_gate('hadamard', target=3)
+        qc.add_gate('cnot', target=0, control=1)
+        qc.add_gate('cnot', target=3, control=2)
+        qc.add_measure(1, 0)
+        qc.add_gate('pauli_x', target=2, condition=(0, 1))
+        qc.add_gate('pauli_z', target=3)
+        moments = [[(gate.gate.name, gate.target) for gate in moment] for moment in qc.get_moments()]
+        self.assertEqual(moments, [[('hadamard', 0), ('hadamard', 3)],
+                                   [('cnot', 0), ('cnot', 3)],
+                                   [('measure', 1), ('pauli_z', 3)],
+                                   [('pauli_x', 2)]])
+        self.assertEqual(qc.depth, 4)
+        qc.add_gate('pauli_y', target=0)
+        self.assertEqual(qc.depth, 4)
+        self.assertEqual(QuantumCircuit(2).depth, 0)
+
     def test_apply_circuit_qubit_mismatch(self):
         # Test applying a circuit with a mismatch in the number of input qubits
         with self.assertRaises(QubitMismatchError) as context:
             self.qc.apply_circuit(0, 1, 2, 3)
 
-    def test_exceeds_qubit_limit_error(self):
-        qubit1 = Qubit()
-        qubit2 = Qubit()
-        qubit3 = Qubit()
+    def test_apply_circuit_three_qubits(self):
+        # Test preparing a GHZ state and measuring every qubit of it
+        qubits = [Qubit() for _ in range(3)]
+        self.qc.add_gate('hadamard', target=0)
+        self.qc.add_gate('cnot', target=0, control=1)
+        self.qc.add_gate('cnot', target=1, control=2)
+        self.qc.apply_circuit(*qubits)
 
-        # Test for raising the ExceedsQubitLimitError
-        with self.assertRaises(ExceedsQubitLimitError) as context:
-            self.qc.apply_circuit(qubit1, qubit2, qubit3)
+        self.assertTrue(all(qubit.entangled_system is not None for qubit in qubits))
+        outcomes = [qubit.measure().tolist() for qubit in qubits]
+        self.assertEqual(outcomes[0], outcomes[1])
+        self.assertEqual(outcomes[1], outcomes[2])
+        self.assertTrue(all(qubit.entangled_system is None for qubit in qubits))
+
+    def test_exceeds_qubit_limit_error(self):
+        qc = QuantumCircuit(input_size=4)
+        for i in range(3):
+            qc.add_gate('hadamard', target=i)
+            qc.add_gate('cnot', target=i, control=i + 1)
+        qubits = [Qubit() for _ in range(4)]
+
+        # Test for raising the ExceedsQubitLimitError once an entangled cluster outgrows the limit
+        with mock.patch('src.factorized_state.MAX_CLUSTER_QUBITS', 3):
+            with self.assertRaises(ExceedsQubitLimitError) as context:
+                qc.apply_circuit(*qubits)
+
+    def test_wide_circuit_with_local_entanglement(self):
+        # Bell pairs across more qubits than a single statevector can hold
+        num_qubits = MAX_STATEVECTOR_QUBITS + 10
+        qc = QuantumCircuit(input_size=num_qubits)
+        for i in range(0, num_qubits, 2):
+            qc.add_gate('hadamard', target=i)
+            qc.add_gate('cnot', target=i, control=i + 1)
+        qubits = [Qubit() for _ in range(num_qubits)]
+        qc.apply_circuit(*qubits)
+
+        self.assertEqual(qubits[0].register.max_cluster_size, 2)
+        outcomes = [qubit.measure().tolist() for qubit in qubits]
+        self.assertTrue(all(outcomes[i] == outcomes[i + 1] for i in range(0, num_qubits, 2)))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,108 @@
+import unittest
+from unittest import mock
+import numpy as np
+from src.circuit_cache import CompiledCircuitCache
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner, SHOT_CHUNK_SIZE
+from src.run_result import SparseRunResult
+from src.statevector import StateVector
+from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
+
+
+class TestQuantumCircuitRunner(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(1234)
+        self.qc = QuantumCircuit(input_size=2)
+
+    def test_run_deterministic_circuit(self):
+        self.qc.add_gate('pauli_x', target=1)
+        results = QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=10)
+        self.assertEqual(len(results), 10)
+        for measurements in results:
+            self.assertEqual([m.tolist() for m in measurements], [ZERO_STATE_KET.tolist(), ONE_STATE_KET.tolist()])
+
+    def test_run_bell_state_is_correlated(self):
+        self.qc.add_gate('hadamard', target=0)
+        self.qc.add_gate('cnot', target=0, control=1)
+        results = QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=2000)
+        ones = 0
+        for first, second in results:
+            self.assertEqual(first.tolist(), second.tolist())
+            ones += int(all(first == ONE_STATE_KET))
+        self.assertAlmostEqual(ones / len(results), 0.5, delta=0.05)
+
+    def test_circuit_is_simulated_once(self):
+        self.qc.add_gate('hadamard', target=0)
+        self.qc.add_gate('t_gate', target=1)
+        runner = QuantumCircuitRunner(self.qc)
+        with mock.patch('src.circuit_cache._default_cache', CompiledCircuitCache()), \
+                mock.patch.object(StateVector, 'apply_matrix', autospec=True, side_effect=StateVector.apply_matrix) as apply_matrix:
+            runner.run_circuit_multiple_times(num_times=500)
+            self.assertEqual(apply_matrix.call_count, len(self.qc.compile()))
+            # The same circuit submitted again is served from the compiled-circuit cache.
+            copy = QuantumCircuit(input_size=2)
+            copy.add_gate('hadamard', target=0)
+            copy.add_gate('t_gate', target=1)
+            QuantumCircuitRunner(copy).run_circuit_multiple_times(num_times=500)
+            self.assertEqual(apply_matrix.call_count, len(self.qc.compile()))
+
+    def test_seeded_runs_are_reproducible_across_workers(self):
+        for i in range(3):
+            self.qc.add_gate('hadamard', target=0)
+            self.qc.add_gate('t_gate', target=1)
+            self.qc.add_gate('hadamard', target=1)
+            self.qc.add_gate('cnot', target=0, control=1)
+        runner = QuantumCircuitRunner(self.qc)
+        num_times = 3 * SHOT_CHUNK_SIZE + 17
+        single_worker = runner.sample_outcomes(num_times, workers=1, seed=2024)
+        multiple_workers = runner.sample_outcomes(num_times, workers=3, seed=2024)
+        np.testing.assert_array_equal(single_worker, multiple_workers)
+        self.assertEqual(len(single_worker), num_times)
+        self.assertFalse(np.array_equal(single_worker, runner.sample_outcomes(num_times, seed=2025)))
+
+    def test_run_with_workers_returns_measurements(self):
+        self.qc.add_gate('pauli_x', target=0)
+        results = QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=10, workers=2, seed=1)
+        self.assertEqual([[m.tolist() for m in measurements] for measurements in results], 10 * [[ONE_STATE_KET.tolist(), ZERO_STATE_KET.tolist()]])
+
+    def test_iter_shots_yields_fixed_size_chunks(self):
+        self.qc.add_gate('hadamard', target=0)
+        self.qc.add_gate('hadamard', target=1)
+        runner = QuantumCircuitRunner(self.qc)
+        chunks = list(runner.iter_shots(num_times=2 * SHOT_CHUNK_SIZE + 5, seed=7))
+        self.assertEqual([len(chunk) for chunk in chunks], [SHOT_CHUNK_SIZE, SHOT_CHUNK_SIZE, 5])
+        np.testing.assert_array_equal(np.concatenate(chunks), runner.sample_outcomes(2 * SHOT_CHUNK_SIZE + 5, seed=7))
+
+    def test_stream_histogram_reports_partial_counts(self):
+        self.qc.add_gate('hadamard', target=0)
+        runner = QuantumCircuitRunner(self.qc)
+        partial_shots = [histogram.num_shots for histogram in runner.stream_histogram(num_times=2500, chunk_size=1000, seed=3)]
+        self.assertEqual(partial_shots, [1000, 2000, 2500])
+
+        histogram = list(runner.stream_histogram(num_times=2500, chunk_size=1000, seed=3))[-1]
+        self.assertEqual(histogram.counts.sum(), 2500)
+        self.assertEqual(histogram.counts[1] + histogram.counts[3], 0)
+        self.assertAlmostEqual(histogram.probabilities()[2], 0.5, delta=0.05)
+
+    def test_stream_histogram_is_sparse_above_dense_limit(self):
+        qc = QuantumCircuit(40)
+        qc.add_gate('hadamard', target=0)
+        for target in range(1, 40):
+            qc.add_gate('cnot', 0, target)
+        partial_shots = [histogram.num_shots for histogram in QuantumCircuitRunner(qc).stream_histogram(num_times=2500, chunk_size=1000, seed=3)]
+        self.assertEqual(partial_shots, [1000, 2000, 2500])
+
+        histogram = list(QuantumCircuitRunner(qc).stream_histogram(num_times=2500, chunk_size=1000, seed=3))[-1]
+        self.assertIsInstance(histogram, SparseRunResult)
+        self.assertEqual(histogram.outcomes.tolist(), [0, 2 ** 40 - 1])
+        self.assertEqual(histogram.counts.sum(), 2500)
+
+    def test_run_invalid_num_times(self):
+        with self.assertRaises(ValueError):
+            QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=0)
+        with self.assertRaises(ValueError):
+            QuantumCircuitRunner(self.qc).run_circuit_multiple_times(num_times=1, workers=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
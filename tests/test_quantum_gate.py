@@ -1,6 +1,8 @@
 import unittest
 import numpy as np
-from src.quantum_gates.quantum_gate import get_quantum_gate_list
+from src.exceptions.quantum_circuit_exceptions import GateNotFoundError, InvalidGateParametersError
+from src.precision import PRECISIONS
+from src.quantum_gate import get_quantum_gate_list, get_gate, get_parametric_gate, GATE_REGISTRY, phase_matrix
 from src.qubit import Qubit
 from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
 
@@ -67,5 +69,57 @@ class TestQuantumGates(unittest.TestCase):
                         np.testing.assert_array_almost_equal(self.control_qubit.state, EXPECTED_STATES_TWO_QUBIT_GATES[gate.name][initialize_states][1])
 
 
+class TestGateRegistry(unittest.TestCase):
+    def test_registry_is_shared_and_read_only(self):
+        self.assertIs(get_gate('hadamard'), GATE_REGISTRY['hadamard'])
+        self.assertIs(get_quantum_gate_list()[0], get_quantum_gate_list()[0])
+        for gate in GATE_REGISTRY.values():
+            with self.subTest(f'matrix of gate {gate.name}'):
+                self.assertEqual(gate.matrix.dtype, np.complex128)
+                self.assertTrue(gate.matrix.flags.c_contiguous)
+                self.assertFalse(gate.matrix.flags.writeable)
+        with self.assertRaises(TypeError):
+            GATE_REGISTRY['hadamard'] = None
+
+    def test_matrices_in_every_precision(self):
+        for gate in GATE_REGISTRY.values():
+            for precision, dtype in PRECISIONS.items():
+                with self.subTest(f'{precision} matrix of gate {gate.name}'):
+                    matrix = gate.get_matrix(precision)
+                    self.assertIs(gate.get_matrix(dtype), matrix)
+                    self.assertEqual(matrix.dtype, dtype)
+                    self.assertFalse(matrix.flags.writeable)
+                    np.testing.assert_allclose(matrix, gate.matrix, atol=1e-7)
+        with self.assertRaises(ValueError):
+            GATE_REGISTRY['hadamard'].get_matrix(np.float32)
+
+    def test_parametric_gates(self):
+        theta = 0.3
+        np.testing.assert_array_almost_equal(get_gate('rx', (np.pi,)).matrix, -1j * GATE_REGISTRY['pauli_x'].matrix)
+        np.testing.assert_array_almost_equal(get_gate('ry', (np.pi,)).matrix, -1j * GATE_REGISTRY['pauli_y'].matrix)
+        np.testing.assert_array_almost_equal(get_gate('rz', (np.pi,)).matrix, -1j * GATE_REGISTRY['pauli_z'].matrix)
+        np.testing.assert_array_almost_equal(get_gate('phase', (theta,)).matrix, phase_matrix(theta))
+        np.testing.assert_array_almost_equal(get_gate('phase', (np.pi / 2,)).matrix, GATE_REGISTRY['phase'].matrix)
+        self.assertIs(get_gate('phase'), GATE_REGISTRY['phase'])
+
+    def test_parametric_gates_are_cached(self):
+        get_parametric_gate.cache_clear()
+        first = get_gate('rx', (0.25,))
+        second = get_gate('rx', [np.float64(0.25)])
+        self.assertIs(first, second)
+        self.assertFalse(first.matrix.flags.writeable)
+        self.assertEqual(get_parametric_gate.cache_info().hits, 1)
+
+    def test_invalid_gate_parameters(self):
+        with self.assertRaises(InvalidGateParametersError):
+            get_gate('rx')
+        with self.assertRaises(InvalidGateParametersError):
+            get_gate('rx', (0.1, 0.2))
+        with self.assertRaises(InvalidGateParametersError):
+            get_gate('hadamard', (0.1,))
+        with self.assertRaises(GateNotFoundError):
+            get_gate('invalid_gate', (0.1,))
+
+
 if __name__ == '__main__':
     unittest.main()
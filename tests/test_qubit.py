@@ -1,6 +1,7 @@
 import unittest
 import numpy as np
-from src.qubit import Qubit, EntangledSystem
+from src.quantum_gate import GATE_REGISTRY
+from src.qubit import Qubit
 from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
 
 
@@ -9,7 +10,6 @@ class TestQubitMeasure(unittest.TestCase):
         # Create instances needed for testing
         self.qubit = Qubit()
         self.control_qubit = Qubit()
-        self.entangled_system = EntangledSystem(self.qubit, self.control_qubit, np.kron(ZERO_STATE_KET, ZERO_STATE_KET) + np.kron(ONE_STATE_KET, ONE_STATE_KET))
 
     def test_measure_zero_state(self):
         # Set up the qubit state to |0⟩
@@ -28,14 +28,26 @@ class TestQubitMeasure(unittest.TestCase):
         self.assertEqual(self.qubit.state.tolist(), ONE_STATE_KET.tolist())
 
     def test_measure_entangled_system(self):
-        # Set up an entangled system state
-        self.qubit.entangled_system = self.entangled_system
-        self.control_qubit.entangled_system = self.entangled_system
-        self.control_qubit.state = ZERO_STATE_KET + ONE_STATE_KET / np.sqrt(2)
+        # Set up the entangled state 1/sqrt(2) * (|00⟩ + |11⟩)
+        self.qubit.apply_gate(GATE_REGISTRY['hadamard'])
+        self.qubit.apply_gate(GATE_REGISTRY['cnot'], self.control_qubit)
+        self.assertIs(self.qubit.entangled_system, self.control_qubit.entangled_system)
         # Measure one of the qubits
-        self.qubit.measure()
+        outcome = self.qubit.measure()
         # Assert that the entangled system state is updated accordingly
-        self.assertEqual(self.control_qubit.state.tolist(), ZERO_STATE_KET.tolist())
+        self.assertEqual(self.control_qubit.state.tolist(), outcome.tolist())
+        self.assertIsNone(self.control_qubit.entangled_system)
+
+    def test_measure_is_reproducible_with_seeded_generator(self):
+        def measure_all(seed):
+            qubits = [Qubit() for _ in range(8)]
+            for qubit in qubits:
+                qubit.apply_gate(GATE_REGISTRY['hadamard'])
+            rng = np.random.default_rng(seed)
+            return [qubit.measure(rng).tolist() for qubit in qubits]
+
+        self.assertEqual(measure_all(5), measure_all(5))
+        self.assertNotEqual(measure_all(5), measure_all(6))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.run_result import RunResult, SparseRunResult
+
+
+class TestRunResult(unittest.TestCase):
+    def setUp(self):
+        # Outcomes of three qubits: |000⟩ twice, |011⟩ once, |110⟩ three times.
+        self.result = RunResult.from_outcomes(3, [0, 0, 3, 6, 6, 6])
+
+    def test_counts_and_probabilities(self):
+        np.testing.assert_array_equal(self.result.counts, [2, 0, 0, 1, 0, 0, 3, 0])
+        self.assertEqual(self.result.num_shots, 6)
+        self.assertEqual(self.result.to_probability_dict(), {'|000⟩': 2 / 6, '|011⟩': 1 / 6, '|110⟩': 3 / 6})
+
+    def test_marginal(self):
+        np.testing.assert_array_equal(self.result.marginal([0]).counts, [3, 3])
+        np.testing.assert_array_equal(self.result.marginal([2]).counts, [5, 1])
+        # Qubit 2 becomes the most significant bit of the marginal.
+        np.testing.assert_array_equal(self.result.marginal([2, 0]).counts, [2, 3, 1, 0])
+        self.assertEqual(self.result.marginal([0, 1, 2]), self.result)
+        with self.assertRaises(ValueError):
+            self.result.marginal([0, 0])
+        with self.assertRaises(ValueError):
+            self.result.marginal([3])
+
+    def test_merge(self):
+        other = RunResult.from_outcomes(3, [7])
+        merged = self.result + other
+        np.testing.assert_array_equal(merged.counts, [2, 0, 0, 1, 0, 0, 3, 1])
+        self.assertEqual(merged.num_shots, 7)
+        self.assertEqual(self.result.num_shots, 6)
+        self.assertEqual(RunResult.merge_all([self.result, other]), merged)
+        with self.assertRaises(ValueError):
+            self.result + RunResult(2)
+
+    def test_sparse_result(self):
+        # The same outcomes as self.result, on qubits 0, 30 and 39 of a 40-qubit result.
+        outcomes = [0, 0, 2 ** 9 + 1, 2 ** 39 + 2 ** 9, 2 ** 39 + 2 ** 9, 2 ** 39 + 2 ** 9]
+        result = SparseRunResult.from_outcomes(40, outcomes[:4]).update(outcomes[4:])
+        self.assertEqual(result.outcomes.tolist(), [0, 2 ** 9 + 1, 2 ** 39 + 2 ** 9])
+        self.assertEqual(result.counts.tolist(), [2, 1, 3])
+        self.assertEqual(result.num_shots, 6)
+        self.assertEqual(result.marginal([0, 30, 39]), self.result)
+        self.assertEqual(result.marginal(range(40)), result)
+        self.assertEqual(sum(result.to_probability_dict().values()), 1)
+        merged = result + SparseRunResult.from_outcomes(40, [0])
+        self.assertEqual(merged.counts.tolist(), [3, 1, 3])
+        self.assertEqual(result.num_shots, 6)
+        with self.assertRaises(ValueError):
+            result.marginal([40])
+        with self.assertRaises(ValueError):
+            result + SparseRunResult(30)
+
+    def test_plot_saves_without_pyplot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'plot.png')
+            script = ("import sys\n"
+                      "from src.run_result import RunResult\n"
+                      f"RunResult.from_outcomes(3, [0, 0, 3]).plot(path={path!r})\n"
+                      "print('matplotlib.pyplot' in sys.modules)")
+            output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+            self.assertEqual(output.strip(), 'False')
+            self.assertGreater(os.path.getsize(path), 0)
+        with self.assertRaises(ValueError):
+            RunResult(2).plot()
+
+    def test_runner_run_matches_sampled_outcomes(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('cnot', 0, 1)
+        runner = QuantumCircuitRunner(qc)
+        result = runner.run(1000, seed=3)
+        self.assertEqual(result, RunResult.from_outcomes(2, runner.sample_outcomes(1000, seed=3)))
+        self.assertEqual(result.counts[1] + result.counts[2], 0)
+
+    def test_runner_plot_path(self):
+        qc = QuantumCircuit(1)
+        qc.add_gate('hadamard', 0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'runs.png')
+            results = QuantumCircuitRunner(qc).run_circuit_multiple_times(50, seed=1, plot_path=path)
+            self.assertEqual(len(results), 50)
+            self.assertTrue(os.path.exists(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+import unittest
+import numpy as np
+from src.shot_histogram import ShotHistogram
+
+
+class TestShotHistogram(unittest.TestCase):
+    def test_update_accumulates_counts(self):
+        histogram = ShotHistogram(num_qubits=2)
+        histogram.update(np.array([0, 3, 3]))
+        histogram.update(np.array([3, 1]))
+        np.testing.assert_array_equal(histogram.counts, [1, 1, 0, 3])
+        self.assertEqual(histogram.num_shots, 5)
+        np.testing.assert_array_almost_equal(histogram.probabilities(), [0.2, 0.2, 0, 0.6])
+
+    def test_to_counter_uses_ket_labels(self):
+        histogram = ShotHistogram(num_qubits=2).update(np.array([2, 2, 1]))
+        self.assertEqual(histogram.to_counter(), {'|00⟩': 0, '|01⟩': 1, '|10⟩': 2, '|11⟩': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import time
+import unittest
+import numpy as np
+from src.branching import BranchTree
+from src.exceptions.quantum_circuit_exceptions import ExceedsQubitLimitError, UnsupportedOperationError
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.quantum_gate import GATE_REGISTRY
+from src.run_result import SparseRunResult
+from src.stabilizer import CLIFFORD_DECOMPOSITIONS, StabilizerTableau, get_popcount
+from src.statevector import StateVector
+from tests.random_circuits import random_circuit
+
+WIDE_CLIFFORD_QUBITS = 1000
+WIDE_CLIFFORD_TIME_BUDGET_SECONDS = 10
+
+
+CLIFFORD_GATES = [GATE_REGISTRY[name] for name in CLIFFORD_DECOMPOSITIONS]
+
+
+class TestStabilizerTableau(unittest.TestCase):
+    def test_every_registry_gate_except_t_is_clifford(self):
+        self.assertEqual(set(GATE_REGISTRY) - set(CLIFFORD_DECOMPOSITIONS), {'t_gate'})
+
+    def test_popcount(self):
+        words = np.random.default_rng(2).integers(0, 2 ** 63, size=(7, 3), dtype=np.uint64) | np.uint64(2 ** 63)
+        expected = [sum(bin(int(word)).count('1') for word in row) for row in words]
+        np.testing.assert_array_equal(get_popcount(words), expected)
+        self.assertEqual(get_popcount(words[:, 1]), sum(bin(int(word)).count('1') for word in words[:, 1]))
+
+    def test_random_clifford_circuits_match_statevector(self):
+        rng = np.random.default_rng(5)
+        for circuit_index in range(30):
+            with self.subTest(f'random circuit {circuit_index}'):
+                qc = random_circuit(rng, 5, 40, CLIFFORD_GATES)
+                tableau = qc.apply_to_tableau(StabilizerTableau(5))
+                np.testing.assert_array_almost_equal(tableau.get_probabilities(), qc.apply_to_state(StateVector(5)).probabilities())
+
+    def test_layers_match_gate_by_gate(self):
+        rng = np.random.default_rng(13)
+        layered, single = StabilizerTableau(130), StabilizerTableau(130)
+        for name in ['hadamard', 'phase', 'cnot', 'pauli_x', 'pauli_y', 'hadamard', 'pauli_z', 'phase']:
+            if GATE_REGISTRY[name].is_two_qubit_gate():
+                for target, control in rng.choice(130, size=(20, 2), replace=False).tolist():
+                    layered.apply_gate(GATE_REGISTRY[name], target, control)
+                    single.apply_gate(GATE_REGISTRY[name], target, control)
+                continue
+            targets = rng.choice(130, size=70, replace=False).tolist()
+            layered.apply_layer(GATE_REGISTRY[name], targets)
+            for target in targets:
+                single.apply_gate(GATE_REGISTRY[name], target)
+        for bits in ['x', 'z', 'r']:
+            np.testing.assert_array_equal(getattr(layered, bits), getattr(single, bits))
+
+    def test_samples_lie_in_support(self):
+        qc = random_circuit(np.random.default_rng(8), 6, 50, CLIFFORD_GATES)
+        tableau = qc.apply_to_tableau(StabilizerTableau(6))
+        outcomes, _ = tableau.sample(np.random.default_rng(0), 4000)
+        probabilities = tableau.get_probabilities()
+        self.assertTrue(np.all(probabilities[outcomes] > 0))
+        np.testing.assert_allclose(np.bincount(outcomes, minlength=64) / 4000, probabilities, atol=0.05)
+
+    def test_non_clifford_gate_is_rejected(self):
+        with self.assertRaises(UnsupportedOperationError):
+            StabilizerTableau(1).apply_gate(GATE_REGISTRY['t_gate'], 0)
+        qc = QuantumCircuit(1)
+        qc.add_gate('rz', 0, params=(np.pi / 2,))
+        self.assertFalse(qc.is_clifford())
+
+    def test_runner_dispatches_on_gate_set(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('hadamard', 0)
+        qc.add_gate('cnot', 0, 1)
+        self.assertIsInstance(QuantumCircuitRunner(qc).get_sampler(), StabilizerTableau)
+        qc.add_gate('t_gate', 1)
+        self.assertIsInstance(QuantumCircuitRunner(qc).get_sampler(), BranchTree)
+
+    def test_wide_ghz_circuit(self):
+        qc = QuantumCircuit(WIDE_CLIFFORD_QUBITS)
+        qc.add_gate('hadamard', 0)
+        for i in range(WIDE_CLIFFORD_QUBITS - 1):
+            qc.add_gate('cnot', i, i + 1)
+        start = time.perf_counter()
+        bits = QuantumCircuitRunner(qc).sample_bits(200, seed=1)
+        self.assertLess(time.perf_counter() - start, WIDE_CLIFFORD_TIME_BUDGET_SECONDS)
+        self.assertEqual(bits.shape, (200, WIDE_CLIFFORD_QUBITS))
+        self.assertTrue(np.all(bits == bits[:, :1]))
+        self.assertTrue(0 < bits[:, 0].sum() < 200)
+
+
+    def test_run_counts_wide_circuit(self):
+        qc = QuantumCircuit(40)
+        qc.add_gate('hadamard', 0)
+        for i in range(39):
+            qc.add_gate('cnot', i, i + 1)
+        runner = QuantumCircuitRunner(qc)
+        result = runner.run(300, seed=2)
+        self.assertIsInstance(result, SparseRunResult)
+        self.assertEqual(result.outcomes.tolist(), [0, 2 ** 40 - 1])
+        self.assertEqual(result, SparseRunResult.from_outcomes(40, runner.sample_outcomes(300, seed=2)))
+        np.testing.assert_array_equal(result.marginal([0, 39]).counts, [result.counts[0], 0, 0, result.counts[1]])
+        with self.assertRaises(ExceedsQubitLimitError):
+            runner.expectation_values(['Z' * 40])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import unittest
+from functools import reduce
+from unittest import mock
+import numpy as np
+from src.exceptions.quantum_circuit_exceptions import QubitMismatchError
+from src.exceptions.vector_exception import VectorError
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_gate import get_quantum_gate_list
+from src.qubit import Qubit
+from src.statevector import BatchedStateVector, StateVector, get_reduced_density_matrix
+from src.utilities.quantum_constants import ZERO_STATE_KET, ONE_STATE_KET
+
+
+def dense_operator(matrix, wires, num_qubits):
+    # Reference implementation: embed the gate into the full 2^n x 2^n operator.
+    operator = np.zeros((2 ** num_qubits, 2 ** num_qubits), dtype=np.complex128)
+    for column in range(2 ** num_qubits):
+        bits = [(column >> (num_qubits - 1 - i)) & 1 for i in range(num_qubits)]
+        local_column = int(''.join(str(bits[wire]) for wire in wires), 2)
+        for local_row in range(2 ** len(wires)):
+            row_bits = list(bits)
+            for position, wire in enumerate(wires):
+                row_bits[wire] = (local_row >> (len(wires) - 1 - position)) & 1
+            row = int(''.join(map(str, row_bits)), 2)
+            operator[row, column] += matrix[local_row, local_column]
+    return operator
+
+
+class TestStateVector(unittest.TestCase):
+    def setUp(self):
+        self.gates = {gate.name: gate for gate in get_quantum_gate_list()}
+        rng = np.random.default_rng(7)
+        self.num_qubits = 4
+        amplitudes = rng.normal(size=2 ** self.num_qubits) + 1j * rng.normal(size=2 ** self.num_qubits)
+        self.initial_state = amplitudes / np.linalg.norm(amplitudes)
+
+    def __register(self):
+        register = StateVector(self.num_qubits)
+        register.amplitudes[:] = self.initial_state
+        return register
+
+    def test_single_qubit_gates_match_dense_operator(self):
+        for gate in self.gates.values():
+            if gate.is_two_qubit_gate():
+                continue
+            for target in range(self.num_qubits):
+                with self.subTest(f'gate {gate.name} on qubit {target}'):
+                    register = self.__register()
+                    register.apply_gate(gate, target)
+                    expected = dense_operator(gate.matrix, (target,), self.num_qubits) @ self.initial_state
+                    np.testing.assert_array_almost_equal(register.amplitudes, expected)
+
+    def test_two_qubit_gates_match_dense_operator(self):
+        for name in ['cnot', 'swap']:
+            for target, control in [(0, 1), (1, 0), (0, 3), (3, 1), (2, 3)]:
+                with self.subTest(f'gate {name} with target {target} and control {control}'):
+                    register = self.__register()
+                    register.apply_gate(self.gates[name], target, control)
+                    expected = dense_operator(self.gates[name].matrix, (target, control), self.num_qubits) @ self.initial_state
+                    np.testing.assert_array_almost_equal(register.amplitudes, expected)
+
+    def test_two_qubit_gate_matches_qubit_apply_gate(self):
+        for initial_states in [(ZERO_STATE_KET, ONE_STATE_KET), (ONE_STATE_KET, ZERO_STATE_KET), (ONE_STATE_KET, ONE_STATE_KET)]:
+            with self.subTest(f'initial states {[state.ravel().tolist() for state in initial_states]}'):
+                target_qubit, control_qubit = Qubit(), Qubit()
+                target_qubit.state, control_qubit.state = initial_states
+                register = StateVector.from_qubits([target_qubit, control_qubit])
+                target_qubit.apply_gate(self.gates['cnot'], control_qubit)
+                register.apply_gate(self.gates['cnot'], 0, 1)
+                expected = reduce(np.kron, [target_qubit.state, control_qubit.state])
+                np.testing.assert_array_almost_equal(register.state, expected)
+
+    def test_measure_collapses_register(self):
+        register = StateVector(2)
+        register.apply_gate(self.gates['hadamard'], 0)
+        register.apply_gate(self.gates['cnot'], 0, 1)
+        outcome = register.measure(1)
+        expected = np.zeros(4)
+        expected[3 * outcome] = 1
+        np.testing.assert_array_almost_equal(register.amplitudes, expected)
+        self.assertFalse(register.is_qubit_entangled(0))
+
+    def test_split_qubit(self):
+        register = StateVector(3)
+        register.apply_gate(self.gates['hadamard'], 0)
+        register.apply_gate(self.gates['cnot'], 0, 2)
+        register.apply_gate(self.gates['t_gate'], 1)
+        register.apply_gate(self.gates['hadamard'], 1)
+        qubit_register, rest_register = register.split_qubit(1)
+        np.testing.assert_array_almost_equal(np.kron(qubit_register.amplitudes, rest_register.amplitudes).reshape(2, 2, 2).transpose(1, 0, 2).ravel(),
+                                             register.amplitudes)
+
+
+    def test_reduced_density_matrix_over_slices(self):
+        # Slices of 8 amplitudes cut every qubit's blocks into several pieces.
+        rng = np.random.default_rng(8)
+        state = rng.normal(size=2 ** 6) + 1j * rng.normal(size=2 ** 6)
+        with mock.patch('src.statevector.REDUCTION_CHUNK_AMPLITUDES', 8):
+            for wire in range(6):
+                qubit_matrix = np.moveaxis(state.reshape(2 ** wire, 2, -1), 1, 0).reshape(2, -1)
+                np.testing.assert_allclose(get_reduced_density_matrix(state, wire), qubit_matrix @ qubit_matrix.conj().T)
+                np.testing.assert_allclose(get_reduced_density_matrix(state.astype(np.complex64), wire), qubit_matrix @ qubit_matrix.conj().T, rtol=1e-5)
+
+    def test_split_qubit_over_slices(self):
+        register = StateVector(6)
+        for wire in range(6):
+            register.apply_gate(self.gates['hadamard'], wire)
+        register.apply_gate(self.gates['cnot'], 0, 5)
+        register.apply_gate(self.gates['t_gate'], 3)
+        with mock.patch('src.statevector.REDUCTION_CHUNK_AMPLITUDES', 8):
+            self.assertFalse(register.is_qubit_entangled(3))
+            qubit_register, rest_register = register.split_qubit(3)
+        np.testing.assert_array_almost_equal(np.kron(qubit_register.amplitudes, rest_register.amplitudes).reshape(2, 8, 4).transpose(1, 0, 2).ravel(),
+                                             register.amplitudes)
+
+class TestBatchedStateVector(unittest.TestCase):
+    def setUp(self):
+        self.qc = QuantumCircuit(3)
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_gate('cnot', 0, 2)
+        self.qc.add_gate('t_gate', 2)
+        self.qc.add_gate('swap', 1, 2)
+        rng = np.random.default_rng(3)
+        states = rng.normal(size=(8, 5)) + 1j * rng.normal(size=(8, 5))
+        self.states = states / np.linalg.norm(states, axis=0)
+
+    def test_batch_matches_individual_states(self):
+        outputs = self.qc.apply_circuit_batch(self.states)
+        for b in range(self.states.shape[1]):
+            with self.subTest(f'state {b} of the batch'):
+                register = StateVector(3)
+                register.amplitudes[:] = self.states[:, b]
+                self.qc.apply_to_state(register)
+                np.testing.assert_array_almost_equal(outputs[:, b], register.amplitudes)
+
+    def test_batch_probabilities(self):
+        probabilities = self.qc.apply_circuit_batch(self.states, return_probabilities=True)
+        np.testing.assert_array_almost_equal(probabilities.sum(axis=0), np.ones(self.states.shape[1]))
+
+    def test_unitary_maps_basis_states(self):
+        unitary = self.qc.get_unitary()
+        np.testing.assert_array_almost_equal(unitary @ unitary.conj().T, np.eye(8))
+        np.testing.assert_array_almost_equal(unitary @ self.states, self.qc.apply_circuit_batch(self.states))
+
+    def test_per_column_matrices(self):
+        rng = np.random.default_rng(5)
+        for wires in [(1,), (0, 2), (2, 0)]:
+            with self.subTest(f'wires {wires}'):
+                size = 2 ** len(wires)
+                matrices = rng.normal(size=(5, size, size)) + 1j * rng.normal(size=(5, size, size))
+                batch = BatchedStateVector.from_states(self.states)
+                batch.apply_matrices(matrices, wires)
+                for b in range(self.states.shape[1]):
+                    register = StateVector(3)
+                    register.amplitudes[:] = self.states[:, b]
+                    register.apply_matrix(matrices[b], wires)
+                    np.testing.assert_array_almost_equal(batch.amplitudes[:, b], register.amplitudes)
+
+    def test_invalid_batch(self):
+        with self.assertRaises(VectorError):
+            self.qc.apply_circuit_batch(np.ones((6, 2)))
+        with self.assertRaises(QubitMismatchError):
+            self.qc.apply_circuit_batch(np.ones((4, 2)))
+
+
+if __name__ == '__main__':
+    unittest.main()
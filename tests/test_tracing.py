@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from src.qubit import Qubit
+from src.quantum_circuit import QuantumCircuit
+from src.quantum_circuit_runner import QuantumCircuitRunner
+from src.statevector import StateVector
+from src.tracing import CircuitTracer, get_tracer, tracing
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.qc = QuantumCircuit(2)
+        self.qc.add_gate('hadamard', 0)
+        self.qc.add_gate('cnot', 0, 1)
+        self.qc.add_measure(1)
+
+    def test_disabled_tracing_does_not_format_qubits(self):
+        self.assertIsNone(get_tracer())
+        with mock.patch.object(Qubit, '__str__', side_effect=AssertionError('formatted')):
+            self.qc.apply_circuit(Qubit(), Qubit())
+
+    def test_events_are_recorded(self):
+        with tracing(CircuitTracer(capture_state=True)) as tracer:
+            qubits = [Qubit(), Qubit()]
+            self.qc.apply_circuit(*qubits)
+        self.assertIsNone(get_tracer())
+
+        fused, measurement = tracer.events
+        self.assertEqual((fused.gates, fused.wires), (('hadamard', 'cnot'), (0, 1)))
+        np.testing.assert_array_almost_equal(fused.state, [1 / np.sqrt(2), 0, 0, 1 / np.sqrt(2)])
+        self.assertEqual((measurement.index, measurement.gates, measurement.wires), (1, ('measure',), (1,)))
+        self.assertAlmostEqual(np.linalg.norm(measurement.state), 1)
+        self.assertTrue(all(event.duration >= 0 for event in tracer.events))
+
+    def test_ring_buffer_and_json_export(self):
+        with tracing(CircuitTracer(capacity=3)) as tracer:
+            for _ in range(2):
+                self.qc.apply_to_state(StateVector(2))
+        self.assertEqual(len(tracer), 3)
+        self.assertEqual(tracer.dropped, 1)
+        self.assertEqual([event.index for event in tracer.events], [1, 2, 3])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            tracer.export_json(path)
+            with open(path) as file:
+                data = json.load(file)
+        self.assertEqual((data['capacity'], data['dropped'], len(data['events'])), (3, 1, 3))
+        self.assertEqual(data['events'][0]['gates'], ['measure'])
+        self.assertIsNone(data['events'][0]['state'])
+        self.assertEqual(tracer.to_dict(), data)
+
+    def test_cached_final_state_is_traced(self):
+        qc = QuantumCircuit(2)
+        qc.add_gate('ry', 0, params=(0.3,))
+        qc.add_gate('cnot', 0, 1)
+        QuantumCircuitRunner(qc).run(10)
+        with tracing() as tracer:
+            QuantumCircuitRunner(qc).run(10)
+        self.assertEqual(len(tracer), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()